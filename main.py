@@ -4,11 +4,19 @@ from datetime import datetime
 
 # Import modules (pastikan struktur folder benar)
 from modules.data_input import collect_all_inputs
-from modules.diagnosis_engine import run_complete_diagnosis
+from modules.result_cache import cached_diagnosis, cache_stats
+from modules.history_store import open_store
+from modules.asset_registry import registry_errors
+from modules.trend_statistics import record_inspection
+from modules.rul_forecast import apply_rul_forecast
+from modules.uncertainty import propagate_uncertainty
 from modules.report_generator import (
     display_diagnosis_summary,
     display_detailed_analysis,
+    display_analyzer_timings,
+    display_uncertainty,
     display_action_plan,
+    display_operating_envelope,
     generate_excel_report
 )
 
@@ -37,12 +45,31 @@ def main():
         with st.spinner("🔄 Running diagnosis..."):
             try:
                 # Run complete diagnosis with causal hierarchy
-                diagnosis_result = run_complete_diagnosis(input_data)
+                # (input identik dilayani dari result cache memori/disk)
+                diagnosis_result = cached_diagnosis(input_data)
+                
+                # Probabilitas status dari ketidakpastian instrumen (JCGM 101, opsional)
+                if input_data.get("uncertainty_mode"):
+                    diagnosis_result["uncertainty"] = propagate_uncertainty(input_data, diagnosis_result)
+                
+                # Bandingkan dengan baseline pompa & simpan ke history store (ISO 55001 §7.5)
+                # Gagal simpan tidak menghentikan diagnosa
+                try:
+                    conn = open_store()
+                    with conn:
+                        record_inspection(conn, diagnosis_result, input_data, before_save=apply_rul_forecast)
+                    conn.close()
+                except Exception as e:
+                    st.warning(f"⚠️ Inspection history not saved: {str(e)}")
                 
                 # Display results
                 display_diagnosis_summary(diagnosis_result)
                 st.markdown("---")
+                if diagnosis_result.get("uncertainty"):
+                    display_uncertainty(diagnosis_result["uncertainty"])
+                    st.markdown("---")
                 display_detailed_analysis(diagnosis_result)
+                display_analyzer_timings(diagnosis_result["timings"])
                 st.markdown("---")
                 display_action_plan(
                     diagnosis_result["action_plan"], 
@@ -83,6 +110,29 @@ def main():
                 st.error(f"❌ Diagnosis error: {str(e)}")
                 st.exception(e)
     
+    # Entri registry aset yang dilewati (pompa tersebut memakai default kelas ukuran)
+    invalid_assets = registry_errors()
+    if invalid_assets:
+        st.sidebar.warning(
+            "⚠️ Invalid asset registry entries skipped: "
+            + "; ".join(f"{tag} ({message})" for tag, message in invalid_assets.items())
+        )
+    
+    # Hit/miss result cache proses ini
+    stats = cache_stats(path=None)
+    if stats["hit_rate"] is not None:
+        st.sidebar.caption(
+            f"🗄️ Result cache: {stats['memory_hits'] + stats['disk_hits']} hits / "
+            f"{stats['misses']} misses ({stats['hit_rate'] * 100:.0f}%)"
+        )
+    
+    # What-if operating envelope (interaktif, dihitung ulang setiap perubahan input) - error input
+    # what-if tidak boleh menghentikan render halaman
+    try:
+        display_operating_envelope(input_data)
+    except Exception as e:
+        st.warning(f"⚠️ Operating envelope unavailable: {str(e)}")
+    
     # Clear form if clicked
     if input_data["clear_clicked"]:
         st.experimental_rerun()
@@ -0,0 +1,210 @@
+"""
+Rule set action planner dari file deklaratif (data/action_rules.json) - ISO 55001 §8.2
+
+Rule di-compile sekali per (path, mtime) menjadi decision table ber-index
+(primary_type, status, product_type) sehingga evaluasi satu record = resolusi status
++ satu lookup dict; perubahan file oleh reliability engineer langsung berlaku (hot reload).
+"""
+import json
+import os
+from functools import lru_cache
+from string import Formatter
+
+from utils.lookup_tables import PRODUCT_PROPERTIES
+
+DEFAULT_RULES_PATH = os.environ.get(
+    "PUMP_ACTION_RULES",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "action_rules.json")
+)
+
+# Status jika tidak ada selector yang cocok
+ANY_STATUS = "*"
+
+ACTION_FIELDS = ["priority", "action", "timeline", "pic", "standard"]
+
+
+def _is_template(value):
+    return isinstance(value, str) and any(field for _, field, _, _ in Formatter().parse(value))
+
+
+def _compile_fields(spec):
+    """Pisahkan field statis dari field template / kondisional"""
+    static = {}
+    dynamic = {}
+    for field in ACTION_FIELDS:
+        if field not in spec:
+            continue
+        value = spec[field]
+        if isinstance(value, dict) or _is_template(value):
+            dynamic[field] = value
+        else:
+            static[field] = value
+    return static, dynamic
+
+
+def _compile_action(spec, templates, product):
+    """Compile satu entri action untuk satu produk"""
+    if "use" in spec:
+        if spec["use"] not in templates:
+            raise ValueError(f"Unknown action template '{spec['use']}'")
+        spec = {**templates[spec["use"]], **{k: v for k, v in spec.items() if k != "use"}}
+    spec = {**spec, **spec.get("by_product", {}).get(product, {})}
+
+    static, dynamic = _compile_fields(spec)
+    step = {"when": spec.get("when"), "unless": spec.get("unless", []), "static": static, "dynamic": dynamic}
+    if "for_each" in spec:
+        step["for_each"] = spec["for_each"]
+        step["by_field"] = spec["by"]["field"]
+        step["by_values"] = {
+            key: _compile_fields(values) for key, values in spec["by"]["values"].items()
+        }
+    return step
+
+
+def _compile_rule(rule, templates, product):
+    steps = [_compile_action(action, templates, product) for action in rule.get("actions", [])]
+    return {
+        "risk_multiplier": rule["risk_multiplier"],
+        "risk_level": rule["risk_level"],
+        "steps": steps,
+        "templated": any(step["dynamic"] or "for_each" in step for step in steps)
+    }
+
+
+def compile_rules(raw):
+    """
+    Compile rule file menjadi decision table
+
+    Returns:
+        dict: version, selectors, table {(primary_type, status, product): rule}, fallback, follow_up
+    """
+    templates = raw.get("templates", {})
+    products = set(PRODUCT_PROPERTIES)
+    for rule in raw["rules"]:
+        for action in rule.get("actions", []):
+            products.update(action.get("by_product", {}))
+
+    table = {}
+    for rule in raw["rules"]:
+        for product in sorted(products):
+            key = (rule["primary_type"], rule.get("status", ANY_STATUS), product)
+            if key in table:
+                raise ValueError(f"Duplicate action rule for {key}")
+            table[key] = _compile_rule(rule, templates, product)
+
+    return {
+        "version": str(raw.get("version", "")),
+        "selectors": raw.get("selectors", {}),
+        "table": table,
+        "fallback": _compile_rule(raw["fallback"], templates, None),
+        "follow_up": _compile_fields(templates["follow_up"])[0]
+    }
+
+
+@lru_cache(maxsize=8)
+def _compiled_rules(path, mtime):
+    """Rule ter-compile per (path, mtime) - cache process-wide, reload otomatis jika file berubah"""
+    with open(path, encoding="utf-8") as f:
+        return compile_rules(json.load(f))
+
+
+def load_action_rules(path=DEFAULT_RULES_PATH):
+    """Decision table action planner (di-compile ulang hanya jika file berubah)"""
+    return _compiled_rules(path, os.path.getmtime(path))
+
+
+def resolve_status(selectors, report):
+    """
+    Status rule untuk report primary diagnosis: selector pertama yang cocok menang
+
+    Returns:
+        str: status (nilai field atau label selector), ANY_STATUS jika tidak ada yang cocok
+    """
+    for selector in selectors:
+        value = report.get(selector["field"])
+        if "nonempty" in selector:
+            matched = bool(value) == selector["nonempty"]
+        elif "not_in" in selector:
+            matched = value not in selector["not_in"]
+        else:
+            matched = value in selector["in"]
+        if matched:
+            return selector.get("status", value)
+    return ANY_STATUS
+
+
+def _template_context(report, product_type):
+    """Placeholder yang tersedia untuk teks action"""
+    context = {**report, "product_type": product_type}
+    if "npshr" in report:
+        context["npsha_target"] = round(report["npshr"] + 1.0, 2)
+    if "bep_flow" in report:
+        context["flow_min"] = 0.6 * report["bep_flow"]
+        context["flow_max"] = 1.2 * report["bep_flow"]
+    if "primary_fault" in report:
+        context["primary_fault_lower"] = report["primary_fault"].lower()
+    return context
+
+
+def _render(dynamic, context, report):
+    rendered = {}
+    for field, value in dynamic.items():
+        if isinstance(value, dict):
+            rendered[field] = value["then"] if value["contains"] in str(report.get(value["field"], "")) else value["else"]
+        else:
+            rendered[field] = value.format(**context)
+    return rendered
+
+
+def _ordered(action):
+    return {field: action[field] for field in ACTION_FIELDS if field in action}
+
+
+def evaluate_action_rules(rules, primary_type, report, product_type, flags=None):
+    """
+    Evaluasi decision table untuk satu diagnosa
+
+    Args:
+        rules: hasil load_action_rules / compile_rules
+        flags: kondisi boolean untuk action ber-"when" / "unless"
+               (mis. requires_power_off_test, coastdown_electrical_unbalance)
+
+    Returns:
+        tuple: (risk_multiplier, risk_level, actions)
+    """
+    report = report or {}
+    status = resolve_status(rules["selectors"].get(primary_type, []), report)
+    table = rules["table"]
+    rule = (
+        table.get((primary_type, status, product_type))
+        or table.get((primary_type, ANY_STATUS, product_type))
+        or rules["fallback"]
+    )
+
+    flags = flags or {}
+    context = _template_context(report, product_type) if rule["templated"] else None
+    actions = []
+    for step in rule["steps"]:
+        if step["when"] and not flags.get(step["when"]):
+            continue
+        if any(flags.get(flag) for flag in step["unless"]):
+            continue
+        if "for_each" not in step:
+            actions.append(_ordered({**step["static"], **_render(step["dynamic"], context, report)}))
+            continue
+        for item in report.get(step["for_each"]) or []:
+            case = step["by_values"].get(item.get(step["by_field"]))
+            if case is None:
+                continue
+            item_context = {**context, **item}
+            actions.append(_ordered({
+                **step["static"], **_render(step["dynamic"], item_context, report),
+                **case[0], **_render(case[1], item_context, report)
+            }))
+
+    return rule["risk_multiplier"], rule["risk_level"], actions
+
+
+def follow_up_action(rules):
+    """Action follow-up (update asset register) yang ditambahkan ke setiap plan berisiko"""
+    return dict(rules["follow_up"])
@@ -0,0 +1,328 @@
+"""
+Registry analyzer & DAG scheduler untuk run_complete_diagnosis
+
+Setiap analyzer mendeklarasikan slice input_data yang dibaca ("inputs") dan analyzer lain
+yang hasilnya dibutuhkan ("depends", mis. FFT membutuhkan RPM hasil speed estimation).
+Analyzer yang independen dijalankan bersamaan di executor (thread pool default, atau
+process pool - runner menerima dict biasa sehingga bisa di-pickle), dengan timing per node.
+
+Hasil setiap analyzer di-memo per proses dengan key = hash slice input-nya + versi data
+eksternal ("version") + key dependency, sehingga perubahan satu field thermal hanya
+menghitung ulang analyzer thermal.
+"""
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+
+from modules.result_cache import canonical_digest, file_digest
+
+# Jumlah thread analyzer per proses (<= 1 = jalankan berurutan di thread pemanggil)
+ANALYZER_WORKERS = int(os.environ.get("PUMP_ANALYZER_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Entri memo per analyzer (0 = memo nonaktif)
+ANALYZER_MEMO_ENTRIES = int(os.environ.get("PUMP_ANALYZER_MEMO", 32))
+
+_POOL = None
+
+# Memo: analyzer -> OrderedDict key -> report ter-pickle (urutan = LRU)
+_MEMO = {}
+_MEMO_LOCK = threading.Lock()
+
+
+def _run_asset(inputs, deps):
+    from modules.asset_registry import get_asset
+    return get_asset(inputs["metadata"].get("pump_tag"))
+
+
+def _registry_version():
+    from modules.asset_registry import DEFAULT_REGISTRY_PATH
+    return file_digest(DEFAULT_REGISTRY_PATH)
+
+
+def _run_speed(inputs, deps):
+    from modules.speed_estimation import estimate_running_speed
+    return estimate_running_speed(inputs, asset=deps["asset"])
+
+
+def _run_hydraulic(inputs, deps):
+    from modules.hydraulic_analysis import generate_hydraulic_report
+    return generate_hydraulic_report(
+        inputs["operational"],
+        inputs["specification"],
+        inputs.get("hf_band", {}),
+        hf_history=inputs.get("hf_history"),
+        asset=deps["asset"]
+    )
+
+
+def _run_electrical(inputs, deps):
+    from modules.electrical_analysis import generate_electrical_report
+    return generate_electrical_report(
+        inputs["electrical"],
+        inputs["specification"],
+        actual_rpm=inputs.get("rpm", None),
+        asset=deps["asset"]
+    )
+
+
+def _run_thermal(inputs, deps):
+    from modules.thermal_analysis import generate_thermal_report
+    return generate_thermal_report(inputs["thermal"])
+
+
+def _run_mechanical(inputs, deps):
+    from modules.mechanical_analysis import analyze_mechanical_conditions
+    spec_data = inputs["specification"]
+    return analyze_mechanical_conditions(
+        inputs["vibration"]["motor"],
+        inputs["vibration"]["pump"],
+        spec_data["foundation_type"],
+        spec_data["product_type"]
+    )
+
+
+def _run_fft(component, inputs, deps):
+    from modules.diagnosis_engine import analyze_fft_peaks
+    spec_data = inputs["specification"]
+    return analyze_fft_peaks(
+        inputs.get(f"fft_{component}", {}),
+        rpm_actual=deps["speed"]["rpm"],
+        component=component,
+        bearings=[spec_data.get(f"bearing_{component}_de"), spec_data.get(f"bearing_{component}_nde")]
+    )
+
+
+def _run_spectrum(inputs, deps):
+    from modules.spectrum_analysis import analyze_spectrum
+    spec_data = inputs["specification"]
+    return {
+        component: analyze_spectrum(
+            spectrum.get("freqs", []),
+            spectrum.get("amplitude", []),
+            rpm_actual=deps["speed"]["rpm"],
+            bearings=[spec_data.get(f"bearing_{component}_de"), spec_data.get(f"bearing_{component}_nde")],
+            vane_count=spectrum.get("vane_count"),
+            line_frequency=spectrum.get("line_frequency", 50.0),
+            component=component
+        )
+        for component, spectrum in (inputs.get("spectrum") or {}).items()
+    }
+
+
+def _run_coastdown(inputs, deps):
+    from modules.coastdown_analysis import analyze_coastdown
+    coastdown = inputs.get("coastdown")
+    if not coastdown:
+        return {"available": False, "message": "Coast-down profile not available", "channels": {}}
+    return analyze_coastdown(
+        coastdown["time"], coastdown["rpm"], coastdown["channels"],
+        shutdown_time=coastdown.get("shutdown_time")
+    )
+
+
+# name -> inputs (key input_data), depends (analyzer lain), run(inputs, deps),
+# version (opsional): sumber data di luar input_data yang ikut menentukan hasil
+ANALYZERS = {
+    "asset": {"inputs": ["metadata"], "depends": [], "run": _run_asset, "version": _registry_version},
+    "speed": {
+        "inputs": ["rpm", "specification", "current_spectrum", "spectrum", "fft_motor", "fft_pump"],
+        "depends": ["asset"],
+        "run": _run_speed
+    },
+    "hydraulic": {
+        "inputs": ["operational", "specification", "hf_band", "hf_history"],
+        "depends": ["asset"],
+        "run": _run_hydraulic
+    },
+    "electrical": {"inputs": ["electrical", "specification", "rpm"], "depends": ["asset"], "run": _run_electrical},
+    "thermal": {"inputs": ["thermal"], "depends": [], "run": _run_thermal},
+    "mechanical": {"inputs": ["vibration", "specification"], "depends": [], "run": _run_mechanical},
+    "fft_motor": {"inputs": ["fft_motor", "specification"], "depends": ["speed"], "run": partial(_run_fft, "motor")},
+    "fft_pump": {"inputs": ["fft_pump", "specification"], "depends": ["speed"], "run": partial(_run_fft, "pump")},
+    "spectrum": {"inputs": ["spectrum", "specification"], "depends": ["speed"], "run": _run_spectrum},
+    "coastdown": {"inputs": ["coastdown"], "depends": [], "run": _run_coastdown}
+}
+
+
+def topological_order(analyzers=ANALYZERS):
+    """
+    Urutan eksekusi yang memenuhi semua dependency
+
+    Raises:
+        ValueError: dependency tidak terdaftar atau siklik
+    """
+    order = []
+    state = {}
+
+    def visit(name, path):
+        if name not in analyzers:
+            raise ValueError(f"Analyzer '{path[-1]}' depends on unknown analyzer '{name}'")
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Analyzer dependency cycle: {' -> '.join(path + [name])}")
+        state[name] = "visiting"
+        for dependency in analyzers[name]["depends"]:
+            visit(dependency, path + [name])
+        state[name] = "done"
+        order.append(name)
+
+    for name in analyzers:
+        visit(name, [])
+    return order
+
+
+def analyzer_inputs(input_data, spec):
+    """Slice input_data yang dideklarasikan analyzer (key yang tidak ada tidak diisi)"""
+    return {key: input_data[key] for key in spec["inputs"] if key in input_data}
+
+
+def analyzer_keys(input_data, analyzers=ANALYZERS, order=None):
+    """
+    Key memo per analyzer: hash slice input + versi data eksternal + key dependency
+
+    Setiap key input_data di-hash sekali walaupun dibaca beberapa analyzer.
+
+    Returns:
+        dict: {name: hex digest}
+    """
+    digests = {}
+    keys = {}
+    for name in order or topological_order(analyzers):
+        spec = analyzers[name]
+        for key in spec["inputs"]:
+            if key not in digests:
+                digests[key] = canonical_digest(input_data[key]) if key in input_data else None
+        keys[name] = canonical_digest([
+            name,
+            [[key, digests[key]] for key in spec["inputs"]],
+            spec["version"]() if "version" in spec else None,
+            [keys[dependency] for dependency in spec["depends"]]
+        ])
+    return keys
+
+
+def _memo_get(name, key):
+    """Report ter-pickle dari memo (None jika tidak ada - report None tetap ter-pickle)"""
+    with _MEMO_LOCK:
+        entries = _MEMO.get(name)
+        blob = entries.get(key) if entries else None
+        if blob is not None:
+            entries.move_to_end(key)
+    return blob
+
+
+def _memo_put(name, key, result):
+    blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+    with _MEMO_LOCK:
+        entries = _MEMO.setdefault(name, OrderedDict())
+        entries[key] = blob
+        entries.move_to_end(key)
+        while len(entries) > ANALYZER_MEMO_ENTRIES:
+            entries.popitem(last=False)
+
+
+def clear_memo():
+    """Kosongkan memo analyzer proses ini"""
+    with _MEMO_LOCK:
+        _MEMO.clear()
+
+
+def _run_node(run, inputs, deps):
+    start = time.perf_counter()
+    result = run(inputs, deps)
+    return result, (time.perf_counter() - start) * 1000.0
+
+
+def analyzer_pool():
+    """Thread pool analyzer bersama per proses (None jika ANALYZER_WORKERS <= 1)"""
+    global _POOL
+    if ANALYZER_WORKERS <= 1:
+        return None
+    if _POOL is None:
+        _POOL = ThreadPoolExecutor(max_workers=ANALYZER_WORKERS, thread_name_prefix="analyzer")
+    return _POOL
+
+
+def run_analyzers(input_data, analyzers=ANALYZERS, executor=None, memoize=False):
+    """
+    Jalankan seluruh analyzer sesuai DAG dependency
+
+    Args:
+        executor: concurrent.futures Executor (None = berurutan di thread pemanggil)
+        memoize: Pakai ulang report dari memo jika key analyzer tidak berubah
+
+    Returns:
+        tuple: (hasil per analyzer, timings {"nodes": {name: ms}, "total_ms", "mode", "reused"})
+    """
+    start = time.perf_counter()
+    order = topological_order(analyzers)
+    keys = analyzer_keys(input_data, analyzers, order) if memoize and ANALYZER_MEMO_ENTRIES > 0 else {}
+    results = {}
+    durations = {}
+    reused = set()
+
+    def from_memo(name):
+        if name not in keys:
+            return False
+        lookup = time.perf_counter()
+        blob = _memo_get(name, keys[name])
+        if blob is None:
+            return False
+        results[name], durations[name] = pickle.loads(blob), (time.perf_counter() - lookup) * 1000.0
+        reused.add(name)
+        return True
+
+    def finish(name, result, duration):
+        results[name], durations[name] = result, duration
+        if name in keys:
+            _memo_put(name, keys[name], result)
+
+    if executor is None:
+        for name in order:
+            if from_memo(name):
+                continue
+            spec = analyzers[name]
+            deps = {d: results[d] for d in spec["depends"]}
+            finish(name, *_run_node(spec["run"], analyzer_inputs(input_data, spec), deps))
+    else:
+        waiting = {name: set(analyzers[name]["depends"]) for name in order}
+        running = {}
+
+        def release(name):
+            for deps in waiting.values():
+                deps.discard(name)
+
+        def submit_ready():
+            ready = [n for n, deps in waiting.items() if not deps]
+            while ready:
+                for name in ready:
+                    del waiting[name]
+                    if from_memo(name):
+                        release(name)
+                        continue
+                    spec = analyzers[name]
+                    deps = {d: results[d] for d in spec["depends"]}
+                    running[executor.submit(_run_node, spec["run"], analyzer_inputs(input_data, spec), deps)] = name
+                ready = [n for n, deps in waiting.items() if not deps]
+
+        submit_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                finish(name, *future.result())
+                release(name)
+            submit_ready()
+
+    timings = {
+        "nodes": {name: round(durations[name], 3) for name in order},
+        "total_ms": round((time.perf_counter() - start) * 1000.0, 3),
+        "mode": "inline" if executor is None else type(executor).__name__,
+        "reused": [name for name in order if name in reused]
+    }
+    return results, timings
@@ -0,0 +1,231 @@
+"""
+Registry aset pompa per pump_tag - nameplate & kurva pabrikan (API 610 §6.1 / ISO 9906)
+
+Format file JSON (path dari env PUMP_ASSET_REGISTRY):
+    {
+        "P-101A": {
+            "pump_size": "Medium",
+            "rated_rpm": 2950,
+            "fla_a": 32,
+            "bep_flow_m3h": 110,
+            "npshr_m": 4.2,
+            "curves": {
+                "flow_m3h": [0, 40, 80, 110, 140],
+                "head_m": [62, 60, 56, 52, 45],
+                "npshr_m": [2.0, 2.4, 3.3, 4.2, 5.6],
+                "efficiency_pct": [0, 48, 70, 76, 71]
+            }
+        }
+    }
+
+Field nameplate yang kosong / null diisi dari PUMP_SIZE_DEFAULTS kelas pump_size aset.
+rated_rpm registry (jika diisi) menggantikan rated speed spesifikasi untuk slip & estimasi kecepatan.
+Kurva diinterpolasi sekali ke grid flow yang rapat sehingga lookup = satu indexing array.
+Entri yang tidak valid dilewati & dilaporkan per tag (registry_errors), tidak menggagalkan
+seluruh registry.
+"""
+import json
+import os
+import warnings
+from functools import lru_cache
+
+import numpy as np
+
+from utils.lookup_tables import PUMP_SIZE_DEFAULTS
+
+DEFAULT_REGISTRY_PATH = os.environ.get(
+    "PUMP_ASSET_REGISTRY",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "asset_registry.json")
+)
+
+# Jumlah titik grid kurva (0 .. flow maksimum kurva)
+CURVE_GRID_POINTS = 2048
+
+NAMEPLATE_FIELDS = ["npshr_m", "bep_flow_m3h", "fla_a", "typical_head_m"]
+CURVE_FIELDS = ["head_m", "npshr_m", "efficiency_pct"]
+
+
+def build_curve_grid(flow, values, grid_points=CURVE_GRID_POINTS):
+    """
+    Interpolasi linear kurva pabrikan ke grid flow seragam 0..flow maksimum
+
+    Returns:
+        tuple: (grid nilai array, step flow m³/h per titik grid)
+    """
+    order = np.argsort(np.asarray(flow, dtype=float))
+    flow = np.asarray(flow, dtype=float)[order]
+    values = np.asarray(values, dtype=float)[order]
+    step = flow[-1] / (grid_points - 1) if flow[-1] > 0 else 1.0
+    return np.interp(np.arange(grid_points) * step, flow, values), step
+
+
+def compile_asset(tag, entry):
+    """
+    Lengkapi nameplate dari kelas ukuran & pre-interpolasi kurva ke grid
+
+    Raises:
+        ValueError / TypeError: entri atau pump_size tidak valid
+    """
+    if not isinstance(entry, dict):
+        raise ValueError("entry must be an object")
+    pump_size = entry.get("pump_size") or "Medium"
+    if pump_size not in PUMP_SIZE_DEFAULTS:
+        raise ValueError(f"unknown pump_size '{pump_size}' (available: {', '.join(PUMP_SIZE_DEFAULTS)})")
+    defaults = PUMP_SIZE_DEFAULTS[pump_size]
+    asset = {
+        "pump_tag": tag,
+        "pump_size": pump_size,
+        "rated_rpm": float(entry["rated_rpm"]) if entry.get("rated_rpm") is not None else None,
+        **{
+            field: float(entry.get(field) if entry.get(field) is not None else defaults[field])
+            for field in NAMEPLATE_FIELDS
+        },
+        "curves": {},
+        "flow_step": 1.0
+    }
+
+    curves = entry.get("curves") or {}
+    flow = curves.get("flow_m3h") or []
+    for field in CURVE_FIELDS:
+        if len(curves.get(field) or []) == len(flow) >= 2:
+            if not np.isfinite(np.asarray(flow + curves[field], dtype=float)).all():
+                raise ValueError(f"curve flow_m3h/{field} must contain numbers only")
+            asset["curves"][field], asset["flow_step"] = build_curve_grid(flow, curves[field])
+    return asset
+
+
+@lru_cache(maxsize=4)
+def _compiled_registry(path, mtime):
+    """
+    Registry ter-compile per (path, mtime) - cache process-wide, reload otomatis jika file berubah
+
+    Returns:
+        tuple: ({pump_tag: aset ter-compile}, {pump_tag: pesan error entri yang dilewati})
+    """
+    if mtime is None:
+        return {}, {}
+    with open(path) as f:
+        raw = json.load(f)
+    assets = {}
+    errors = {}
+    for tag, entry in raw.items():
+        try:
+            assets[str(tag)] = compile_asset(str(tag), entry)
+        except (KeyError, TypeError, ValueError) as e:
+            errors[str(tag)] = f"{type(e).__name__}: {e}"
+    if errors:
+        warnings.warn(
+            f"Asset registry {path}: {len(errors)} invalid entries skipped ({', '.join(sorted(errors))})",
+            stacklevel=2
+        )
+    return assets, errors
+
+
+def _registry_mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def load_registry(path=DEFAULT_REGISTRY_PATH):
+    """
+    Baca registry aset (kosong jika file tidak ada; entri tidak valid dilewati)
+
+    Returns:
+        dict: {pump_tag: aset ter-compile}
+    """
+    return _compiled_registry(path, _registry_mtime(path))[0]
+
+
+def registry_errors(path=DEFAULT_REGISTRY_PATH):
+    """
+    Entri registry yang dilewati karena tidak valid
+
+    Returns:
+        dict: {pump_tag: pesan error}
+    """
+    return _compiled_registry(path, _registry_mtime(path))[1]
+
+
+def get_asset(pump_tag, path=DEFAULT_REGISTRY_PATH):
+    """Aset ter-compile untuk pump_tag, None jika tidak terdaftar"""
+    if not pump_tag:
+        return None
+    return load_registry(path).get(str(pump_tag))
+
+
+def rated_speed(asset, rated_rpm=None):
+    """Rated speed nameplate: registry jika pompa terdaftar & rated_rpm diisi, jika tidak nilai spesifikasi"""
+    if asset is not None and asset.get("rated_rpm"):
+        return asset["rated_rpm"]
+    return rated_rpm
+
+
+def curve_value(asset, field, flow_rate):
+    """
+    Nilai kurva pada flow tertentu (lookup grid O(1), di-clamp ke rentang kurva)
+
+    Args:
+        flow_rate: skalar atau array flow (m³/h)
+
+    Returns:
+        float / np.ndarray (NaN untuk flow non-finite), atau None jika kurva tidak tersedia
+        atau flow skalar non-finite - pemanggil memakai nilai nameplate
+    """
+    grid = asset["curves"].get(field)
+    if grid is None:
+        return None
+    flow = np.asarray(flow_rate, dtype=float)
+    finite = np.isfinite(flow)
+    if flow.ndim == 0 and not finite:
+        return None
+    index = np.clip(np.rint(np.where(finite, flow, 0.0) / asset["flow_step"]), 0, len(grid) - 1).astype(int)
+    if index.ndim == 0:
+        return float(grid[index])
+    return np.where(finite, grid[index], np.nan)
+
+
+def asset_limits(asset, pump_size, flow_rate=0.0):
+    """
+    Batas hidraulis & listrik untuk satu pompa: registry jika terdaftar, jika tidak kelas ukuran
+
+    NPSHr diambil dari kurva pada flow aktual (flow > 0), selain itu nilai nameplate di BEP.
+
+    Returns:
+        dict: npshr_m, bep_flow_m3h, fla_a, typical_head_m, source
+    """
+    if asset is None:
+        return {**{field: PUMP_SIZE_DEFAULTS[pump_size][field] for field in NAMEPLATE_FIELDS}, "source": "size_class"}
+
+    limits = {field: asset[field] for field in NAMEPLATE_FIELDS}
+    npshr = curve_value(asset, "npshr_m", flow_rate) if flow_rate > 0 else None
+    if npshr is not None:
+        limits["npshr_m"] = npshr
+    return {**limits, "source": "asset_registry"}
+
+
+@lru_cache(maxsize=4)
+def _registry_tables(path, mtime):
+    """Registry dalam bentuk array bertumpuk (satu baris per aset) untuk jalur fleet"""
+    registry = _compiled_registry(path, mtime)[0]
+    tags = list(registry)
+    assets = [registry[tag] for tag in tags]
+    empty = np.full(CURVE_GRID_POINTS, np.nan)
+    return {
+        "index": {tag: i for i, tag in enumerate(tags)},
+        **{field: np.array([a[field] for a in assets], dtype=float) for field in NAMEPLATE_FIELDS},
+        "flow_step": np.array([a["flow_step"] for a in assets], dtype=float),
+        "rated_rpm": np.array([a["rated_rpm"] or np.nan for a in assets], dtype=float),
+        "npshr_curve": np.array([a["curves"].get("npshr_m", empty) for a in assets], dtype=float).reshape(len(assets), CURVE_GRID_POINTS)
+    }
+
+
+def registry_tables(path=DEFAULT_REGISTRY_PATH):
+    """
+    Tabel registry untuk lookup vectorized
+
+    Returns:
+        dict: index {tag: baris}, array nameplate per aset, flow_step, npshr_curve (aset x grid)
+    """
+    return _registry_tables(path, _registry_mtime(path))
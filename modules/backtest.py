@@ -0,0 +1,261 @@
+"""
+Backtest threshold diagnosa terhadap histori inspeksi - ISO 13379-1 §6 (validasi diagnostik)
+
+Inspeksi tersimpan di-replay melalui fleet_engine dengan set threshold kandidat
+(override DIAGNOSIS_THRESHOLDS), opsional dicocokkan dengan outcome kegagalan / work order
+berikutnya per pompa. Setiap konfigurasi dievaluasi di proses terpisah dan dinilai dengan
+hit rate, false-alarm rate & lead time.
+"""
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from modules.fleet_engine import run_fleet_diagnosis
+from modules.inspection_records import input_data_to_record
+from utils.lookup_tables import DIAGNOSIS_THRESHOLDS
+
+# Window prediksi (hari): alarm dihitung "benar" jika kegagalan terjadi dalam window ini
+BACKTEST_HORIZON_DAYS = 90
+
+# failure_type outcome -> kolom issue subsystem hasil run_fleet_diagnosis
+FAILURE_ISSUE_COLUMNS = {
+    "HYDRAULIC": ["hydraulic_has_issue"],
+    "ELECTRICAL": ["electrical_has_issue"],
+    "MECHANICAL": ["mechanical_has_issue", "fft_motor_has_issue", "fft_pump_has_issue"],
+    "THERMAL": ["thermal_has_issue"]
+}
+
+# State per worker (di-set sekali oleh initializer, tidak di-pickle per konfigurasi)
+_STATE = {}
+
+
+def resolve_thresholds(overrides=None):
+    """
+    Gabungkan override kandidat dengan DIAGNOSIS_THRESHOLDS
+
+    hf_cavitation_g boleh berupa angka (semua produk) atau dict per produk.
+
+    Returns:
+        dict: Set threshold lengkap
+    """
+    thresholds = {**DIAGNOSIS_THRESHOLDS, "hf_cavitation_g": dict(DIAGNOSIS_THRESHOLDS["hf_cavitation_g"])}
+    for key, value in (overrides or {}).items():
+        if key not in DIAGNOSIS_THRESHOLDS:
+            raise KeyError(f"Unknown threshold '{key}' (available: {', '.join(DIAGNOSIS_THRESHOLDS)})")
+        if key == "hf_cavitation_g":
+            products = thresholds[key]
+            thresholds[key] = {**products, **value} if isinstance(value, dict) else {p: float(value) for p in products}
+        else:
+            thresholds[key] = float(value)
+    return thresholds
+
+
+def threshold_grid(sweep, include_baseline=True):
+    """
+    Konfigurasi kandidat dari spesifikasi sweep
+
+    Args:
+        sweep: dict {threshold: [nilai, ...]} (cartesian product) atau list dict override
+
+    Returns:
+        list: dict override per konfigurasi ({} = DIAGNOSIS_THRESHOLDS)
+    """
+    if isinstance(sweep, dict):
+        keys = list(sweep)
+        configurations = [dict(zip(keys, values)) for values in itertools.product(*(sweep[k] for k in keys))]
+    else:
+        configurations = [dict(c) for c in sweep]
+    if include_baseline and {} not in configurations:
+        configurations.insert(0, {})
+    return configurations
+
+
+def load_history_records(conn, date_from=None, date_to=None):
+    """
+    Record datar seluruh inspeksi tersimpan (yang menyimpan input), urut per pompa & tanggal
+
+    Returns:
+        pd.DataFrame: Skema inspection_records + pump_tag & inspection_date
+    """
+    from modules.history_store import load_input, query_inspections
+
+    rows = query_inspections(conn, date_from=date_from, date_to=date_to)
+    records = []
+    for row in rows:
+        data = load_input(row)
+        if data and row["inspection_date"]:
+            record = input_data_to_record(data)
+            record["pump_tag"] = row["pump_tag"]
+            record["inspection_date"] = row["inspection_date"]
+            records.append(record)
+    frame = pd.DataFrame(records)
+    return frame.sort_values(["pump_tag", "inspection_date"], kind="stable").reset_index(drop=True) if records else frame
+
+
+def load_outcomes(path):
+    """
+    Outcome kegagalan / work order (CSV, Excel atau JSON Lines)
+
+    Kolom: pump_tag, event_date, failure_type (opsional: HYDRAULIC/ELECTRICAL/MECHANICAL/THERMAL)
+
+    Returns:
+        pd.DataFrame
+    """
+    from modules.batch_runner import read_inspections
+
+    outcomes = read_inspections(path)
+    missing = {"pump_tag", "event_date"} - set(outcomes.columns)
+    if missing:
+        raise ValueError(f"Outcome file missing columns: {', '.join(sorted(missing))}")
+    return outcomes
+
+
+def _prepare_outcomes(outcomes, inspections):
+    """Normalisasi outcome; hanya event setelah inspeksi pertama pompa yang dinilai"""
+    events = pd.DataFrame({
+        "pump_tag": outcomes["pump_tag"].astype(str),
+        "event_date": pd.to_datetime(outcomes["event_date"], errors="coerce"),
+        "failure_type": (
+            outcomes["failure_type"].fillna("").astype(str).str.upper().str.strip()
+            if "failure_type" in outcomes.columns else ""
+        )
+    }).dropna(subset=["event_date"])
+    first_inspection = inspections.groupby("pump_tag")["date"].min()
+    events = events[events["event_date"] > events["pump_tag"].map(first_inspection)]
+    return events.sort_values("event_date").reset_index(drop=True)
+
+
+def score_alarms(inspections, issues, events, horizon_days=BACKTEST_HORIZON_DAYS):
+    """
+    Nilai alarm satu konfigurasi terhadap outcome
+
+    Inspeksi "positif" jika ada kegagalan pompa yang sama dalam horizon_days setelahnya.
+    Alarm pada inspeksi positif = true positive jika subsystem-nya cocok dengan failure_type
+    (atau failure_type kosong); alarm pada inspeksi negatif = false alarm.
+
+    Args:
+        inspections: DataFrame pump_tag, date (urutan sama dengan issues)
+        issues: DataFrame kolom *_has_issue hasil run_fleet_diagnosis
+        events: hasil _prepare_outcomes
+
+    Returns:
+        dict: events, hits, hit_rate, false_alarms, false_alarm_rate, precision, lead time
+    """
+    alarm = issues[[c for columns in FAILURE_ISSUE_COLUMNS.values() for c in columns]].any(axis=1).to_numpy()
+    frame = inspections.assign(row=np.arange(len(inspections)), alarm=alarm).sort_values("date")
+    matched = pd.merge_asof(
+        frame, events, left_on="date", right_on="event_date", by="pump_tag",
+        direction="forward", tolerance=pd.Timedelta(days=horizon_days)
+    ).set_index("row").sort_index()
+
+    positive = matched["event_date"].notna().to_numpy()
+    type_match = np.ones(len(matched), dtype=bool)
+    failure_type = matched["failure_type"].fillna("").to_numpy(dtype=str)
+    for name, columns in FAILURE_ISSUE_COLUMNS.items():
+        rows = failure_type == name
+        type_match[rows] = issues[columns].any(axis=1).to_numpy()[rows]
+
+    true_alarm = alarm & positive & type_match
+    false_alarm = alarm & ~positive
+    negatives = int((~positive).sum())
+
+    hits = matched[true_alarm].assign(
+        lead_days=lambda df: (df["event_date"] - df["date"]).dt.total_seconds() / 86400.0
+    ).groupby(["pump_tag", "event_date"])["lead_days"].max()
+
+    alarms = int(alarm.sum())
+    return {
+        "events": len(events),
+        "hits": len(hits),
+        "hit_rate": round(len(hits) / len(events), 4) if len(events) else np.nan,
+        "false_alarms": int(false_alarm.sum()),
+        "false_alarm_rate": round(false_alarm.sum() / negatives, 4) if negatives else np.nan,
+        "precision": round(true_alarm.sum() / alarms, 4) if alarms else np.nan,
+        "median_lead_days": round(float(hits.median()), 1) if len(hits) else np.nan,
+        "mean_lead_days": round(float(hits.mean()), 1) if len(hits) else np.nan
+    }
+
+
+def _init_worker(records, inspections, events, baseline_alarm, horizon_days):
+    _STATE.update(
+        records=records, inspections=inspections, events=events,
+        baseline_alarm=baseline_alarm, horizon_days=horizon_days
+    )
+
+
+def evaluate_configuration(overrides):
+    """
+    Replay seluruh histori dengan satu konfigurasi threshold (dijalankan di worker)
+
+    Returns:
+        dict: Metrik alarm (+ metrik outcome jika tersedia)
+    """
+    results = run_fleet_diagnosis(_STATE["records"], thresholds=resolve_thresholds(overrides))
+    alarm = (results["primary_type"] != "NORMAL").to_numpy()
+
+    metrics = {
+        "configuration": json.dumps(overrides, sort_keys=True),
+        "inspections": len(results),
+        "alarms": int(alarm.sum()),
+        "alarm_rate": round(float(alarm.mean()), 4) if len(alarm) else np.nan,
+        "changed_vs_baseline": int((alarm != _STATE["baseline_alarm"]).sum()),
+        **{
+            f"{name.lower()}_alarms": int(results[columns].any(axis=1).sum())
+            for name, columns in FAILURE_ISSUE_COLUMNS.items()
+        }
+    }
+    if _STATE["events"] is not None:
+        metrics.update(score_alarms(_STATE["inspections"], results, _STATE["events"], _STATE["horizon_days"]))
+    return metrics
+
+
+def run_backtest(records, configurations, outcomes=None, horizon_days=BACKTEST_HORIZON_DAYS, workers=None):
+    """
+    Evaluasi banyak konfigurasi threshold terhadap histori inspeksi secara paralel
+
+    Args:
+        records: DataFrame record datar (load_history_records / file inspeksi) dengan pump_tag & inspection_date
+        configurations: list dict override (threshold_grid)
+        outcomes: DataFrame outcome (load_outcomes) atau None
+        workers: jumlah proses (None = semua core, 1 = tanpa pool)
+
+    Returns:
+        pd.DataFrame: Satu baris per konfigurasi (nilai threshold yang di-override + metrik)
+    """
+    for overrides in configurations:
+        resolve_thresholds(overrides)  # validasi key sebelum dikirim ke worker
+
+    # Record dengan product_type / pump_size tidak dikenal tidak bisa di-replay - dikeluarkan
+    baseline = run_fleet_diagnosis(records)
+    if "error" in baseline.columns:
+        valid = baseline["error"].isna().to_numpy()
+        records, baseline = records[valid].reset_index(drop=True), baseline[valid]
+
+    inspections = pd.DataFrame({
+        "pump_tag": records["pump_tag"].astype(str).to_numpy(),
+        "date": pd.to_datetime(records["inspection_date"], errors="coerce", format="mixed").to_numpy()
+    })
+    if inspections["date"].isna().any():
+        raise ValueError("Backtest requires an inspection_date on every record")
+    events = _prepare_outcomes(outcomes, inspections) if outcomes is not None else None
+    baseline_alarm = (baseline["primary_type"] != "NORMAL").to_numpy()
+    state = (records, inspections, events, baseline_alarm, horizon_days)
+
+    if workers == 1 or len(configurations) <= 1:
+        _init_worker(*state)
+        rows = [evaluate_configuration(overrides) for overrides in configurations]
+    else:
+        workers = min(workers or os.cpu_count() or 1, len(configurations))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=state) as executor:
+            rows = list(executor.map(evaluate_configuration, configurations))
+
+    report = pd.DataFrame(rows)
+    parameters = pd.DataFrame([
+        {key: json.dumps(value) if isinstance(value, dict) else value for key, value in overrides.items()}
+        for overrides in configurations
+    ], index=report.index)
+    return pd.concat([parameters, report], axis=1)
@@ -0,0 +1,153 @@
+"""Batch diagnosis headless (tanpa Streamlit) dengan process pool untuk fleet run"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+from modules.diagnosis_engine import run_complete_diagnosis
+from modules.inspection_records import record_to_input_data
+
+
+def read_inspections(path):
+    """
+    Baca file inspeksi (CSV, Excel, atau JSON Lines) - satu baris per inspeksi
+
+    Returns:
+        pd.DataFrame: Record datar sesuai skema inspection_records
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in [".xlsx", ".xls"]:
+        return pd.read_excel(path)
+    if extension in [".jsonl", ".ndjson"]:
+        return pd.read_json(path, lines=True)
+    return pd.read_csv(path)
+
+
+def diagnose_record(record, cache_path=None):
+    """
+    Jalankan run_complete_diagnosis untuk satu record datar (via result cache jika cache_path diisi)
+
+    Error per record dikembalikan sebagai record {"pump_tag", "inspection_date", "error"},
+    bukan exception - satu baris rusak tidak menggagalkan fleet run.
+    """
+    try:
+        input_data = record_to_input_data(record)
+        if cache_path:
+            from modules.result_cache import cached_diagnosis
+            return cached_diagnosis(input_data, path=cache_path, parallel=False, memoize=False)
+        return run_complete_diagnosis(input_data, parallel=False, memoize=False)
+    except Exception as e:
+        return {
+            **{key: None if pd.isna(record.get(key)) else record.get(key) for key in ["pump_tag", "inspection_date"]},
+            "error": f"{type(e).__name__}: {e}"
+        }
+
+
+def run_batch(records, workers=None, chunk_size=64, cache_path=None):
+    """
+    Diagnosa banyak record secara paralel di ProcessPoolExecutor
+
+    Args:
+        records: iterable record datar (dict)
+        workers: jumlah proses (None = semua core, 1 = tanpa pool)
+        chunk_size: jumlah record per task yang dikirim ke worker
+        cache_path: database tier disk result cache (None = tanpa cache)
+
+    Yields:
+        dict: Hasil run_complete_diagnosis, atau record error (+ "row" 1-based), urutan sama dengan input
+    """
+    if workers == 1:
+        results = (diagnose_record(record, cache_path) for record in records)
+        for row, result in enumerate(results, 1):
+            yield {"row": row, **result} if "error" in result else result
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(partial(diagnose_record, cache_path=cache_path), records, chunksize=max(1, chunk_size))
+        for row, result in enumerate(results, 1):
+            yield {"row": row, **result} if "error" in result else result
+
+
+def summarize_result(result):
+    """Ringkas hasil diagnosa menjadi satu baris datar (untuk CSV/Excel) - record error tetap satu baris"""
+    if "error" in result:
+        return {"pump_tag": result.get("pump_tag"), "inspection_date": result.get("inspection_date"), "error": result["error"]}
+
+    metadata = result["metadata"]
+    analyses = result["analyses"]
+    diagnosis = result["diagnosis"]
+    action_plan = result["action_plan"]
+    actions = action_plan["actions"]
+    # Tren hanya ada setelah hasil disimpan ke history store (batch --store), selain itu None
+    trend = result.get("trend")
+
+    return {
+        "pump_tag": metadata.get("pump_tag"),
+        "inspection_date": metadata.get("inspection_date"),
+        "location": metadata.get("location"),
+        "primary_type": diagnosis["primary_diagnosis"]["type"],
+        "standard": diagnosis["primary_diagnosis"]["standard"],
+        "issue_count": diagnosis["issue_count"],
+        "requires_power_off_test": diagnosis["requires_power_off_test"],
+        "coastdown_classification": diagnosis.get("coastdown_classification"),
+        "risk_level": action_plan["risk_level"],
+        "risk_score": action_plan["risk_score"],
+        "cavitation_risk": analyses["hydraulic"]["cavitation_risk"],
+        "npsha_margin": analyses["hydraulic"]["npsha_margin"],
+        "electrical_status": analyses["electrical"]["overall_status"],
+        "overall_zone": analyses["mechanical"]["overall_zone"],
+        "bearing_defect_risk": analyses["mechanical"]["bearing_defect_risk"],
+        "thermal_status": analyses["thermal"]["overall_status"],
+        "trend_deviation": trend["has_deviation"] if trend else None,
+        "trend_deviations": ", ".join(m["metric"] for m in trend["metrics"] if m["deviation"]) if trend else None,
+        "action_count": len(actions),
+        "first_action": actions[0]["action"] if actions else ""
+    }
+
+
+def result_to_json(result):
+    """Serialisasi hasil diagnosa ke satu baris JSON (tanggal -> string ISO)"""
+    return json.dumps(result, default=str, ensure_ascii=False)
+
+
+def write_table(table, output_path):
+    """
+    Tulis tabel ringkasan sesuai ekstensi: .csv, .xlsx, lainnya = JSON Lines (satu objek per baris)
+
+    Returns:
+        int: Jumlah baris yang ditulis
+    """
+    extension = os.path.splitext(output_path)[1].lower()
+    if extension == ".csv":
+        table.to_csv(output_path, index=False)
+    elif extension == ".xlsx":
+        table.to_excel(output_path, index=False)
+    else:
+        table.to_json(output_path, orient="records", lines=True, force_ascii=False)
+    return len(table)
+
+
+def write_results(results, output_path):
+    """
+    Tulis hasil ke file: .csv/.xlsx = ringkasan per baris, lainnya = JSON Lines lengkap
+
+    Returns:
+        int: Jumlah hasil yang ditulis
+    """
+    extension = os.path.splitext(output_path)[1].lower()
+
+    if extension in [".csv", ".xlsx"]:
+        summary = pd.DataFrame([summarize_result(result) for result in results])
+        if "error" in summary.columns:
+            # Kolom kosong pada baris error: integer/bool tetap integer/bool (nullable), bukan float
+            summary = summary[[column for column in summary.columns if column != "error"] + ["error"]].convert_dtypes()
+        return write_table(summary, output_path)
+
+    count = 0
+    with open(output_path, "w", encoding="utf-8") as f:
+        for result in results:
+            f.write(result_to_json(result) + "\n")
+            count += 1
+    return count
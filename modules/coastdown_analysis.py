@@ -0,0 +1,197 @@
+"""
+Analisis coast-down (power-off test) - API 610 Annex L.3.2 / ISO 13373-1 §5.3.2
+
+Profil rekaman (waktu, RPM, vibrasi per kanal) diklasifikasi otomatis:
+    - vibrasi turun GRADUAL mengikuti RPM   -> mechanical unbalance
+    - vibrasi turun SEKETIKA saat power off -> electrical unbalance (gaya magnetik hilang)
+    - vibrasi BERTAHAN pada RPM sangat rendah -> bearing defect / looseness
+"""
+import numpy as np
+import pandas as pd
+
+# Jendela "seketika" setelah shutdown (detik) dan level vibrasi yang dianggap hilang (mm/s)
+IMMEDIATE_WINDOW_S = 10.0
+ELECTRICAL_DROP_LEVEL_MMS = 1.0
+# Drop elektrikal: vibrasi turun ke < level ATAU < fraksi baseline saat RPM masih tinggi
+ELECTRICAL_DROP_FRACTION = 0.5
+ELECTRICAL_SPEED_FRACTION = 0.8
+
+# Persistensi: vibrasi > level saat RPM < batas
+PERSISTENCE_RPM = 100.0
+PERSISTENCE_LEVEL_MMS = 1.5
+
+# Fit log-log vibrasi vs RPM yang dianggap "mengikuti kecepatan"
+MECHANICAL_MIN_R2 = 0.7
+MECHANICAL_MIN_EXPONENT = 0.5
+
+# Peak coast-down > faktor × baseline = lewat resonansi
+RESONANCE_FACTOR = 1.5
+
+COASTDOWN_CLASSES = {
+    "BEARING_LOOSENESS": {
+        "root_cause": "🔧 BEARING DEFECT/LOOSENESS",
+        "action": "Inspect bearings & foundation bolts"
+    },
+    "ELECTRICAL_UNBALANCE": {
+        "root_cause": "⚡ ELECTRICAL UNBALANCE (Rotor winding issue)",
+        "action": "DO NOT BALANCE - Schedule electrical inspection"
+    },
+    "MECHANICAL_UNBALANCE": {
+        "root_cause": "✅ MECHANICAL UNBALANCE (Impeller erosion/fouling)",
+        "action": "Proceed with dynamic balancing"
+    },
+    "INCONCLUSIVE": {
+        "root_cause": "❓ Inconclusive coast-down profile",
+        "action": "Repeat power-off test with denser sampling (≤ 1 s) during first 60 seconds"
+    }
+}
+
+# Urutan prioritas klasifikasi antar kanal
+_CLASS_PRIORITY = ["BEARING_LOOSENESS", "ELECTRICAL_UNBALANCE", "MECHANICAL_UNBALANCE", "INCONCLUSIVE"]
+
+
+def load_coastdown(source):
+    """
+    Baca profil coast-down dari CSV: kolom time/time_s (detik), rpm, dan satu kolom per kanal vibrasi (mm/s)
+
+    Returns:
+        dict: {"time": [...], "rpm": [...], "channels": {nama: [...]}}
+    """
+    frame = pd.read_csv(source)
+    columns = {str(c).lower(): c for c in frame.columns}
+    time_column = next(columns[c] for c in ["time", "time_s", "t"] if c in columns)
+    rpm_column = next(columns[c] for c in ["rpm", "speed", "speed_rpm"] if c in columns)
+    channels = [c for c in frame.columns if c not in [time_column, rpm_column]]
+    return {
+        "time": frame[time_column].to_numpy(dtype=float).tolist(),
+        "rpm": frame[rpm_column].to_numpy(dtype=float).tolist(),
+        "channels": {str(c): frame[c].to_numpy(dtype=float).tolist() for c in channels}
+    }
+
+
+def _shutdown_index(rpm):
+    """Sampel terakhir pada kecepatan operasi (sebelum RPM mulai turun > 1%)"""
+    running = rpm[0]
+    decaying = np.flatnonzero(rpm < running * 0.99)
+    return max(int(decaying[0]) - 1, 0) if len(decaying) else len(rpm) - 1
+
+
+def fit_speed_dependence(log_speed, log_vibration, mask):
+    """
+    Regresi least-squares log(vibrasi) = n·log(RPM/RPM_run) + c untuk semua kanal sekaligus
+
+    Args:
+        log_speed: array (N,), log_vibration & mask: array (C x N)
+
+    Returns:
+        tuple: (exponent n, R², jumlah sampel) per kanal
+    """
+    weight = mask.astype(float)
+    count = weight.sum(axis=1)
+    safe = np.maximum(count, 1)
+    x = np.broadcast_to(log_speed, log_vibration.shape)
+    y = np.where(mask, log_vibration, 0.0)
+    mean_x = (x * weight).sum(axis=1) / safe
+    mean_y = (y * weight).sum(axis=1) / safe
+    dx = (x - mean_x[:, None]) * weight
+    dy = (y - mean_y[:, None]) * weight
+    sxx = (dx ** 2).sum(axis=1)
+    sxy = (dx * dy).sum(axis=1)
+    syy = (dy ** 2).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(sxx > 0, sxy / sxx, 0.0)
+        r2 = np.where((sxx > 0) & (syy > 0), sxy ** 2 / (sxx * syy), 0.0)
+    return slope, r2, count.astype(int)
+
+
+def analyze_coastdown(time, rpm, channels, shutdown_time=None):
+    """
+    Klasifikasi profil coast-down per kanal + kesimpulan keseluruhan
+
+    Args:
+        time: waktu (detik), rpm: kecepatan per sampel, channels: {nama: vibrasi mm/s per sampel}
+        shutdown_time: waktu power off (default: deteksi dari awal penurunan RPM)
+
+    Returns:
+        dict: classification, root_cause, action, detail per kanal
+    """
+    time = np.asarray(time, dtype=float)
+    rpm = np.asarray(rpm, dtype=float)
+    names = list(channels.keys())
+    if len(time) < 3 or not names:
+        return {"available": False, "message": "Coast-down profile not available", "channels": {}}
+
+    order = np.argsort(time, kind="stable")
+    time, rpm = time[order], rpm[order]
+    vibration = np.vstack([np.asarray(channels[name], dtype=float)[order] for name in names])
+
+    if shutdown_time is None:
+        shutdown = _shutdown_index(rpm)
+    else:
+        shutdown = max(int(np.searchsorted(time, shutdown_time, side="right")) - 1, 0)
+    shutdown_at = time[shutdown]
+    running_rpm = float(rpm[:shutdown + 1].mean())
+    baseline = vibration[:, :shutdown + 1].mean(axis=1)
+    after = time > shutdown_at
+
+    # 1) Drop seketika saat RPM masih tinggi
+    immediate = after & (time <= shutdown_at + IMMEDIATE_WINDOW_S) & (rpm >= ELECTRICAL_SPEED_FRACTION * running_rpm)
+    dropped = (vibration < ELECTRICAL_DROP_LEVEL_MMS) | (vibration < ELECTRICAL_DROP_FRACTION * baseline[:, None])
+    immediate_drop = (dropped & immediate).any(axis=1) & (baseline > ELECTRICAL_DROP_LEVEL_MMS)
+
+    # 2) Ketergantungan terhadap kecepatan (fit log-log pada RPM >= batas persistensi)
+    fit_mask = after[None, :] & (rpm >= PERSISTENCE_RPM)[None, :] & (vibration > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_speed = np.log(np.where(rpm > 0, rpm, 1.0) / running_rpm)
+        log_vibration = np.log(np.where(vibration > 0, vibration, 1.0))
+    exponent, r2, fit_samples = fit_speed_dependence(log_speed, log_vibration, fit_mask)
+    follows_speed = (fit_samples >= 3) & (r2 >= MECHANICAL_MIN_R2) & (exponent >= MECHANICAL_MIN_EXPONENT)
+
+    # 3) Persistensi pada RPM sangat rendah
+    low_speed = after & (rpm < PERSISTENCE_RPM)
+    low_count = low_speed.sum()
+    low_speed_level = (vibration * low_speed).sum(axis=1) / max(low_count, 1)
+    persists = (low_count > 0) & (low_speed_level > PERSISTENCE_LEVEL_MMS)
+
+    # Resonansi saat coast-down
+    after_vibration = np.where(after[None, :], vibration, -np.inf)
+    peak_index = np.argmax(after_vibration, axis=1)
+    peak_level = vibration[np.arange(len(names)), peak_index]
+    resonance = after.any() & (peak_level > RESONANCE_FACTOR * baseline)
+
+    classification = np.where(
+        persists, "BEARING_LOOSENESS",
+        np.where(immediate_drop, "ELECTRICAL_UNBALANCE",
+                 np.where(follows_speed, "MECHANICAL_UNBALANCE", "INCONCLUSIVE"))
+    )
+
+    channel_results = {}
+    for i, name in enumerate(names):
+        channel_results[name] = {
+            "classification": str(classification[i]),
+            "baseline_mms": round(float(baseline[i]), 2),
+            "immediate_drop": bool(immediate_drop[i]),
+            "speed_exponent": round(float(exponent[i]), 2),
+            "fit_r2": round(float(r2[i]), 3),
+            "fit_samples": int(fit_samples[i]),
+            "low_speed_level_mms": round(float(low_speed_level[i]), 2) if low_count else None,
+            "resonance_rpm": round(float(rpm[peak_index[i]]), 0) if resonance[i] else None
+        }
+
+    # Kesimpulan: kelas paling kritis di antara kanal signifikan (baseline > 1.0 mm/s)
+    dominant = names[int(np.argmax(baseline))]
+    significant = [n for n in names if baseline[names.index(n)] > ELECTRICAL_DROP_LEVEL_MMS] or [dominant]
+    overall = min((channel_results[n]["classification"] for n in significant), key=_CLASS_PRIORITY.index)
+
+    return {
+        "available": True,
+        "classification": overall,
+        "root_cause": COASTDOWN_CLASSES[overall]["root_cause"],
+        "action": COASTDOWN_CLASSES[overall]["action"],
+        "dominant_channel": dominant,
+        "running_rpm": round(running_rpm, 0),
+        "shutdown_time_s": round(float(shutdown_at), 2),
+        "duration_s": round(float(time[-1] - shutdown_at), 1),
+        "channels": channel_results,
+        "standard": "API 610 Annex L.3.2 (power-off test)"
+    }
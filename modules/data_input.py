@@ -1,6 +1,13 @@
 """Form input data inspector - 64 field sesuai standar"""
+from datetime import datetime
+
 import streamlit as st
-from utils.lookup_tables import PRODUCT_PROPERTIES, FAULT_MAPPING
+from utils.lookup_tables import PRODUCT_PROPERTIES, FAULT_MAPPING, BEARING_CATALOG, BEARING_POSITIONS
+from modules.signal_processing import (
+    load_uploaded_waveform, waveform_to_peaks, peaks_to_fft_data, demodulate_waveform,
+    hf_band_rms_waveform
+)
+from modules.coastdown_analysis import load_coastdown
 
 
 def render_specification_form():
@@ -53,12 +60,27 @@ def render_specification_form():
             help="Kecepatan rated motor/pompa (IEC 60034-1 §4.2: slip calculation)"
         )
     
+    # Bearing terpasang: frekuensi defect BPFO/BPFI/BSF/FTF dihitung dari geometri katalog
+    bearings = {}
+    bearing_columns = st.columns(len(BEARING_POSITIONS))
+    for column, position in zip(bearing_columns, BEARING_POSITIONS):
+        with column:
+            designation = st.selectbox(
+                f"Bearing {position.replace('_', ' ').upper()}",
+                options=["Unknown"] + list(BEARING_CATALOG.keys()),
+                index=0,
+                key=f"bearing_{position}",
+                help="Designation bearing (ISO 13373-3 Annex A: bearing defect frequencies)"
+            )
+            bearings[f"bearing_{position}"] = None if designation == "Unknown" else designation
+    
     return {
         "product_type": product_type,
         "foundation_type": foundation_type,
         "pump_size": pump_size,
         "installation_year": int(installation_year),
-        "rated_rpm": int(rated_rpm)
+        "rated_rpm": int(rated_rpm),
+        **bearings
     }
 
 
@@ -150,6 +172,9 @@ def render_vibration_input_motor():
         vibration_data["Demodulation_DE"] = demod_de
         vibration_data["Demodulation_NDE"] = demod_nde
     
+    # HF band & demodulasi dari waveform akselerasi mentah menggantikan input manual
+    vibration_data.update(render_acceleration_upload("motor"))
+    
     return vibration_data
 
 
@@ -241,6 +266,9 @@ def render_vibration_input_pump():
         vibration_data["Demodulation_DE"] = demod_de
         vibration_data["Demodulation_NDE"] = demod_nde
     
+    # HF band & demodulasi dari waveform akselerasi mentah menggantikan input manual
+    vibration_data.update(render_acceleration_upload("pump"))
+    
     return vibration_data
 
 
@@ -303,6 +331,9 @@ def render_fft_input_motor():
             fft_data[f"FFT_DE_A_Freq{i}"] = freq
             fft_data[f"FFT_DE_A_Amp{i}"] = amp
     
+    # Peak dari waveform mentah menggantikan input manual
+    fft_data.update(render_waveform_upload("motor"))
+    
     return fft_data
 
 
@@ -365,14 +396,159 @@ def render_fft_input_pump():
             fft_data[f"FFT_DE_A_Freq{i}"] = freq
             fft_data[f"FFT_DE_A_Amp{i}"] = amp
     
+    # Peak dari waveform mentah menggantikan input manual
+    fft_data.update(render_waveform_upload("pump"))
+    
     return fft_data
 
 
+def render_waveform_upload(component):
+    """
+    Upload waveform mentah (CSV/WAV/NPY) untuk DE-H & DE-A - peak dihitung otomatis
+    dan menggantikan input manual (ISO 13373-2 signal processing)
+    """
+    with st.expander("📂 Raw Waveform Upload (Optional) - auto peak extraction"):
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            units = st.radio(
+                "Waveform Units",
+                options=["velocity", "acceleration"],
+                format_func=lambda u: "Velocity (mm/s)" if u == "velocity" else "Acceleration (g)",
+                key=f"{component}_wave_units"
+            )
+        
+        with col2:
+            sample_rate = st.number_input(
+                "Sample Rate (Hz)",
+                min_value=0.0,
+                max_value=200000.0,
+                value=0.0,
+                step=100.0,
+                key=f"{component}_wave_fs",
+                help="Wajib untuk file .npy; CSV dengan kolom time & WAV membaca sample rate sendiri"
+            )
+        
+        with col3:
+            scale = st.number_input(
+                "Full-Scale / Gain",
+                min_value=0.0,
+                value=1.0,
+                step=0.1,
+                key=f"{component}_wave_scale",
+                help="Faktor skala sinyal (WAV dinormalisasi ke ±1.0 sebelum dikali faktor ini)"
+            )
+        
+        peaks_by_direction = {}
+        for direction, label in [("H", "DE Horizontal"), ("A", "DE Axial")]:
+            uploaded = st.file_uploader(
+                f"{label} waveform",
+                type=["csv", "wav", "npy", "npz"],
+                key=f"{component}_wave_{direction}"
+            )
+            if uploaded is None:
+                continue
+            try:
+                signal, fs = load_uploaded_waveform(uploaded, sample_rate=sample_rate or None, scale=scale)
+                peaks_by_direction[direction] = waveform_to_peaks(signal, fs, n_peaks=3, units=units)
+                st.caption(
+                    f"{label}: " + ", ".join(
+                        f"{p['frequency_hz']:.1f} Hz / {p['amplitude_mms']:.2f} mm/s"
+                        for p in peaks_by_direction[direction]
+                    )
+                )
+            except Exception as e:
+                st.error(f"❌ Cannot process {label} waveform: {str(e)}")
+        
+        return peaks_to_fft_data(peaks_by_direction, n_slots=3)
+
+
+def render_acceleration_upload(component):
+    """
+    Upload waveform akselerasi high-rate (g) untuk DE/NDE - RMS band HF 5-16 kHz
+    (API 610 §6.3.3) & envelope demodulation (ISO 15243 §5.2) dihitung blok-per-blok
+    """
+    with st.expander("📂 Acceleration Waveform - HF Band & Envelope Demodulation (Optional)"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            sample_rate = st.number_input(
+                "Sample Rate (Hz)",
+                min_value=0.0,
+                max_value=200000.0,
+                value=0.0,
+                step=1000.0,
+                key=f"{component}_demod_fs",
+                help="Wajib untuk file .npy; CSV dengan kolom time & WAV membaca sample rate sendiri"
+            )
+        
+        with col2:
+            scale = st.number_input(
+                "Full-Scale (g)",
+                min_value=0.0,
+                value=1.0,
+                step=0.1,
+                key=f"{component}_demod_scale",
+                help="Faktor skala sinyal (WAV dinormalisasi ke ±1.0 sebelum dikali faktor ini)"
+            )
+        
+        values = {}
+        for location in ["DE", "NDE"]:
+            uploaded = st.file_uploader(
+                f"{location} acceleration waveform",
+                type=["csv", "wav", "npy", "npz"],
+                key=f"{component}_demod_wave_{location}"
+            )
+            if uploaded is None:
+                continue
+            try:
+                hf = hf_band_rms_waveform(uploaded, sample_rate=sample_rate or None, scale=scale)
+                uploaded.seek(0)
+                demod = demodulate_waveform(uploaded, sample_rate=sample_rate or None, scale=scale)
+                values[f"HF_{location}"] = hf["overall_rms_g"]
+                values[f"HF_History_{location}"] = hf["block_rms_g"]
+                values[f"Demodulation_{location}"] = demod["demod_peak_g"]
+                st.caption(
+                    f"{location}: HF 5-16 kHz {hf['overall_rms_g']:.2f}g RMS "
+                    f"(max block {hf['max_block_rms_g']:.2f}g, {len(hf['block_rms_g'])} blocks) | "
+                    f"demod peak {demod['demod_peak_g']:.2f}g | envelope peaks: " + ", ".join(
+                        f"{p['frequency_hz']:.1f} Hz / {p['amplitude_g']:.3f} g"
+                        for p in demod["envelope_peaks"]
+                    )
+                )
+            except Exception as e:
+                st.error(f"❌ Cannot process {location} acceleration waveform: {str(e)}")
+        
+        return values
+
+
+def render_coastdown_upload():
+    """
+    Upload profil coast-down power-off test (CSV: time, rpm, kanal vibrasi mm/s)
+    untuk validasi otomatis mechanical vs electrical unbalance (API 610 Annex L.3.2)
+    """
+    with st.expander("📂 Coast-Down Profile - Power-Off Test (Optional)"):
+        uploaded = st.file_uploader(
+            "Coast-down CSV (kolom: time, rpm, DE_H, DE_V, ...)",
+            type=["csv"],
+            key="coastdown_csv"
+        )
+        if uploaded is None:
+            return None
+        try:
+            profile = load_coastdown(uploaded)
+            st.caption(f"{len(profile['time'])} samples, channels: {', '.join(profile['channels'])}")
+            return profile
+        except Exception as e:
+            st.error(f"❌ Cannot read coast-down profile: {str(e)}")
+            return None
+
+
 def render_operational_input():
     """Render form input operasional"""
     st.subheader("⚙️ Data Operasional")
     
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         suction_pressure = st.number_input(
@@ -404,10 +580,21 @@ def render_operational_input():
             help="Laju alir produk (API 610 Annex L: BEP verification)"
         )
     
+    with col4:
+        product_temperature = st.number_input(
+            "Product Temperature (°C)",
+            min_value=-20.0,
+            max_value=150.0,
+            value=25.0,
+            step=1.0,
+            help="Temperatur produk di suction (API MPMS 11.1 / Antoine: densitas & vapor pressure untuk NPSHa)"
+        )
+    
     return {
         "suction_pressure": suction_pressure,
         "discharge_pressure": discharge_pressure,
-        "flow_rate": flow_rate
+        "flow_rate": flow_rate,
+        "product_temperature": product_temperature
     }
 
 
@@ -530,6 +717,10 @@ def collect_all_inputs():
         pump_tag = st.text_input("Pump Tag", value="PT-XXX-001")
         inspector_name = st.text_input("Inspector Name")
         inspection_date = st.date_input("Inspection Date")
+        inspection_time = st.time_input(
+            "Inspection Time",
+            help="Re-measure pada hari yang sama (mis. MANDATORY RE-MEASURE 24-48 jam) tersimpan sebagai inspeksi terpisah"
+        )
         location = st.text_input("Location/Terminal", value="Integrated Terminal")
     
     st.title("Pump Diagnosis Tool - 100% Compliant with API/ISO/IEC Standards")
@@ -563,6 +754,14 @@ def collect_all_inputs():
     
     fft_pump = render_fft_input_pump()
     
+    coastdown = render_coastdown_upload()
+    
+    uncertainty_mode = st.checkbox(
+        "🎲 Uncertainty mode (Monte Carlo)",
+        value=False,
+        help="Propagasi ketidakpastian instrumen (JCGM 101): probabilitas setiap status dari 100.000 sampel"
+    )
+    
     st.markdown("---")
     col_submit, col_clear = st.columns(2)
     
@@ -580,6 +779,14 @@ def collect_all_inputs():
         "pump_nde": vibration_pump.get("HF_NDE", 0.0)
     }
     
+    # Time history HF per blok dari waveform upload (tidak disimpan di data vibrasi)
+    hf_history = {
+        f"{component}_{location.lower()}": vibration.pop(f"HF_History_{location}")
+        for component, vibration in [("motor", vibration_motor), ("pump", vibration_pump)]
+        for location in ["DE", "NDE"]
+        if f"HF_History_{location}" in vibration
+    }
+    
     # Prepare demodulation data structure
     demod_data = {
         "motor_de": vibration_motor.get("Demodulation_DE", 0.0),
@@ -592,7 +799,7 @@ def collect_all_inputs():
         "metadata": {
             "pump_tag": pump_tag,
             "inspector_name": inspector_name,
-            "inspection_date": inspection_date,
+            "inspection_date": datetime.combine(inspection_date, inspection_time),
             "location": location
         },
         "specification": spec_data,
@@ -605,9 +812,12 @@ def collect_all_inputs():
         "electrical": electrical_data,
         "thermal": thermal_data,
         "hf_band": hf_data,
+        "hf_history": hf_history,
         "demodulation": demod_data,
         "fft_motor": fft_motor,
         "fft_pump": fft_pump,
+        "coastdown": coastdown,
+        "uncertainty_mode": uncertainty_mode,
         "submit_clicked": submit_button,
         "clear_clicked": clear_button
     }
@@ -1,11 +1,43 @@
 """Engine diagnosa utama - causal hierarchy 100% compliant dengan API/ISO/IEC"""
-from utils.lookup_tables import DIAGNOSIS_PRIORITY, PRODUCT_PROPERTIES
+import re
 
+import numpy as np
 
-def analyze_fft_peaks(fft_data, rpm_actual, component="pump"):
+from modules.vibration_analysis import classify_order_peaks, bearing_order_table, CONFIDENCE_LEVELS
+from modules.action_rules import load_action_rules, evaluate_action_rules, follow_up_action
+from utils.calculations import calculate_bearing_frequencies
+from utils.lookup_tables import DIAGNOSIS_PRIORITY, DIAGNOSIS_THRESHOLDS, PRODUCT_PROPERTIES, BEARING_CATALOG
+
+_FFT_KEY_PATTERN = re.compile(r"^FFT_([A-Z]+)_([HVA])_Freq(\d+)$")
+
+
+def parse_fft_peaks(fft_data):
+    """
+    Ekstrak semua peak dari fft_data (key FFT_{lokasi}_{arah}_Freq{n} / Amp{n}, jumlah bebas)
+
+    Returns:
+        tuple: (freqs array, amps array, list (lokasi, arah) per peak)
+    """
+    freqs, amps, channels = [], [], []
+    for key, value in fft_data.items():
+        match = _FFT_KEY_PATTERN.match(key)
+        if not match:
+            continue
+        location, direction, index = match.groups()
+        freqs.append(value)
+        amps.append(fft_data.get(f"FFT_{location}_{direction}_Amp{index}", 0.0))
+        channels.append((location, direction))
+    return np.array(freqs, dtype=float), np.array(amps, dtype=float), channels
+
+
+def analyze_fft_peaks(fft_data, rpm_actual, component="pump", bearings=None):
     """
     Analisis peak frequency dari FFT spectrum sesuai ISO 13373-3 §6.2.2
     
+    Klasifikasi table-driven (FFT_ORDER_BANDS) untuk sembarang jumlah peak & kanal.
+    Jika designation bearing terpasang diketahui (BEARING_CATALOG), band BPFO/BPFI
+    generik diganti frekuensi defect dari geometri bearing.
+    
     Returns:
         dict: Hasil analisis FFT
     """
@@ -17,90 +49,28 @@ def analyze_fft_peaks(fft_data, rpm_actual, component="pump"):
         }
     
     rpm_hz = rpm_actual / 60.0
-    findings = []
+    freqs, amps, channels = parse_fft_peaks(fft_data)
     
-    # Analisis untuk DE Horizontal
-    for i in range(1, 4):
-        freq_key = f"FFT_DE_H_Freq{i}"
-        amp_key = f"FFT_DE_H_Amp{i}"
-        
-        peak_freq = fft_data.get(freq_key, 0.0)
-        peak_amp = fft_data.get(amp_key, 0.0)
-        
-        if peak_freq > 0.5 and peak_amp > 0.5:
-            ratio = peak_freq / rpm_hz if rpm_hz > 0 else 0
-            
-            # Identifikasi fault berdasarkan ratio terhadap RPM
-            if 0.95 <= ratio <= 1.05:
-                fault = "1x RPM - Unbalance (Impeller erosion/fouling)"
-                confidence = "HIGH" if peak_amp > 2.0 else "MEDIUM"
-            elif 1.95 <= ratio <= 2.05:
-                fault = "2x RPM - Misalignment (Coupling/pipe strain)"
-                confidence = "HIGH" if peak_amp > 2.0 else "MEDIUM"
-            elif 0.35 <= ratio <= 0.45:
-                fault = "BPFO - Outer Race Bearing Defect"
-                confidence = "MEDIUM"
-            elif 0.55 <= ratio <= 0.65:
-                fault = "BPFI - Inner Race Bearing Defect"
-                confidence = "MEDIUM"
-            elif 6.0 <= ratio <= 8.0:  # Typical vane pass untuk pompa centrifugal (5-7 vanes)
-                fault = "Vane Pass Frequency - Hydraulic Instability"
-                confidence = "MEDIUM"
-            else:
-                fault = f"Unknown ({ratio:.1f}x RPM)"
-                confidence = "LOW"
-            
-            findings.append({
-                "component": component,
-                "location": "DE",
-                "direction": "H",
-                "frequency_hz": round(peak_freq, 1),
-                "amplitude_mms": round(peak_amp, 2),
-                "ratio_to_rpm": round(ratio, 2),
-                "fault": fault,
-                "confidence": confidence
-            })
-    
-    # Analisis untuk DE Axial
-    for i in range(1, 4):
-        freq_key = f"FFT_DE_A_Freq{i}"
-        amp_key = f"FFT_DE_A_Amp{i}"
-        
-        peak_freq = fft_data.get(freq_key, 0.0)
-        peak_amp = fft_data.get(amp_key, 0.0)
-        
-        if peak_freq > 0.5 and peak_amp > 0.5:
-            ratio = peak_freq / rpm_hz if rpm_hz > 0 else 0
-            
-            if 0.95 <= ratio <= 1.05:
-                fault = "1x RPM - Unbalance (Impeller erosion/fouling)"
-                confidence = "HIGH" if peak_amp > 2.0 else "MEDIUM"
-            elif 1.95 <= ratio <= 2.05:
-                fault = "2x RPM - Misalignment (Coupling/pipe strain)"
-                confidence = "HIGH" if peak_amp > 2.0 else "MEDIUM"
-            elif 0.35 <= ratio <= 0.45:
-                fault = "BPFO - Outer Race Bearing Defect"
-                confidence = "MEDIUM"
-            elif 0.55 <= ratio <= 0.65:
-                fault = "BPFI - Inner Race Bearing Defect"
-                confidence = "MEDIUM"
-            elif 6.0 <= ratio <= 8.0:
-                fault = "Vane Pass Frequency - Hydraulic Instability"
-                confidence = "MEDIUM"
-            else:
-                fault = f"Unknown ({ratio:.1f}x RPM)"
-                confidence = "LOW"
-            
-            findings.append({
-                "component": component,
-                "location": "DE",
-                "direction": "A",
-                "frequency_hz": round(peak_freq, 1),
-                "amplitude_mms": round(peak_amp, 2),
-                "ratio_to_rpm": round(ratio, 2),
-                "fault": fault,
-                "confidence": confidence
-            })
+    designations = tuple(d for d in dict.fromkeys(bearings or []) if d in BEARING_CATALOG)
+    table = bearing_order_table(designations)
+    
+    significant = np.flatnonzero((freqs > 0.5) & (amps > 0.5))
+    ratios = freqs[significant] / rpm_hz
+    bands, confidences = classify_order_peaks(ratios, amps[significant], table)
+    
+    findings = []
+    for idx, ratio, band, confidence in zip(significant, ratios, bands, confidences):
+        location, direction = channels[idx]
+        findings.append({
+            "component": component,
+            "location": location,
+            "direction": direction,
+            "frequency_hz": round(float(freqs[idx]), 1),
+            "amplitude_mms": round(float(amps[idx]), 2),
+            "ratio_to_rpm": round(float(ratio), 2),
+            "fault": table["fault"][band] if band >= 0 else f"Unknown ({ratio:.1f}x RPM)",
+            "confidence": CONFIDENCE_LEVELS[confidence]
+        })
     
     return {
         "available": True,
@@ -109,6 +79,7 @@ def analyze_fft_peaks(fft_data, rpm_actual, component="pump"):
         "findings": findings,
         "count": len(findings),
         "has_issue": len(findings) > 0 and any(f["confidence"] in ["HIGH", "MEDIUM"] for f in findings),
+        "bearing_frequencies": {d: calculate_bearing_frequencies(d, rpm_actual) for d in designations},
         "standard": "ISO 13373-3 §6.2.2"
     }
 
@@ -127,8 +98,8 @@ def requires_power_off_test(primary_type, electrical_report):
     slip_pct = electrical_report.get("slip", {}).get("slip_pct", 100.0)
     
     electrical_ok = (
-        voltage_imbalance <= 2.0 and
-        current_imbalance <= 5.0 and
+        voltage_imbalance <= DIAGNOSIS_THRESHOLDS["voltage_imbalance_warning_pct"] and
+        current_imbalance <= DIAGNOSIS_THRESHOLDS["current_imbalance_warning_pct"] and
         load_pct <= 110.0 and
         slip_pct >= -2.0 and
         slip_pct <= 5.0
@@ -137,13 +108,17 @@ def requires_power_off_test(primary_type, electrical_report):
     return electrical_ok
 
 
-def prioritize_diagnosis(hydraulic_report, electrical_report, mechanical_report, thermal_report, fft_motor=None, fft_pump=None):
+def prioritize_diagnosis(hydraulic_report, electrical_report, mechanical_report, thermal_report, fft_motor=None, fft_pump=None,
+                         coastdown=None):
     """
     Prioritaskan diagnosa berdasarkan causal hierarchy
     
     API 610 12th Ed. Annex L.3.2:
     "Cavitation generates vibration that may be misinterpreted as mechanical defect. 
      Verify NPSHa and high-frequency vibration BEFORE mechanical intervention."
+    
+    Profil coast-down terekam (coastdown["available"]) sudah merupakan hasil power-off test:
+    klasifikasinya diteruskan ke action plan dan power-off test manual tidak diminta lagi.
     """
     issues = {}
     
@@ -238,9 +213,14 @@ def prioritize_diagnosis(hydraulic_report, electrical_report, mechanical_report,
         }
         requires_validation = False
     
+    coastdown_classification = coastdown["classification"] if coastdown and coastdown.get("available") else None
+    if coastdown_classification:
+        requires_validation = False
+    
     return {
         "primary_diagnosis": primary_diagnosis,
         "requires_power_off_test": requires_validation,
+        "coastdown_classification": coastdown_classification,
         "all_issues": sorted_issues,
         "issue_count": len(sorted_issues),
         "has_issues": len(sorted_issues) > 0
@@ -259,7 +239,7 @@ def calculate_age_risk_factor(installation_year, current_year=2026):
 
 
 def generate_action_plan(diagnosis_result, spec_data, metadata):
-    """Generate action plan berdasarkan diagnosis"""
+    """Generate action plan berdasarkan diagnosis (rule set deklaratif, lihat modules.action_rules)"""
     primary = diagnosis_result["primary_diagnosis"]
     primary_type = primary["type"]
     
@@ -274,267 +254,25 @@ def generate_action_plan(diagnosis_result, spec_data, metadata):
     # Age risk adjustment (ISO 55001 §8.2)
     age_risk_factor = calculate_age_risk_factor(installation_year)
     
-    if primary_type == "NORMAL":
-        risk_score = 0
-        risk_level = "LOW"
-        actions = [{
-            "priority": "ROUTINE",
-            "action": "Continue routine monitoring",
-            "timeline": "Next scheduled inspection",
-            "pic": "Maintenance Team",
-            "standard": "ISO 55001 §8.2"
-        }]
-    
-    elif primary_type == "HYDRAULIC":
-        report = primary["report"]
-        
-        if report["cavitation_risk"] == "HIGH":
-            base_risk = product_risk_factor * 5
-            risk_score = min(int(base_risk * age_risk_factor), 100)
-            risk_level = "CRITICAL"
-            
-            actions = [
-                {
-                    "priority": "CRITICAL",
-                    "action": f"⚠️ VOLATILE PRODUCT ({product_type}): Monitor seal temperature continuously - risk of seal failure",
-                    "timeline": "Continuous",
-                    "pic": "Operations Team",
-                    "standard": "API 682 §5.4.2"
-                },
-                {
-                    "priority": "IMMEDIATE",
-                    "action": f"Increase suction pressure or tank level to achieve NPSHa > {report['npshr'] + 1.0} m",
-                    "timeline": "< 4 hours" if product_type in ["Gasoline", "Avtur"] else "< 24 hours",
-                    "pic": "Operations Team",
-                    "standard": "API 610 §6.3.3"
-                },
-                {
-                    "priority": "HIGH",
-                    "action": "⚠️ MANDATORY RE-MEASURE: Re-measure vibration after hydraulic correction before mechanical intervention",
-                    "timeline": "24-48 hours",
-                    "pic": "Vibration Analyst",
-                    "standard": "API 610 Annex L.3.2"
-                }
-            ]
-        
-        elif report["flow_status"] != "NORMAL":
-            base_risk = product_risk_factor * 3
-            risk_score = min(int(base_risk * age_risk_factor), 100)
-            risk_level = "HIGH"
-            
-            actions = [
-                {
-                    "priority": "HIGH",
-                    "action": f"Adjust flow to 60-120% BEP ({0.6 * report['bep_flow']:.0f} - {1.2 * report['bep_flow']:.0f} m³/h)",
-                    "timeline": "< 24 hours",
-                    "pic": "Operations Team",
-                    "standard": "API 610 Annex L"
-                },
-                {
-                    "priority": "MEDIUM",
-                    "action": "⚠️ MANDATORY RE-MEASURE: Re-measure vibration after flow adjustment",
-                    "timeline": "< 7 days",
-                    "pic": "Vibration Analyst",
-                    "standard": "API 610 Annex L.3.2"
-                }
-            ]
-        
-        else:
-            base_risk = product_risk_factor * 2
-            risk_score = min(int(base_risk * age_risk_factor), 100)
-            risk_level = "MEDIUM"
-            actions = []
-    
-    elif primary_type == "ELECTRICAL":
-        report = primary["report"]
-        
-        if report["overall_status"] == "CRITICAL":
-            base_risk = product_risk_factor * 4
-            risk_score = min(int(base_risk * age_risk_factor), 100)
-            risk_level = "CRITICAL"
-            
-            actions = [
-                {
-                    "priority": "IMMEDIATE",
-                    "action": "Shut down motor - electrical imbalance or overload detected",
-                    "timeline": "< 2 hours",
-                    "pic": "Electrical Team",
-                    "standard": "IEC 60034-1 §4.2"
-                },
-                {
-                    "priority": "HIGH",
-                    "action": "Check power supply quality & motor winding",
-                    "timeline": "< 24 hours",
-                    "pic": "Electrical Team",
-                    "standard": "IEEE 43"
-                }
-            ]
-        
-        elif report["overall_status"] == "WARNING":
-            base_risk = product_risk_factor * 3
-            risk_score = min(int(base_risk * age_risk_factor), 100)
-            risk_level = "HIGH"
-            
-            actions = [
-                {
-                    "priority": "HIGH",
-                    "action": "Investigate voltage/current imbalance or slip abnormality",
-                    "timeline": "< 72 hours",
-                    "pic": "Electrical Team",
-                    "standard": "IEC 60034-1 §4.2"
-                },
-                {
-                    "priority": "MEDIUM",
-                    "action": "⚠️ MANDATORY RE-MEASURE: Re-measure vibration after electrical correction",
-                    "timeline": "< 7 days",
-                    "pic": "Vibration Analyst",
-                    "standard": "IEC 60034-1 §4.2"
-                }
-            ]
-        
-        else:
-            base_risk = product_risk_factor * 2
-            risk_score = min(int(base_risk * age_risk_factor), 100)
-            risk_level = "MEDIUM"
-            actions = []
-    
-    elif primary_type == "MECHANICAL":
-        report = primary["report"]
-        
-        actions = []
-        if diagnosis_result.get("requires_power_off_test", False):
-            actions.append({
-                "priority": "MEDIUM",
-                "action": "⚠️ POWER-OFF TEST REQUIRED: Differentiate electrical vs mechanical unbalance",
-                "timeline": "Before mechanical repair",
-                "pic": "Vibration Analyst",
-                "standard": "API 610 Annex L.3.2"
-            })
-        
-        if "findings" in report and report["findings"]:
-            base_risk = product_risk_factor * 3
-            risk_score = min(int(base_risk * age_risk_factor), 100)
-            risk_level = "HIGH"
-            
-            for finding in report["findings"]:
-                if finding["confidence"] in ["HIGH", "MEDIUM"]:
-                    actions.append({
-                        "priority": "HIGH" if finding["confidence"] == "HIGH" else "MEDIUM",
-                        "action": f"FFT Peak {finding['frequency_hz']} Hz ({finding['ratio_to_rpm']}x RPM): {finding['fault']}",
-                        "timeline": "< 7 days" if finding["confidence"] == "HIGH" else "< 14 days",
-                        "pic": "Vibration Analyst",
-                        "standard": "ISO 13373-3 §6.2.2"
-                    })
-        else:
-            if report["overall_zone"] == "D":
-                base_risk = product_risk_factor * 4
-                risk_score = min(int(base_risk * age_risk_factor), 100)
-                risk_level = "CRITICAL"
-                
-                actions.extend([
-                    {
-                        "priority": "IMMEDIATE",
-                        "action": f"Schedule shutdown - {report['primary_fault'].lower()} detected",
-                        "timeline": "< 72 hours",
-                        "pic": "Maintenance Team",
-                        "standard": "ISO 10816-3 Zone D"
-                    },
-                    {
-                        "priority": "HIGH",
-                        "action": f"Perform {report['primary_fault'].lower()} correction",
-                        "timeline": "< 7 days",
-                        "pic": "Maintenance Team",
-                        "standard": "API 686" if "Misalignment" in report['primary_fault'] else "ISO 1940-1"
-                    }
-                ])
-            
-            elif report["overall_zone"] == "C":
-                base_risk = product_risk_factor * 3
-                risk_score = min(int(base_risk * age_risk_factor), 100)
-                risk_level = "HIGH"
-                
-                actions.append({
-                    "priority": "HIGH",
-                    "action": f"Schedule {report['primary_fault'].lower()} correction",
-                    "timeline": "< 14 days",
-                    "pic": "Maintenance Team",
-                    "standard": "ISO 10816-3 Zone C"
-                })
-            
-            else:
-                base_risk = product_risk_factor * 2
-                risk_score = min(int(base_risk * age_risk_factor), 100)
-                risk_level = "MEDIUM"
-                actions = []
-    
-    elif primary_type == "THERMAL":
-        report = primary["report"]
-        
-        if report["overall_status"] == "CRITICAL":
-            base_risk = product_risk_factor * 4
-            risk_score = min(int(base_risk * age_risk_factor), 100)
-            risk_level = "CRITICAL"
-            
-            actions = [
-                {
-                    "priority": "IMMEDIATE",
-                    "action": "Shut down pump - bearing seizure imminent",
-                    "timeline": "< 2 hours",
-                    "pic": "Operations Team",
-                    "standard": "API 610 §11.3"
-                },
-                {
-                    "priority": "HIGH",
-                    "action": "Inspect & replace bearing if necessary",
-                    "timeline": "< 24 hours",
-                    "pic": "Maintenance Team",
-                    "standard": "ISO 15243"
-                }
-            ]
-        
-        elif report["overall_status"] in ["ALARM", "WARNING"]:
-            base_risk = product_risk_factor * 3
-            risk_score = min(int(base_risk * age_risk_factor), 100)
-            risk_level = "HIGH"
-            
-            actions = [
-                {
-                    "priority": "HIGH",
-                    "action": "Check bearing lubrication & cooling",
-                    "timeline": "< 72 hours",
-                    "pic": "Maintenance Team",
-                    "standard": "API 610 §11.3"
-                }
-            ]
-        
-        else:
-            base_risk = product_risk_factor * 2
-            risk_score = min(int(base_risk * age_risk_factor), 100)
-            risk_level = "MEDIUM"
-            actions = []
+    # Decision table dari data/action_rules.json (primary type, status/zone, product);
+    # hasil coast-down menjadi flag coastdown_<klasifikasi> untuk action ber-"when"/"unless"
+    flags = {"requires_power_off_test": diagnosis_result.get("requires_power_off_test", False)}
+    coastdown_classification = diagnosis_result.get("coastdown_classification")
+    if coastdown_classification:
+        flags[f"coastdown_{coastdown_classification.lower()}"] = True
+    
+    rules = load_action_rules()
+    risk_multiplier, risk_level, actions = evaluate_action_rules(
+        rules,
+        primary_type,
+        primary.get("report"),
+        product_type,
+        flags=flags
+    )
+    risk_score = min(int(product_risk_factor * risk_multiplier * age_risk_factor), 100)
     
-    else:
-        risk_score = 0
-        risk_level = "UNKNOWN"
-        actions = []
-    
-    if risk_score > 0 and not actions:
-        actions = [{
-            "priority": "ROUTINE",
-            "action": "Update asset register & schedule follow-up inspection",
-            "timeline": "After completion",
-            "pic": "Reliability Engineer",
-            "standard": "ISO 55001 §8.2"
-        }]
-    elif risk_score > 0:
-        if actions[-1].get("priority") != "ROUTINE":
-            actions.append({
-                "priority": "ROUTINE",
-                "action": "Update asset register & schedule follow-up inspection",
-                "timeline": "After completion",
-                "pic": "Reliability Engineer",
-                "standard": "ISO 55001 §8.2"
-            })
+    if risk_score > 0 and (not actions or actions[-1].get("priority") != "ROUTINE"):
+        actions.append(follow_up_action(rules))
     
     return {
         "risk_score": risk_score,
@@ -548,62 +286,31 @@ def generate_action_plan(diagnosis_result, spec_data, metadata):
     }
 
 
-def run_complete_diagnosis(input_data):
-    """Jalankan diagnosa lengkap dari input data - 100% causal hierarchy compliant"""
-    from modules.hydraulic_analysis import generate_hydraulic_report
-    from modules.electrical_analysis import generate_electrical_report
-    from modules.thermal_analysis import generate_thermal_report
-    from modules.mechanical_analysis import analyze_mechanical_conditions
+def run_complete_diagnosis(input_data, parallel=True, memoize=True):
+    """
+    Jalankan diagnosa lengkap dari input data - 100% causal hierarchy compliant
+    
+    Args:
+        parallel: Jalankan analyzer independen di thread pool analyzer (modules.analyzer_graph);
+                  False untuk worker batch/stream yang sudah paralel per record
+        memoize: Pakai ulang report analyzer yang slice input-nya tidak berubah (edit interaktif);
+                 False untuk worker batch/stream yang setiap record-nya berbeda
+    """
+    from modules.analyzer_graph import run_analyzers, analyzer_pool
     
     spec_data = input_data["specification"]
-    operational_data = input_data["operational"]
-    electrical_data = input_data["electrical"]
-    thermal_data = input_data["thermal"]
-    vibration_motor = input_data["vibration"]["motor"]
-    vibration_pump = input_data["vibration"]["pump"]
     metadata = input_data["metadata"]
     
-    # Ambil data tambahan
-    actual_rpm = input_data.get("rpm", None)
-    hf_data = input_data.get("hf_band", {})
-    demod_data = input_data.get("demodulation", {})
-    fft_motor = input_data.get("fft_motor", {})
-    fft_pump = input_data.get("fft_pump", {})
-    
-    # Analisis paralel semua komponen
-    hydraulic_report = generate_hydraulic_report(
-        operational_data,
-        spec_data,
-        hf_data
-    )
-    
-    electrical_report = generate_electrical_report(
-        electrical_data,
-        spec_data,
-        actual_rpm=actual_rpm
-    )
-    
-    thermal_report = generate_thermal_report(thermal_data)
-    
-    mechanical_report = analyze_mechanical_conditions(
-        vibration_motor,
-        vibration_pump,
-        spec_data["foundation_type"],
-        spec_data["product_type"]
-    )
-    
-    # FFT analysis (jika tersedia)
-    fft_motor_analysis = analyze_fft_peaks(
-        fft_motor,
-        rpm_actual=actual_rpm if actual_rpm else 2950,
-        component="motor"
-    )
-    
-    fft_pump_analysis = analyze_fft_peaks(
-        fft_pump,
-        rpm_actual=actual_rpm if actual_rpm else 2950,
-        component="pump"
-    )
+    # Analisis paralel semua komponen: analyzer independen berjalan bersamaan,
+    # FFT & spektrum menunggu kecepatan referensi (estimasi jika tachometer kosong);
+    # hanya analyzer yang slice input-nya berubah yang dihitung ulang
+    analyses, timings = run_analyzers(input_data, executor=analyzer_pool() if parallel else None, memoize=memoize)
+    hydraulic_report = analyses["hydraulic"]
+    electrical_report = analyses["electrical"]
+    thermal_report = analyses["thermal"]
+    mechanical_report = analyses["mechanical"]
+    fft_motor_analysis = analyses["fft_motor"]
+    fft_pump_analysis = analyses["fft_pump"]
     
     # === CAUSAL HIERARCHY: Hydraulic → Electrical → Mechanical → Thermal ===
     diagnosis_result = prioritize_diagnosis(
@@ -612,7 +319,8 @@ def run_complete_diagnosis(input_data):
         mechanical_report,
         thermal_report,
         fft_motor=fft_motor_analysis,
-        fft_pump=fft_pump_analysis
+        fft_pump=fft_pump_analysis,
+        coastdown=analyses["coastdown"]
     )
     
     action_plan = generate_action_plan(diagnosis_result, spec_data, metadata)
@@ -626,11 +334,15 @@ def run_complete_diagnosis(input_data):
             "thermal": thermal_report,
             "mechanical": mechanical_report,
             "fft_motor": fft_motor_analysis,
-            "fft_pump": fft_pump_analysis
+            "fft_pump": fft_pump_analysis,
+            "spectrum": analyses["spectrum"],
+            "speed": analyses["speed"],
+            "coastdown": analyses["coastdown"]
         },
         "diagnosis": diagnosis_result,
         "action_plan": action_plan,
-        "summary": generate_summary(diagnosis_result, action_plan)
+        "summary": generate_summary(diagnosis_result, action_plan),
+        "timings": timings
     }
 
 
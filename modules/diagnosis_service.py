@@ -0,0 +1,184 @@
+"""
+HTTP diagnosis service (asyncio, tanpa Streamlit) untuk integrasi SCADA & aplikasi mobile
+
+Endpoint:
+    GET  /health            -> status service
+    GET  /cache             -> isi & hit tier disk result cache
+    POST /diagnose          -> satu inspeksi (record datar atau nested input_data)
+    POST /diagnose/batch    -> array inspeksi (atau {"inspections": [...]})
+
+Kalkulasi CPU-bound dijalankan di ProcessPoolExecutor sehingga event loop tidak pernah blocking.
+"""
+import asyncio
+import functools
+import json
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+
+from modules.batch_runner import result_to_json
+from modules.diagnosis_engine import run_complete_diagnosis
+from modules.result_cache import DEFAULT_CACHE_PATH, cache_stats, cached_diagnosis
+from modules.stream_pipeline import to_input_data
+
+MAX_BODY_BYTES = 32 * 1024 * 1024
+BATCH_CHUNK_SIZE = 32
+
+# Path tier disk result cache (di-set oleh run_service & initializer worker, None = tanpa cache)
+_STATE = {"cache_path": None}
+
+
+def _init_worker(cache_path):
+    _STATE["cache_path"] = cache_path
+
+
+def diagnose_payload(record):
+    """Diagnosa satu record di worker dan kembalikan JSON string"""
+    input_data = to_input_data(record)
+    if _STATE["cache_path"]:
+        return result_to_json(cached_diagnosis(input_data, path=_STATE["cache_path"], parallel=False, memoize=False))
+    return result_to_json(run_complete_diagnosis(input_data, parallel=False, memoize=False))
+
+
+def diagnose_payload_chunk(records):
+    """Diagnosa sekumpulan record di worker - error per record tidak menggagalkan batch"""
+    results = []
+    for record in records:
+        try:
+            results.append(diagnose_payload(record))
+        except Exception as e:
+            results.append(json.dumps({"error": f"{type(e).__name__}: {e}"}))
+    return results
+
+
+def _response(status, body, keep_alive=True):
+    """Bangun HTTP/1.1 response dengan body JSON"""
+    payload = body.encode("utf-8")
+    headers = [
+        f"HTTP/1.1 {status.value} {status.phrase}",
+        "Content-Type: application/json; charset=utf-8",
+        f"Content-Length: {len(payload)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    return ("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + payload
+
+
+def _error(status, message, keep_alive=True):
+    return _response(status, json.dumps({"error": message}), keep_alive)
+
+
+async def handle_request(executor, method, path, body):
+    """Routing request - return (HTTPStatus, JSON string)"""
+    loop = asyncio.get_running_loop()
+
+    if method == "GET" and path == "/health":
+        return HTTPStatus.OK, json.dumps({"status": "ok"})
+
+    if method == "GET" and path == "/cache":
+        if not _STATE["cache_path"]:
+            return HTTPStatus.NOT_FOUND, json.dumps({"error": "Result cache disabled"})
+        # Query SQLite blocking - di thread pool default agar event loop tidak tertahan
+        stats = await loop.run_in_executor(None, cache_stats, _STATE["cache_path"])
+        return HTTPStatus.OK, json.dumps({key: stats[key] for key in ["disk_entries", "disk_bytes", "disk_hits_total"]})
+
+    if method != "POST" or path not in ["/diagnose", "/diagnose/batch"]:
+        return HTTPStatus.NOT_FOUND, json.dumps({"error": f"No route for {method} {path}"})
+
+    try:
+        payload = json.loads(body or b"null")
+    except ValueError as e:
+        return HTTPStatus.BAD_REQUEST, json.dumps({"error": f"Invalid JSON: {e}"})
+
+    if path == "/diagnose":
+        if not isinstance(payload, dict):
+            return HTTPStatus.BAD_REQUEST, json.dumps({"error": "Expected a JSON object"})
+        try:
+            return HTTPStatus.OK, await loop.run_in_executor(executor, diagnose_payload, payload)
+        except Exception as e:
+            return HTTPStatus.UNPROCESSABLE_ENTITY, json.dumps({"error": f"{type(e).__name__}: {e}"})
+
+    records = payload.get("inspections") if isinstance(payload, dict) else payload
+    if not isinstance(records, list):
+        return HTTPStatus.BAD_REQUEST, json.dumps({"error": "Expected a JSON array of inspections"})
+
+    chunks = [records[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(records), BATCH_CHUNK_SIZE)]
+    chunk_results = await asyncio.gather(*[
+        loop.run_in_executor(executor, diagnose_payload_chunk, chunk) for chunk in chunks
+    ])
+    return HTTPStatus.OK, "[" + ",".join(r for chunk in chunk_results for r in chunk) + "]"
+
+
+async def handle_connection(executor, reader, writer):
+    """Proses request HTTP/1.1 (keep-alive) pada satu koneksi"""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+
+            try:
+                method, target, version = request_line.decode("latin-1").split()
+            except ValueError:
+                writer.write(_error(HTTPStatus.BAD_REQUEST, "Malformed request line", keep_alive=False))
+                break
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in [b"\r\n", b"\n", b""]:
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            keep_alive = (
+                headers.get("connection", "").lower() != "close"
+                and version.upper() == "HTTP/1.1"
+            )
+
+            try:
+                length = int(headers.get("content-length", 0) or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                writer.write(_error(HTTPStatus.BAD_REQUEST, "Invalid Content-Length", keep_alive=False))
+                break
+            if length > MAX_BODY_BYTES:
+                writer.write(_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large", keep_alive=False))
+                break
+            body = await reader.readexactly(length) if length else b""
+
+            status, response_body = await handle_request(executor, method.upper(), target.split("?")[0], body)
+            writer.write(_response(status, response_body, keep_alive))
+            await writer.drain()
+
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(executor, host="127.0.0.1", port=8080):
+    """Start asyncio server dan layani request sampai dibatalkan"""
+    server = await asyncio.start_server(
+        functools.partial(handle_connection, executor), host, port
+    )
+    async with server:
+        await server.serve_forever()
+
+
+def run_service(host="127.0.0.1", port=8080, workers=None, cache_path=DEFAULT_CACHE_PATH):
+    """
+    Jalankan HTTP diagnosis service sampai dihentikan (Ctrl+C)
+
+    Args:
+        cache_path: database tier disk result cache bersama antar worker (None = tanpa cache)
+    """
+    _init_worker(cache_path)
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache_path,))
+    try:
+        asyncio.run(serve(executor, host, port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -5,7 +5,7 @@ from utils.calculations import (
     calculate_load_percentage,
     calculate_motor_slip
 )
-from utils.lookup_tables import PUMP_SIZE_DEFAULTS
+from modules.asset_registry import asset_limits, rated_speed
 
 
 def analyze_electrical_conditions(
@@ -17,10 +17,11 @@ def analyze_electrical_conditions(
     current_l3,
     pump_size,
     rated_rpm=None,
-    actual_rpm=None
+    actual_rpm=None,
+    asset=None
 ):
-    """Analisis kondisi listrik motor"""
-    fla = PUMP_SIZE_DEFAULTS[pump_size]["fla_a"]
+    """Analisis kondisi listrik motor (FLA dari registry aset jika pompa terdaftar)"""
+    fla = asset_limits(asset, pump_size)["fla_a"]
     
     v_imbalance, v_status = calculate_voltage_imbalance(voltage_l1, voltage_l2, voltage_l3)
     i_imbalance, i_status = calculate_current_imbalance(current_l1, current_l2, current_l3)
@@ -102,8 +103,8 @@ def analyze_electrical_conditions(
     }
 
 
-def generate_electrical_report(electrical_data, spec_data, actual_rpm=None):
-    """Generate laporan analisis listrik"""
+def generate_electrical_report(electrical_data, spec_data, actual_rpm=None, asset=None):
+    """Generate laporan analisis listrik (rated speed dari registry aset jika pompa terdaftar)"""
     v1 = electrical_data.get("voltage_l1", 380.0)
     v2 = electrical_data.get("voltage_l2", 380.0)
     v3 = electrical_data.get("voltage_l3", 380.0)
@@ -113,7 +114,7 @@ def generate_electrical_report(electrical_data, spec_data, actual_rpm=None):
     i3 = electrical_data.get("current_l3", 0.0)
     
     pump_size = spec_data.get("pump_size", "Medium")
-    rated_rpm = spec_data.get("rated_rpm", None)
+    rated_rpm = rated_speed(asset, spec_data.get("rated_rpm", None))
     
     analysis = analyze_electrical_conditions(
         voltage_l1=v1,
@@ -124,7 +125,8 @@ def generate_electrical_report(electrical_data, spec_data, actual_rpm=None):
         current_l3=i3,
         pump_size=pump_size,
         rated_rpm=rated_rpm,
-        actual_rpm=actual_rpm
+        actual_rpm=actual_rpm,
+        asset=asset
     )
     
     return analysis
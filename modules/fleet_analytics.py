@@ -0,0 +1,204 @@
+"""
+Anomaly scoring multivariat fleet-wide - robust Mahalanobis per peer group (ISO 13379-1 §5 data-driven)
+
+Setiap analyzer menilai subsistemnya sendiri terhadap threshold absolut. Di sini inspeksi
+terbaru tiap pompa dibandingkan dengan peer-nya (pump_size + product_type yang sama) pada
+seluruh fitur sekaligus, sehingga pompa yang lolos semua threshold tetapi berperilaku
+tidak seperti peer-nya tetap terlihat.
+"""
+import numpy as np
+import pandas as pd
+
+from modules.fleet_engine import run_fleet_diagnosis
+from modules.inspection_records import RECORD_DEFAULTS, input_data_to_record
+
+# Fitur (kolom output run_fleet_diagnosis) + skala minimum agar fitur yang hampir
+# konstan dalam satu peer group tidak menghasilkan z-score tak hingga
+ANOMALY_FEATURES = {
+    "npsha_margin": 0.5,
+    "flow_ratio": 0.05,
+    "voltage_imbalance_pct": 0.3,
+    "current_imbalance_pct": 0.5,
+    "load_pct": 3.0,
+    "slip_pct": 0.2,
+    "motor_max_mms": 0.3,
+    "pump_max_mms": 0.3,
+    "hf_max": 0.05,
+    "demod_max": 0.05,
+    "max_rise": 2.0
+}
+
+# Peer group lebih kecil dari ini digabung ke peer group pump_size, lalu ke seluruh fleet
+MIN_PEER_GROUP = 12
+
+# Winsorizing z-score sebelum estimasi kovarians (outlier tidak merusak kovarians peer)
+COVARIANCE_CLIP_Z = 3.0
+COVARIANCE_RIDGE = 0.05
+
+# Kuantil chi-square untuk flag outlier (z normal satu sisi, 0.999)
+OUTLIER_QUANTILE_Z = 3.09
+
+# Jumlah fitur penyumbang terbesar yang dilaporkan
+TOP_CONTRIBUTORS = 3
+
+
+def chi2_quantile(dof, z=OUTLIER_QUANTILE_Z):
+    """Kuantil chi-square via aproksimasi Wilson-Hilferty"""
+    factor = 2.0 / (9.0 * dof)
+    return dof * (1 - factor + z * np.sqrt(factor)) ** 3
+
+
+def feature_matrix(fleet_results):
+    """
+    Matriks fitur (N x F) dari hasil run_fleet_diagnosis; NaN (mis. slip tanpa RPM) = 0 setelah standardisasi
+
+    Returns:
+        np.ndarray
+    """
+    return np.column_stack([
+        pd.to_numeric(fleet_results[column], errors="coerce").to_numpy(dtype=float)
+        for column in ANOMALY_FEATURES
+    ])
+
+
+def peer_groups(pump_size, product_type, min_size=MIN_PEER_GROUP):
+    """
+    Label peer group per pompa: "size|product", fallback "size", lalu "fleet" jika terlalu kecil
+
+    Returns:
+        np.ndarray: Label (object) per baris
+    """
+    size = np.asarray(pump_size, dtype=str).astype(object)
+    labels = size + "|" + np.asarray(product_type, dtype=str).astype(object)
+    labels = np.where(_group_counts(labels) >= min_size, labels, size)
+    return np.where(_group_counts(labels) >= min_size, labels, "fleet").astype(object)
+
+
+def _group_counts(labels):
+    """Ukuran group untuk setiap baris"""
+    _, inverse, counts = np.unique(labels.astype(str), return_inverse=True, return_counts=True)
+    return counts[inverse.reshape(-1)]
+
+
+def robust_mahalanobis(features, floors):
+    """
+    Robust Mahalanobis distance untuk satu peer group
+
+    Standardisasi median/MAD, kovarians dari z-score yang di-winsorize, lalu d² = zᵀ Σ⁻¹ z.
+
+    Returns:
+        tuple: (d² per baris, kontribusi per fitur N x F)
+    """
+    median = np.nanmedian(features, axis=0)
+    mad = np.nanmedian(np.abs(features - median), axis=0) * 1.4826
+    scale = np.maximum(np.nan_to_num(mad), floors)
+    z = np.nan_to_num((features - np.nan_to_num(median)) / scale)
+
+    clipped = np.clip(z, -COVARIANCE_CLIP_Z, COVARIANCE_CLIP_Z)
+    covariance = np.atleast_2d(np.cov(clipped, rowvar=False)) if len(z) > 1 else np.eye(z.shape[1])
+    covariance += COVARIANCE_RIDGE * np.eye(z.shape[1])
+    weighted = np.linalg.solve(covariance, z.T).T
+
+    contribution = z * weighted
+    return contribution.sum(axis=1), contribution
+
+
+def score_fleet(fleet_results, pump_size, product_type, min_size=MIN_PEER_GROUP):
+    """
+    Skor anomali per pompa terhadap peer group-nya
+
+    Args:
+        fleet_results: DataFrame hasil run_fleet_diagnosis (satu baris per pompa)
+
+    Returns:
+        pd.DataFrame: peer_group, peer_size, anomaly_score (d²), anomaly_threshold,
+                      is_outlier, quiet_outlier (outlier tanpa issue threshold), top_features
+    """
+    features = feature_matrix(fleet_results)
+    floors = np.array(list(ANOMALY_FEATURES.values()))
+    names = np.array(list(ANOMALY_FEATURES))
+    groups = peer_groups(pump_size, product_type, min_size)
+
+    score = np.zeros(len(features))
+    contribution = np.zeros(features.shape)
+    peer_size = np.zeros(len(features), dtype=int)
+    for group in np.unique(groups.astype(str)):
+        rows = groups == group
+        score[rows], contribution[rows] = robust_mahalanobis(features[rows], floors)
+        peer_size[rows] = rows.sum()
+
+    threshold = chi2_quantile(features.shape[1])
+    is_outlier = score > threshold
+    ranking = np.argsort(-contribution, axis=1)[:, :TOP_CONTRIBUTORS]
+    top_features = [
+        ", ".join(names[index] for index in order if contribution[row, index] > 0) if is_outlier[row] else ""
+        for row, order in enumerate(ranking)
+    ]
+
+    return pd.DataFrame({
+        "peer_group": groups,
+        "peer_size": peer_size,
+        "anomaly_score": np.round(score, 2),
+        "anomaly_threshold": round(float(threshold), 2),
+        "is_outlier": is_outlier,
+        "quiet_outlier": is_outlier & (fleet_results["primary_type"].to_numpy() == "NORMAL"),
+        "top_features": top_features
+    }, index=fleet_results.index)
+
+
+def run_fleet_analytics(inspections, min_size=MIN_PEER_GROUP):
+    """
+    Diagnosa vectorized + skor anomali peer group untuk inspeksi terbaru seluruh fleet
+
+    Args:
+        inspections: DataFrame record datar (satu baris per pompa)
+
+    Returns:
+        pd.DataFrame: pump_tag + kolom run_fleet_diagnosis + kolom score_fleet
+                      (inspeksi dengan kolom error tidak di-skor, skornya NaN)
+    """
+    results = run_fleet_diagnosis(inspections)
+    valid = results["error"].isna().to_numpy() if "error" in results.columns else np.ones(len(results), dtype=bool)
+
+    def column(name):
+        if name not in inspections.columns:
+            return pd.Series(RECORD_DEFAULTS[name], index=inspections.index)
+        return inspections[name].where(inspections[name].notna(), RECORD_DEFAULTS[name]).astype(str)
+
+    scores = score_fleet(
+        results[valid], column("pump_size").to_numpy()[valid], column("product_type").to_numpy()[valid], min_size
+    ).reindex(results.index)
+    return pd.concat([column("pump_tag").rename("pump_tag"), results, scores], axis=1)
+
+
+def latest_rows(inspections):
+    """
+    Satu baris per pump_tag dari file inspeksi - terbaru per inspection_date (tanggal kosong
+    dianggap paling lama, tanggal sama -> baris terakhir di file), sama dengan latest_per_pump
+    history store. Baris tanpa pump_tag dipertahankan.
+
+    Returns:
+        pd.DataFrame: index 0..n-1
+    """
+    if "pump_tag" not in inspections.columns:
+        return inspections.reset_index(drop=True)
+    ordered = inspections
+    if "inspection_date" in inspections.columns:
+        dates = pd.to_datetime(inspections["inspection_date"], errors="coerce", format="mixed")
+        ordered = inspections.iloc[np.argsort(dates.fillna(pd.Timestamp.min).to_numpy(), kind="stable")]
+    tagged = ordered["pump_tag"].notna()
+    latest = ordered[tagged].drop_duplicates("pump_tag", keep="last")
+    return pd.concat([latest, ordered[~tagged]]).sort_index().reset_index(drop=True)
+
+
+def latest_inspections(conn):
+    """
+    Record datar inspeksi terbaru per pompa dari history store (yang menyimpan input)
+
+    Returns:
+        pd.DataFrame
+    """
+    from modules.history_store import latest_per_pump, load_input
+
+    records = [input_data_to_record(data) for data in (load_input(row) for row in latest_per_pump(conn)) if data]
+    return pd.DataFrame(records)
@@ -0,0 +1,570 @@
+"""
+Engine diagnosa fleet-wide (vectorized) - satu baris DataFrame per inspeksi
+
+Semua kalkulasi identik dengan jalur skalar (run_complete_diagnosis), tetapi
+dievaluasi sebagai operasi kolom NumPy sehingga ribuan pompa diproses sekaligus.
+"""
+import numpy as np
+import pandas as pd
+
+from modules.inspection_records import RECORD_DEFAULTS, VIBRATION_KEYS, FFT_KEYS, COMPONENTS, bearing_designation
+from modules.vibration_analysis import classify_order_peaks, bearing_order_table, ORDER_TABLE
+from modules.speed_estimation import search_window, SPEED_PEAK_MIN_AMPLITUDE, DEFAULT_RPM
+from modules.asset_registry import registry_tables, CURVE_GRID_POINTS
+from utils.fluid_properties import property_arrays
+from utils.lookup_tables import PUMP_SIZE_DEFAULTS, ISO_10816_3_LIMITS, BEARING_CATALOG, DIAGNOSIS_THRESHOLDS
+
+ZONES = np.array(["A", "B", "C", "D"])
+
+
+def _round(values, ndigits):
+    """
+    Round identik dengan round() bawaan Python (round-half-even pada nilai desimal)
+
+    np.round bisa berbeda pada kasus tie karena error perkalian 10**n, sehingga
+    nilai yang mendekati .5 dihitung ulang dengan round() skalar.
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, ndigits)
+    scaled = values * 10.0 ** ndigits
+    near_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(float(v), ndigits) for v in values[near_tie]]
+    return rounded
+
+
+def _numeric(df, column, default=0.0):
+    """Ambil kolom numerik sebagai array float (kolom/NaN kosong = default)"""
+    if column not in df.columns:
+        return np.full(len(df), np.nan if default is None else default, dtype=float)
+    values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float)
+    if default is not None:
+        values = np.where(np.isnan(values), default, values)
+    return values
+
+
+def _text(df, column, default):
+    """Ambil kolom kategorikal sebagai array string (kolom/NaN kosong = default)"""
+    if column not in df.columns:
+        return np.full(len(df), default, dtype=object)
+    return df[column].where(df[column].notna(), default).astype(str).to_numpy(dtype=object)
+
+
+def _apply_unique(keys, func, dtype=float):
+    """Evaluasi func sekali per kategori unik lalu broadcast ke semua baris"""
+    unique, inverse = np.unique(np.asarray(keys, dtype=str), return_inverse=True)
+    values = np.array([func(k) for k in unique], dtype=dtype)
+    return values[inverse.reshape(-1)] if len(unique) else np.zeros(0, dtype=dtype)
+
+
+def _designations(df, column):
+    """Kolom designation bearing sebagai array string ("" = tidak di-assign), normalisasi sekali per nilai unik"""
+    if column not in df.columns:
+        return np.full(len(df), "", dtype=object)
+    codes, uniques = pd.factorize(df[column])
+    normalized = np.array([bearing_designation(u) or "" for u in uniques] + [""], dtype=object)
+    return normalized[codes]
+
+
+def _map(keys, table, field):
+    """Map array kategori ke nilai numerik via lookup table (KeyError jika tidak dikenal)"""
+    return _apply_unique(keys, lambda k: table[k][field])
+
+
+def category_errors(product, pump_size, pump_tag, thresholds=DIAGNOSIS_THRESHOLDS):
+    """
+    Validasi kolom kategorikal sebelum lookup tabel (jalur skalar: KeyError per inspeksi)
+
+    product_type harus ada di threshold HF cavitation; pump_size hanya dipakai (dan harus
+    dikenal) untuk pompa yang tidak terdaftar di asset registry.
+
+    Returns:
+        np.ndarray: Pesan error per inspeksi ("" = valid)
+    """
+    registered = registry_tables()["index"]
+    bad_product = _apply_unique(product, lambda p: p not in thresholds["hf_cavitation_g"], dtype=bool)
+    bad_size = _apply_unique(pump_size, lambda s: s not in PUMP_SIZE_DEFAULTS, dtype=bool)
+    bad_size &= _apply_unique(pump_tag, lambda tag: tag not in registered, dtype=bool)
+
+    errors = np.full(len(product), "", dtype=object)
+    errors[bad_size] = [f"unknown pump_size '{s}' (available: {', '.join(PUMP_SIZE_DEFAULTS)})" for s in pump_size[bad_size]]
+    errors[bad_product] = [
+        f"unknown product_type '{p}' (available: {', '.join(thresholds['hf_cavitation_g'])})" for p in product[bad_product]
+    ]
+    return errors
+
+
+def asset_limit_arrays(pump_tag, pump_size, flow):
+    """
+    Versi vectorized asset_limits: nameplate/kurva registry per pump_tag, fallback kelas ukuran
+
+    Returns:
+        dict: Array npshr_m, bep_flow_m3h, fla_a, rated_rpm (NaN = tidak ada di registry) per inspeksi
+    """
+    tables = registry_tables()
+    row = _apply_unique(pump_tag, lambda tag: tables["index"].get(tag, -1), dtype=int)
+    known = row >= 0
+    safe_row = np.where(known, row, 0)
+
+    limits = {}
+    for field in ["npshr_m", "bep_flow_m3h", "fla_a"]:
+        size_class = _map(pump_size, PUMP_SIZE_DEFAULTS, field).astype(float)
+        limits[field] = np.where(known, tables[field][safe_row], size_class) if len(tables["index"]) else size_class
+    limits["rated_rpm"] = np.where(known, tables["rated_rpm"][safe_row], np.nan) if len(tables["index"]) else np.full(len(row), np.nan)
+
+    if len(tables["index"]) and known.any():
+        grid = np.clip(np.rint(flow / tables["flow_step"][safe_row]), 0, CURVE_GRID_POINTS - 1).astype(int)
+        curve_npshr = tables["npshr_curve"][safe_row, grid]
+        use_curve = known & (flow > 0) & ~np.isnan(curve_npshr)
+        limits["npshr_m"] = np.where(use_curve, curve_npshr, limits["npshr_m"])
+    return limits
+
+
+def hydraulic_arrays(suction, discharge, flow, density, vapor_pressure, npshr, bep_flow,
+                     hf_threshold, hf_values):
+    """
+    Versi vectorized analyze_hydraulic_conditions (API 610 §6.3.3 & Annex L)
+
+    Returns:
+        dict: Array hasil per inspeksi
+    """
+    npsha = _round((suction + 101.3 - vapor_pressure) / (density * 0.00981), 2)
+    head = _round((discharge - suction) / (density * 0.00981), 1)
+
+    flow_ratio_raw = flow / bep_flow
+    flow_status = np.select(
+        [flow_ratio_raw < 0.6, flow_ratio_raw > 1.2],
+        ["RECIRCULATION_RISK", "OVERLOAD_CAVITATION_RISK"],
+        default="NORMAL"
+    ).astype(object)
+
+    hf_max = np.maximum.reduce(hf_values)
+    hf_high = hf_max > hf_threshold
+
+    npsha_margin = npsha - (npshr + 1.0)
+    confirmed = hf_high & (npsha_margin < 1.0)
+    low_margin = npsha_margin < 0
+
+    cavitation_risk = np.select(
+        [confirmed, hf_high | low_margin],
+        ["HIGH", "MEDIUM"],
+        default="LOW"
+    ).astype(object)
+
+    return {
+        "npsha": npsha,
+        "npshr": _round(npshr, 2),
+        "npsha_margin": _round(npsha_margin, 2),
+        "head": head,
+        "flow_ratio": _round(flow_ratio_raw, 2),
+        "flow_status": flow_status,
+        "hf_max": _round(hf_max, 2),
+        "hf_cavitation_risk": np.where(hf_high, "HIGH", "LOW").astype(object),
+        "cavitation_risk": cavitation_risk,
+        "hydraulic_has_issue": hf_high | low_margin
+    }
+
+
+def _imbalance(a, b, c, warning, alarm):
+    """Imbalance % = (Max - Min) / Average * 100 (IEC 60034-1 §4.2)"""
+    stacked = np.vstack([a, b, c])
+    average = (a + b + c) / 3
+    valid = average != 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        raw = np.where(valid, (stacked.max(axis=0) - stacked.min(axis=0)) / average * 100, 0.0)
+    status = np.select(
+        [~valid, raw > alarm, raw > warning],
+        ["INVALID", "ALARM", "WARNING"],
+        default="NORMAL"
+    ).astype(object)
+    return _round(raw, 1), status
+
+
+def electrical_arrays(voltages, currents, fla, rated_rpm, actual_rpm, thresholds=DIAGNOSIS_THRESHOLDS):
+    """
+    Versi vectorized analyze_electrical_conditions (IEC 60034-1 §4.2)
+
+    Slip hanya dihitung jika rated & actual RPM tersedia (non-zero), sama dengan jalur skalar.
+    thresholds: DIAGNOSIS_THRESHOLDS atau konfigurasi kandidat (backtest).
+
+    Returns:
+        dict: Array hasil per inspeksi
+    """
+    v_warning = thresholds["voltage_imbalance_warning_pct"]
+    i_warning = thresholds["current_imbalance_warning_pct"]
+    v_imbalance, v_status = _imbalance(*voltages, warning=v_warning, alarm=thresholds["voltage_imbalance_alarm_pct"])
+    i_imbalance, i_status = _imbalance(*currents, warning=i_warning, alarm=thresholds["current_imbalance_alarm_pct"])
+
+    i_avg = (currents[0] + currents[1] + currents[2]) / 3
+    load_raw = (i_avg / fla) * 100
+    load_status = np.select(
+        [load_raw > 125, load_raw > 110, load_raw < 80],
+        ["OVERLOAD_ALARM", "OVERLOAD_WARNING", "UNDERLOAD"],
+        default="NORMAL"
+    ).astype(object)
+
+    has_slip = (rated_rpm != 0) & (actual_rpm != 0)
+    slip_valid = has_slip & (rated_rpm > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slip_raw = np.where(slip_valid, ((rated_rpm - actual_rpm) / rated_rpm) * 100, 0.0)
+    slip_status = np.select(
+        [~has_slip, ~slip_valid, slip_raw > 8.0, slip_raw > 5.0, slip_raw < -2.0, slip_raw < 0],
+        ["", "INVALID", "CRITICAL_OVERLOAD", "HIGH_SLIP", "ABNORMAL", "LOW_SLIP"],
+        default="NORMAL"
+    ).astype(object)
+    slip_issue = slip_valid & ((slip_raw > 5.0) | (slip_raw < -2.0))
+    slip_pct = np.where(has_slip, _round(slip_raw, 2), np.nan)
+
+    critical = (v_status == "ALARM") | (i_status == "ALARM") | (load_status == "OVERLOAD_ALARM")
+    warning = (
+        (v_status == "WARNING") | (i_status == "WARNING") | (load_status == "OVERLOAD_WARNING")
+        | slip_issue | (load_status == "UNDERLOAD")
+    )
+    overall_status = np.select([critical, warning], ["CRITICAL", "WARNING"], default="NORMAL").astype(object)
+
+    load_pct = _round(load_raw, 1)
+
+    # Electrical OK untuk power-off test (API 610 Annex L.3.2) - slip kosong = 100% (tidak OK)
+    slip_for_check = np.where(has_slip, slip_pct, 100.0)
+    electrical_ok = (
+        (v_imbalance <= v_warning) & (i_imbalance <= i_warning) & (load_pct <= 110.0)
+        & (slip_for_check >= -2.0) & (slip_for_check <= 5.0)
+    )
+
+    return {
+        "voltage_imbalance_pct": v_imbalance,
+        "voltage_status": v_status,
+        "current_imbalance_pct": i_imbalance,
+        "current_status": i_status,
+        "load_pct": load_pct,
+        "load_status": load_status,
+        "slip_pct": slip_pct,
+        "slip_status": slip_status,
+        "electrical_status": overall_status,
+        "electrical_has_issue": overall_status != "NORMAL",
+        "electrical_ok": electrical_ok
+    }
+
+
+def _zone(values, foundation):
+    """Zona ISO 10816-3 per baris (foundation tidak dikenal = rigid)"""
+    limits = {
+        key: _apply_unique(foundation, lambda f: ISO_10816_3_LIMITS.get(f, ISO_10816_3_LIMITS["rigid"])[key])
+        for key in ["zone_a_max", "zone_b_max", "zone_c_max"]
+    }
+    index = np.select(
+        [values <= limits["zone_a_max"], values <= limits["zone_b_max"], values <= limits["zone_c_max"]],
+        [0, 1, 2],
+        default=3
+    )
+    return index
+
+
+def mechanical_arrays(motor, pump, foundation, thresholds=DIAGNOSIS_THRESHOLDS):
+    """
+    Versi vectorized analyze_mechanical_conditions (ISO 10816-3 & ISO 15243 §5.2)
+
+    Args:
+        motor, pump: dict key vibrasi (VIBRATION_KEYS) -> array
+        foundation: array string foundation type (lowercase)
+        thresholds: DIAGNOSIS_THRESHOLDS atau konfigurasi kandidat (backtest)
+
+    Returns:
+        dict: Array hasil per inspeksi
+    """
+    results = {}
+    zone_index = {}
+    for name, vib in [("motor", motor), ("pump", pump)]:
+        avg_h = (vib["DE_H"] + vib["NDE_H"]) / 2
+        avg_v = (vib["DE_V"] + vib["NDE_V"]) / 2
+        avg_a = (vib["DE_A"] + vib["NDE_A"]) / 2
+        overall_max = _round(np.maximum.reduce([avg_h, avg_v, avg_a]), 2)
+        zone_index[name] = _zone(overall_max, foundation)
+        results[f"{name}_max_mms"] = overall_max
+        results[f"{name}_zone"] = ZONES[zone_index[name]].astype(object)
+
+    overall_index = np.maximum(zone_index["motor"], zone_index["pump"])
+    demod_max = np.maximum.reduce([
+        motor["Demodulation_DE"], motor["Demodulation_NDE"],
+        pump["Demodulation_DE"], pump["Demodulation_NDE"]
+    ])
+    demod_warning = thresholds["demod_warning_g"]
+
+    normal = (
+        (overall_index <= 1)
+        & (results["motor_max_mms"] <= 2.8)
+        & (results["pump_max_mms"] <= 2.8)
+    )
+    primary_fault = np.select(
+        [normal, results["pump_max_mms"] > 2.8],
+        ["None (Vibration Normal)", "Unknown"],
+        default="Multiple Issues Detected"
+    ).astype(object)
+
+    results.update({
+        "overall_zone": ZONES[overall_index].astype(object),
+        "primary_component": np.where(
+            results["pump_max_mms"] > results["motor_max_mms"], "Pump (Driven)", "Motor (Driver)"
+        ).astype(object),
+        "primary_fault": primary_fault,
+        "demod_max": _round(demod_max, 2),
+        "bearing_defect_risk": np.select(
+            [demod_max > thresholds["demod_alarm_g"], demod_max > demod_warning], ["HIGH", "MEDIUM"], default="LOW"
+        ).astype(object),
+        "mechanical_has_issue": ~normal | (demod_max > demod_warning)
+    })
+    return results
+
+
+def thermal_arrays(temps, ambient, product_type, lubricant_type, thresholds=DIAGNOSIS_THRESHOLDS):
+    """
+    Versi vectorized analyze_thermal_conditions (API 610 §11.3 & API 682 §5.4.2)
+
+    Args:
+        temps: list array [motor_de, motor_nde, pump_de, pump_nde]
+        thresholds: DIAGNOSIS_THRESHOLDS atau konfigurasi kandidat (backtest)
+
+    Returns:
+        dict: Array hasil per inspeksi
+    """
+    grease = _apply_unique(lubricant_type, lambda lub: lub.lower() == "grease", dtype=bool)
+    warning_temp, alarm_temp, warning_rise, alarm_rise = (
+        np.where(grease, thresholds[f"grease_{limit}"], thresholds[f"oil_{limit}"])
+        for limit in ["warning_temp_c", "alarm_temp_c", "warning_rise_c", "alarm_rise_c"]
+    )
+
+    rises = [t - ambient for t in temps]
+    max_temp = np.maximum.reduce(temps)
+    max_rise = np.maximum.reduce(rises)
+
+    volatile = np.isin(product_type, ["Gasoline", "Avtur", "Naphtha"])
+    critical = (
+        (volatile & (rises[3] > thresholds["volatile_pump_nde_rise_c"]))
+        | (max_temp > alarm_temp) | (max_rise > alarm_rise)
+    )
+    alarm = (max_temp > warning_temp) | (max_rise > warning_rise)
+    status = np.select([critical, alarm], ["CRITICAL", "ALARM"], default="NORMAL").astype(object)
+
+    return {
+        "max_temperature": _round(max_temp, 1),
+        "max_rise": _round(max_rise, 1),
+        "delta_temp_pump": _round(np.abs(temps[2] - temps[3]), 1),
+        "thermal_status": status,
+        "thermal_has_issue": critical | alarm
+    }
+
+
+def fft_arrays(freqs, amps, rpm_actual, bearing_keys=None):
+    """
+    Versi vectorized analyze_fft_peaks (ISO 13373-3 §6.2.2)
+
+    Args:
+        freqs, amps: array 2D (n_inspeksi x n_peak)
+        rpm_actual: array RPM per inspeksi
+        bearing_keys: array key bearing terpasang per inspeksi ("6309|6310"), opsional;
+            klasifikasi dijalankan sekali per kombinasi bearing unik
+
+    Returns:
+        dict: Jumlah peak signifikan & flag has_issue per inspeksi
+    """
+    available = rpm_actual > 0
+    rpm_hz = rpm_actual / 60.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(available[:, None], freqs / rpm_hz[:, None], 0.0)
+    valid = (freqs > 0.5) & (amps > 0.5) & available[:, None]
+
+    classified = np.zeros_like(valid)
+    if bearing_keys is None:
+        classified = classify_order_peaks(ratio, amps)[1] > 0
+    else:
+        unique, inverse = np.unique(np.asarray(bearing_keys, dtype=str), return_inverse=True)
+        for index, key in enumerate(unique):
+            rows = inverse.reshape(-1) == index
+            designations = tuple(d for d in dict.fromkeys(key.split("|")) if d in BEARING_CATALOG)
+            table = bearing_order_table(designations) if designations else ORDER_TABLE
+            classified[rows] = classify_order_peaks(ratio[rows], amps[rows], table)[1] > 0
+
+    return {
+        "count": valid.sum(axis=1),
+        "has_issue": (valid & classified).any(axis=1)
+    }
+
+
+def speed_arrays(freqs, amps, rated_rpm):
+    """
+    Versi vectorized estimate_speed_from_peaks: peak FFT terbesar di jendela rated speed
+
+    Args:
+        freqs, amps: array 2D (n_inspeksi x semua peak motor+pump)
+
+    Returns:
+        np.ndarray: RPM estimasi (NaN jika tidak ada peak di jendela)
+    """
+    low, high = search_window(rated_rpm)
+    candidate = (
+        (freqs >= low[:, None]) & (freqs <= high[:, None])
+        & (amps > SPEED_PEAK_MIN_AMPLITUDE) & (rated_rpm > 0)[:, None]
+    )
+    masked = np.where(candidate, amps, -np.inf)
+    best = np.argmax(masked, axis=1) if freqs.shape[1] else np.zeros(len(freqs), dtype=int)
+    found = candidate.any(axis=1)
+    chosen = freqs[np.arange(len(freqs)), best] if freqs.shape[1] else np.zeros(len(freqs))
+    return np.where(found, _round(chosen * 60.0, 1), np.nan)
+
+
+def prioritize_arrays(hydraulic_issue, electrical_issue, fft_motor_issue, fft_pump_issue,
+                      mechanical_issue, thermal_issue, electrical_ok):
+    """
+    Versi vectorized prioritize_diagnosis - causal hierarchy API 610 Annex L.3.2
+
+    Returns:
+        dict: primary type, sumber issue, jumlah issue & flag power-off test
+    """
+    flags = [hydraulic_issue, electrical_issue, fft_motor_issue, fft_pump_issue, mechanical_issue, thermal_issue]
+    sources = ["HYDRAULIC", "ELECTRICAL", "MECHANICAL_FFT_MOTOR", "MECHANICAL_FFT_PUMP", "MECHANICAL", "THERMAL"]
+
+    primary_source = np.select(flags, sources, default="NORMAL").astype(object)
+    primary_type = np.select(
+        flags, ["HYDRAULIC", "ELECTRICAL", "MECHANICAL", "MECHANICAL", "MECHANICAL", "THERMAL"], default="NORMAL"
+    ).astype(object)
+
+    return {
+        "primary_type": primary_type,
+        "primary_source": primary_source,
+        "issue_count": np.sum(flags, axis=0),
+        "requires_power_off_test": (primary_type == "MECHANICAL") & electrical_ok
+    }
+
+
+def run_fleet_diagnosis(inspections, thresholds=None):
+    """
+    Jalankan diagnosa untuk seluruh fleet sekaligus (satu baris per inspeksi)
+
+    Kolom input mengikuti skema record datar (modules.inspection_records.RECORD_COLUMNS);
+    kolom yang tidak ada diisi dengan default yang sama dengan jalur skalar.
+    thresholds: konfigurasi threshold kandidat (None = DIAGNOSIS_THRESHOLDS)
+
+    Inspeksi dengan product_type / pump_size tidak dikenal tidak menghentikan run: seluruh
+    kolom hasilnya NaN dan kolom "error" (hanya ada jika ada baris invalid) berisi alasannya.
+
+    Returns:
+        pd.DataFrame: Hasil per inspeksi dengan index yang sama dengan input
+    """
+    df = inspections
+    n = len(df)
+    thresholds = thresholds or DIAGNOSIS_THRESHOLDS
+
+    product = _text(df, "product_type", RECORD_DEFAULTS["product_type"])
+    pump_size = _text(df, "pump_size", RECORD_DEFAULTS["pump_size"])
+    pump_tag = _text(df, "pump_tag", RECORD_DEFAULTS["pump_tag"])
+    errors = category_errors(product, pump_size, pump_tag, thresholds)
+    invalid = errors != ""
+    # Baris invalid dihitung dengan default lalu di-mask di akhir; pump_size pompa terdaftar
+    # tidak dipakai sehingga nilai yang tidak dikenal cukup diganti default
+    product = np.where(invalid, RECORD_DEFAULTS["product_type"], product)
+    pump_size = np.where(np.isin(pump_size, list(PUMP_SIZE_DEFAULTS)), pump_size, RECORD_DEFAULTS["pump_size"])
+    foundation = _apply_unique(_text(df, "foundation_type", RECORD_DEFAULTS["foundation_type"]), str.lower, dtype=object)
+    lubricant = _text(df, "lubricant_type", RECORD_DEFAULTS["lubricant_type"])
+
+    vibration = {
+        component: {key: _numeric(df, f"{component}_{key}") for key in VIBRATION_KEYS}
+        for component in COMPONENTS
+    }
+
+    suction = _numeric(df, "suction_pressure")
+    flow = _numeric(df, "flow_rate")
+    density, vapor_pressure = property_arrays(
+        product, _numeric(df, "product_temperature", RECORD_DEFAULTS["product_temperature"])
+    )
+    limits = asset_limit_arrays(pump_tag, pump_size, flow)
+    hydraulic = hydraulic_arrays(
+        suction=suction,
+        discharge=_numeric(df, "discharge_pressure"),
+        flow=flow,
+        density=density,
+        vapor_pressure=vapor_pressure,
+        npshr=limits["npshr_m"],
+        bep_flow=limits["bep_flow_m3h"],
+        hf_threshold=_apply_unique(product, lambda p: thresholds["hf_cavitation_g"][p]),
+        hf_values=[vibration[c][f"HF_{end}"] for c in COMPONENTS for end in ["DE", "NDE"]]
+    )
+
+    rpm = _numeric(df, "rpm", 0.0)
+    # Rated speed nameplate registry (jika terdaftar & diisi) menggantikan nilai spesifikasi
+    spec_rated_rpm = _numeric(df, "rated_rpm", RECORD_DEFAULTS["rated_rpm"])
+    registry_rated = ~np.isnan(limits["rated_rpm"]) & (limits["rated_rpm"] != 0)
+    electrical = electrical_arrays(
+        voltages=[_numeric(df, f"voltage_l{i}", RECORD_DEFAULTS[f"voltage_l{i}"]) for i in range(1, 4)],
+        currents=[_numeric(df, f"current_l{i}") for i in range(1, 4)],
+        fla=limits["fla_a"],
+        rated_rpm=np.where(registry_rated, limits["rated_rpm"], spec_rated_rpm),
+        actual_rpm=rpm,
+        thresholds=thresholds
+    )
+
+    mechanical = mechanical_arrays(vibration["motor"], vibration["pump"], foundation, thresholds)
+
+    thermal = thermal_arrays(
+        temps=[_numeric(df, key, RECORD_DEFAULTS[key]) for key in ["temp_motor_de", "temp_motor_nde", "temp_pump_de", "temp_pump_nde"]],
+        ambient=_numeric(df, "temp_ambient", RECORD_DEFAULTS["temp_ambient"]),
+        product_type=product,
+        lubricant_type=lubricant,
+        thresholds=thresholds
+    )
+
+    fft_peaks = {
+        component: (
+            np.column_stack([_numeric(df, f"{component}_{k}") for k in FFT_KEYS if "_Freq" in k]) if n else np.zeros((0, 6)),
+            np.column_stack([_numeric(df, f"{component}_{k}") for k in FFT_KEYS if "_Amp" in k]) if n else np.zeros((0, 6))
+        )
+        for component in COMPONENTS
+    }
+
+    # RPM kosong -> estimasi dari peak FFT, lalu rated speed (sama dengan estimate_running_speed)
+    rated_rpm = np.where(registry_rated, limits["rated_rpm"], np.trunc(spec_rated_rpm))
+    estimated_rpm = speed_arrays(
+        np.hstack([fft_peaks[c][0] for c in COMPONENTS]),
+        np.hstack([fft_peaks[c][1] for c in COMPONENTS]),
+        rated_rpm
+    )
+    fft_rpm = np.where(
+        rpm != 0, rpm,
+        np.where(~np.isnan(estimated_rpm), estimated_rpm, np.where(rated_rpm != 0, rated_rpm, float(DEFAULT_RPM)))
+    )
+    speed_source = np.where(
+        rpm != 0, "tachometer", np.where(~np.isnan(estimated_rpm), "fft_peaks", "assumed")
+    )
+
+    fft = {}
+    for component in COMPONENTS:
+        freqs, amps = fft_peaks[component]
+        bearing_keys = _designations(df, f"bearing_{component}_de") + "|" + _designations(df, f"bearing_{component}_nde")
+        fft[component] = fft_arrays(freqs, amps, fft_rpm, bearing_keys)
+
+    priority = prioritize_arrays(
+        hydraulic["hydraulic_has_issue"],
+        electrical["electrical_has_issue"],
+        fft["motor"]["has_issue"],
+        fft["pump"]["has_issue"],
+        mechanical["mechanical_has_issue"],
+        thermal["thermal_has_issue"],
+        electrical.pop("electrical_ok")
+    )
+
+    columns = {}
+    columns.update(hydraulic)
+    columns.update(electrical)
+    columns.update(mechanical)
+    columns.update(thermal)
+    columns["order_rpm"] = fft_rpm
+    columns["speed_source"] = speed_source
+    for component in COMPONENTS:
+        columns[f"fft_{component}_count"] = fft[component]["count"]
+        columns[f"fft_{component}_has_issue"] = fft[component]["has_issue"]
+    columns.update(priority)
+
+    results = pd.DataFrame(columns, index=df.index)
+    if invalid.any():
+        results = results.mask(np.broadcast_to(invalid[:, None], results.shape))
+        results["error"] = np.where(invalid, errors, None)
+    return results
@@ -0,0 +1,314 @@
+"""Penyimpanan histori inspeksi & hasil diagnosa di SQLite (WAL) - ISO 55001 §7.5 documented information"""
+import json
+import os
+import sqlite3
+from datetime import date, datetime, time, timedelta
+
+DEFAULT_DB_PATH = os.environ.get("PUMP_HISTORY_DB", "/tmp/pump_history.db")
+
+# Pointer inspeksi terbaru per pompa (terbaru = waktu inspeksi, lalu id) dijaga trigger pada setiap
+# insert/update/delete (DELETE + INSERT: OR REPLACE di dalam trigger ditimpa klausa ON CONFLICT
+# statement luar) - latest_per_pump & filter lokasi/zona/tipe tidak perlu scan seluruh histori
+_LATEST_REFRESH = """
+    DELETE FROM pump_latest WHERE pump_tag = {tag};
+    INSERT INTO pump_latest (pump_tag, inspection_id, inspection_date, location, overall_zone, primary_type)
+    SELECT pump_tag, id, inspection_date, location, overall_zone, primary_type FROM inspections
+    WHERE pump_tag = {tag} ORDER BY inspection_date DESC, id DESC LIMIT 1;
+"""
+
+# inspection_date = waktu inspeksi ISO (YYYY-MM-DD, atau YYYY-MM-DDTHH:MM:SS jika jam diketahui);
+# satu baris per pompa per waktu inspeksi: simpan ulang (batch re-run, submit ulang) = update,
+# re-measure di hari yang sama dengan jam berbeda = inspeksi baru
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS inspections (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pump_tag TEXT NOT NULL,
+    inspection_date TEXT,
+    location TEXT,
+    product_type TEXT,
+    pump_size TEXT,
+    primary_type TEXT,
+    overall_zone TEXT,
+    risk_level TEXT,
+    risk_score INTEGER,
+    input_json TEXT,
+    result_json TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    UNIQUE (pump_tag, inspection_date)
+);
+CREATE INDEX IF NOT EXISTS idx_inspections_date ON inspections (inspection_date);
+CREATE INDEX IF NOT EXISTS idx_inspections_location_zone ON inspections (location, overall_zone);
+CREATE INDEX IF NOT EXISTS idx_inspections_primary_type ON inspections (primary_type, inspection_date);
+CREATE TABLE IF NOT EXISTS pump_baselines (
+    pump_tag TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    mean REAL NOT NULL,
+    m2 REAL NOT NULL,
+    ewma REAL NOT NULL,
+    ewm_var REAL NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (pump_tag, metric)
+);
+CREATE TABLE IF NOT EXISTS pump_latest (
+    pump_tag TEXT PRIMARY KEY,
+    inspection_id INTEGER NOT NULL,
+    inspection_date TEXT,
+    location TEXT,
+    overall_zone TEXT,
+    primary_type TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pump_latest_location_zone ON pump_latest (location, overall_zone);
+CREATE INDEX IF NOT EXISTS idx_pump_latest_zone ON pump_latest (overall_zone);
+CREATE INDEX IF NOT EXISTS idx_pump_latest_primary_type ON pump_latest (primary_type);
+CREATE TRIGGER IF NOT EXISTS trg_pump_latest_insert AFTER INSERT ON inspections BEGIN
+    {insert}
+END;
+CREATE TRIGGER IF NOT EXISTS trg_pump_latest_update AFTER UPDATE ON inspections BEGIN
+    {update_old}
+    {update_new}
+END;
+CREATE TRIGGER IF NOT EXISTS trg_pump_latest_delete AFTER DELETE ON inspections BEGIN
+    {delete}
+END;
+""".format(
+    insert=_LATEST_REFRESH.format(tag="NEW.pump_tag"),
+    update_old=_LATEST_REFRESH.format(tag="OLD.pump_tag"),
+    update_new=_LATEST_REFRESH.format(tag="NEW.pump_tag"),
+    delete=_LATEST_REFRESH.format(tag="OLD.pump_tag")
+)
+
+# Field UI yang tidak disimpan
+_TRANSIENT_KEYS = ["submit_clicked", "clear_clicked", "uncertainty_mode"]
+
+
+def open_store(path=DEFAULT_DB_PATH):
+    """
+    Buka (atau buat) database histori dengan WAL mode
+
+    Returns:
+        sqlite3.Connection: Koneksi dengan row_factory sqlite3.Row
+    """
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _to_json(value):
+    return json.dumps(value, default=str, ensure_ascii=False)
+
+
+def _date_text(value):
+    """
+    Normalisasi waktu inspeksi ke ISO string yang bisa di-sort: YYYY-MM-DD (tanggal saja / jam
+    00:00) atau YYYY-MM-DDTHH:MM:SS - re-measure di hari yang sama tetap inspeksi terpisah
+    """
+    if value is None:
+        return None
+    if not isinstance(value, (datetime, date)):
+        text = str(value).strip()
+        try:
+            value = datetime.fromisoformat(text)
+        except ValueError:
+            return text[:10] if text else None
+    if not isinstance(value, datetime):
+        return value.isoformat()
+    value = value.replace(tzinfo=None)
+    return value.date().isoformat() if value.time() == time(0) else value.isoformat(timespec="seconds")
+
+
+def _next_day(text):
+    """Batas atas eksklusif untuk filter date_to berupa tanggal (mencakup semua jam di hari itu)"""
+    return (date.fromisoformat(text) + timedelta(days=1)).isoformat()
+
+
+def _row_values(result, input_data=None):
+    metadata = result.get("metadata", {})
+    specification = result.get("specification", {})
+    if input_data is not None:
+        input_data = {k: v for k, v in input_data.items() if k not in _TRANSIENT_KEYS}
+
+    return (
+        str(metadata.get("pump_tag") or "Unknown"),
+        _date_text(metadata.get("inspection_date")),
+        metadata.get("location"),
+        specification.get("product_type"),
+        specification.get("pump_size"),
+        result["diagnosis"]["primary_diagnosis"]["type"],
+        result["analyses"]["mechanical"]["overall_zone"],
+        result["action_plan"]["risk_level"],
+        result["action_plan"]["risk_score"],
+        _to_json(input_data) if input_data is not None else None,
+        _to_json(result),
+        datetime.now().isoformat(timespec="seconds")
+    )
+
+
+# Upsert pada (pump_tag, waktu inspeksi): inspeksi yang sama disimpan ulang menggantikan baris lama
+_INSERT = """
+INSERT INTO inspections (
+    pump_tag, inspection_date, location, product_type, pump_size,
+    primary_type, overall_zone, risk_level, risk_score,
+    input_json, result_json, created_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (pump_tag, inspection_date) DO UPDATE SET
+    location = excluded.location, product_type = excluded.product_type, pump_size = excluded.pump_size,
+    primary_type = excluded.primary_type, overall_zone = excluded.overall_zone,
+    risk_level = excluded.risk_level, risk_score = excluded.risk_score,
+    input_json = excluded.input_json, result_json = excluded.result_json, created_at = excluded.created_at
+"""
+
+
+def insert_result(conn, result, input_data=None):
+    """Upsert satu hasil diagnosa tanpa commit (caller mengatur transaksi) - return id baris"""
+    return conn.execute(_INSERT + " RETURNING id", _row_values(result, input_data)).fetchone()[0]
+
+
+def save_result(conn, result, input_data=None):
+    """Simpan (atau update, jika pompa & waktu inspeksi sudah ada) satu hasil diagnosa (+ input) - return id baris"""
+    with conn:
+        return insert_result(conn, result, input_data)
+
+
+def find_inspection(conn, result):
+    """
+    Baris tersimpan untuk pompa & waktu inspeksi yang sama dengan result
+
+    Returns:
+        sqlite3.Row atau None (juga None jika result tanpa waktu inspeksi)
+    """
+    metadata = result.get("metadata", {})
+    inspection_date = _date_text(metadata.get("inspection_date"))
+    if inspection_date is None:
+        return None
+    return conn.execute(
+        "SELECT * FROM inspections WHERE pump_tag = ? AND inspection_date = ?",
+        (str(metadata.get("pump_tag") or "Unknown"), inspection_date)
+    ).fetchone()
+
+
+def save_results(conn, items):
+    """
+    Bulk upsert dalam satu transaksi (inspeksi yang sudah tersimpan di-update)
+
+    Args:
+        items: iterable (result, input_data) atau result saja
+
+    Returns:
+        int: Jumlah baris yang disimpan / di-update
+    """
+    rows = (
+        _row_values(*item) if isinstance(item, tuple) else _row_values(item)
+        for item in items
+    )
+    with conn:
+        cursor = conn.executemany(_INSERT, rows)
+    return cursor.rowcount
+
+
+def _where(pump_tag=None, location=None, overall_zone=None, primary_type=None, date_from=None, date_to=None, prefix=""):
+    clauses = []
+    params = []
+    for column, value in [
+        ("pump_tag", pump_tag),
+        ("location", location),
+        ("overall_zone", overall_zone),
+        ("primary_type", primary_type)
+    ]:
+        if value is not None:
+            clauses.append(f"{prefix}{column} = ?")
+            params.append(value)
+    if date_from is not None:
+        clauses.append(f"{prefix}inspection_date >= ?")
+        params.append(_date_text(date_from))
+    if date_to is not None:
+        date_to = _date_text(date_to)
+        if len(date_to) == 10:
+            clauses.append(f"{prefix}inspection_date < ?")
+            params.append(_next_day(date_to))
+        else:
+            clauses.append(f"{prefix}inspection_date <= ?")
+            params.append(date_to)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def query_inspections(conn, pump_tag=None, location=None, overall_zone=None, primary_type=None,
+                      date_from=None, date_to=None, limit=None):
+    """
+    Query histori inspeksi, terbaru lebih dulu (contoh: semua pompa Zone D di terminal X)
+
+    Returns:
+        list: sqlite3.Row (kolom index + result_json)
+    """
+    where, params = _where(pump_tag, location, overall_zone, primary_type, date_from, date_to)
+    sql = f"SELECT * FROM inspections{where} ORDER BY inspection_date DESC, id DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    return conn.execute(sql, params).fetchall()
+
+
+def latest_per_pump(conn, location=None, overall_zone=None, primary_type=None):
+    """
+    Inspeksi terbaru per pompa (opsional filter lokasi/zona/tipe diagnosa pada inspeksi terbaru)
+
+    Dibaca dari pointer pump_latest (index lokasi/zona/tipe) lalu join ke inspections per id.
+
+    Returns:
+        list: sqlite3.Row, satu per pump_tag
+    """
+    where, params = _where(location=location, overall_zone=overall_zone, primary_type=primary_type, prefix="latest.")
+    sql = f"""
+        SELECT inspections.* FROM pump_latest AS latest
+        JOIN inspections ON inspections.id = latest.inspection_id{where}
+        ORDER BY latest.pump_tag
+    """
+    return conn.execute(sql, params).fetchall()
+
+
+def load_result(row):
+    """Decode result_json dari baris hasil query"""
+    return json.loads(row["result_json"])
+
+
+def load_input(row):
+    """Decode input_json dari baris hasil query (None jika tidak disimpan)"""
+    return json.loads(row["input_json"]) if row["input_json"] else None
+
+
+def load_baseline(conn, pump_tag):
+    """
+    Muat state baseline tren per metrik untuk satu pompa
+
+    Returns:
+        dict: metric -> {"count", "mean", "m2", "ewma", "ewm_var"}
+    """
+    rows = conn.execute(
+        "SELECT metric, count, mean, m2, ewma, ewm_var FROM pump_baselines WHERE pump_tag = ?",
+        (pump_tag,)
+    ).fetchall()
+    return {
+        row["metric"]: {key: row[key] for key in ["count", "mean", "m2", "ewma", "ewm_var"]}
+        for row in rows
+    }
+
+
+def save_baseline(conn, pump_tag, baseline):
+    """Upsert state baseline tren (tanpa commit - caller mengatur transaksi)"""
+    now = datetime.now().isoformat(timespec="seconds")
+    conn.executemany(
+        """
+        INSERT INTO pump_baselines (pump_tag, metric, count, mean, m2, ewma, ewm_var, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (pump_tag, metric) DO UPDATE SET
+            count = excluded.count, mean = excluded.mean, m2 = excluded.m2,
+            ewma = excluded.ewma, ewm_var = excluded.ewm_var, updated_at = excluded.updated_at
+        """,
+        [
+            (pump_tag, metric, s["count"], s["mean"], s["m2"], s["ewma"], s["ewm_var"], now)
+            for metric, s in baseline.items()
+        ]
+    )
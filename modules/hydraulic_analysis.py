@@ -4,7 +4,39 @@ from utils.calculations import (
     calculate_differential_head,
     calculate_flow_ratio
 )
-from utils.lookup_tables import PUMP_SIZE_DEFAULTS, PRODUCT_PROPERTIES
+from utils.lookup_tables import DIAGNOSIS_THRESHOLDS
+from modules.asset_registry import asset_limits, curve_value
+
+# Fraksi blok HF di atas threshold yang dianggap kavitasi intermiten (API 610 §6.3.3)
+HF_INTERMITTENT_FRACTION = 0.25
+
+
+def summarize_hf_history(hf_history, cavitation_threshold):
+    """
+    Ringkas time history RMS band HF per lokasi (dari signal_processing.hf_band_rms)
+
+    Args:
+        hf_history: {"motor_de": [rms_g per blok], ...}
+
+    Returns:
+        dict: Per lokasi blocks/mean/max/p95/exceed_pct + series asli untuk grafik
+    """
+    summary = {}
+    for location, series in hf_history.items():
+        values = [float(v) for v in series or []]
+        if not values:
+            continue
+        ordered = sorted(values)
+        exceed = sum(1 for v in values if v > cavitation_threshold)
+        summary[location] = {
+            "blocks": len(values),
+            "mean_g": round(sum(values) / len(values), 3),
+            "max_g": round(ordered[-1], 3),
+            "p95_g": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 3),
+            "exceed_pct": round(exceed / len(values) * 100, 1),
+            "block_rms_g": values
+        }
+    return summary
 
 
 def analyze_hydraulic_conditions(
@@ -16,7 +48,10 @@ def analyze_hydraulic_conditions(
     hf_5_16khz_motor_de=0.0,
     hf_5_16khz_motor_nde=0.0,
     hf_5_16khz_pump_de=0.0,
-    hf_5_16khz_pump_nde=0.0
+    hf_5_16khz_pump_nde=0.0,
+    hf_history=None,
+    asset=None,
+    product_temperature=25.0
 ):
     """
     Analisis kondisi hidraulis pompa + HF-based cavitation detection
@@ -24,14 +59,28 @@ def analyze_hydraulic_conditions(
     API 610 12th Ed. §6.3.3:
     "Monitor high-frequency vibration (5-16 kHz) as independent cavitation indicator — 
      independent of overall RMS vibration and NPSHa calculation."
+    
+    Batas NPSHr & BEP dari registry aset (kurva pabrikan) jika pompa terdaftar,
+    jika tidak dari kelas ukuran pump_size.
     """
-    npshr = PUMP_SIZE_DEFAULTS[pump_size]["npshr_m"]
-    bep_flow = PUMP_SIZE_DEFAULTS[pump_size]["bep_flow_m3h"]
+    limits = asset_limits(asset, pump_size, flow_rate)
+    npshr = limits["npshr_m"]
+    bep_flow = limits["bep_flow_m3h"]
     
     # Hitung NPSHa
-    npsha = calculate_npsha(suction_pressure, product_type)
-    head = calculate_differential_head(discharge_pressure, suction_pressure, product_type)
-    flow_ratio, flow_status = calculate_flow_ratio(flow_rate, pump_size)
+    npsha = calculate_npsha(suction_pressure, product_type, temperature_c=product_temperature)
+    head = calculate_differential_head(discharge_pressure, suction_pressure, product_type, temperature_c=product_temperature)
+    flow_ratio, flow_status = calculate_flow_ratio(flow_rate, bep_flow)
+    
+    # Kurva pabrikan (ISO 9906): head & efisiensi yang diharapkan pada flow aktual
+    expected_head = curve_value(asset, "head_m", flow_rate) if asset else None
+    curve_check = {}
+    if expected_head:
+        curve_check = {
+            "expected_head": round(expected_head, 1),
+            "head_deviation_pct": round((head - expected_head) / expected_head * 100, 1),
+            "expected_efficiency_pct": round(curve_value(asset, "efficiency_pct", flow_rate) or 0.0, 1)
+        }
     
     # === KRUSIAL: HF-BASED CAVITATION DETECTION (API 610 §6.3.3) ===
     hf_max = max(
@@ -42,7 +91,7 @@ def analyze_hydraulic_conditions(
     )
     
     # Threshold berbasis produk (API 682 §5.4.2: stricter for volatile hydrocarbons)
-    cavitation_threshold = PRODUCT_PROPERTIES[product_type]["hf_cavitation_threshold"]
+    cavitation_threshold = DIAGNOSIS_THRESHOLDS["hf_cavitation_g"][product_type]
     
     hf_cavitation_risk = "HIGH" if hf_max > cavitation_threshold else "LOW"
     hf_cavitation_status = (
@@ -51,6 +100,17 @@ def analyze_hydraulic_conditions(
         else f"✅ HF vibration {hf_max:.2f}g within normal range"
     )
     
+    # Time history HF (opsional): kavitasi intermiten bisa tersembunyi di nilai overall
+    hf_history_summary = summarize_hf_history(hf_history, cavitation_threshold) if hf_history else {}
+    if hf_history_summary and hf_cavitation_risk == "LOW":
+        location, worst = max(hf_history_summary.items(), key=lambda item: item[1]["exceed_pct"])
+        if worst["exceed_pct"] >= HF_INTERMITTENT_FRACTION * 100:
+            hf_cavitation_risk = "HIGH"
+            hf_cavitation_status = (
+                f"⚠️ HF vibration above {cavitation_threshold}g in {worst['exceed_pct']:.0f}% of blocks "
+                f"at {location} (peak {worst['max_g']:.2f}g) - intermittent cavitation likely"
+            )
+    
     # Safety margin untuk NPSHa (API 610 recommendation)
     safety_margin = 1.0
     npsha_margin = npsha - (npshr + safety_margin)
@@ -89,7 +149,8 @@ def analyze_hydraulic_conditions(
     
     return {
         "npsha": npsha,
-        "npshr": npshr,
+        "product_temperature": product_temperature,
+        "npshr": round(npshr, 2),
         "npsha_margin": round(npsha_margin, 2),
         "cavitation_risk": cavitation_risk,
         "cavitation_status": cavitation_status,
@@ -100,22 +161,26 @@ def analyze_hydraulic_conditions(
         "hf_motor_nde": round(hf_5_16khz_motor_nde, 2),
         "hf_pump_de": round(hf_5_16khz_pump_de, 2),
         "hf_pump_nde": round(hf_5_16khz_pump_nde, 2),
+        "hf_history": hf_history_summary,
         "head": head,
         "flow_rate": flow_rate,
         "bep_flow": bep_flow,
         "flow_ratio": flow_ratio,
         "flow_status": flow_status,
         "flow_recommendation": flow_recommendation,
+        **curve_check,
+        "limits_source": limits["source"],
         "has_issue": has_hydraulic_issue,
         "standard": "API 610 §6.3.3, API 682 §5.4.2"
     }
 
 
-def generate_hydraulic_report(operational_data, spec_data, hf_data):
-    """Generate laporan analisis hidraulis"""
+def generate_hydraulic_report(operational_data, spec_data, hf_data, hf_history=None, asset=None):
+    """Generate laporan analisis hidraulis (asset = entri registry aset jika pompa terdaftar)"""
     suction = operational_data.get("suction_pressure", 0.0)
     discharge = operational_data.get("discharge_pressure", 0.0)
     flow = operational_data.get("flow_rate", 0.0)
+    temperature = operational_data.get("product_temperature", 25.0)
     
     product = spec_data.get("product_type", "Diesel")
     pump_size = spec_data.get("pump_size", "Medium")
@@ -129,7 +194,10 @@ def generate_hydraulic_report(operational_data, spec_data, hf_data):
         hf_5_16khz_motor_de=hf_data.get("motor_de", 0.0),
         hf_5_16khz_motor_nde=hf_data.get("motor_nde", 0.0),
         hf_5_16khz_pump_de=hf_data.get("pump_de", 0.0),
-        hf_5_16khz_pump_nde=hf_data.get("pump_nde", 0.0)
+        hf_5_16khz_pump_nde=hf_data.get("pump_nde", 0.0),
+        hf_history=hf_history,
+        asset=asset,
+        product_temperature=temperature
     )
     
     return analysis
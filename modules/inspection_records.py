@@ -0,0 +1,185 @@
+"""Skema record inspeksi datar (satu baris per inspeksi) untuk batch & fleet processing"""
+import math
+
+from utils.lookup_tables import BEARING_POSITIONS
+
+
+# Field skalar record datar + default (sama dengan default form di data_input)
+RECORD_DEFAULTS = {
+    # Metadata
+    "pump_tag": "Unknown",
+    "inspector_name": "",
+    "inspection_date": None,
+    "location": "",
+    # Spesifikasi
+    "product_type": "Diesel",
+    "foundation_type": "rigid",
+    "pump_size": "Medium",
+    "installation_year": 2018,
+    "rated_rpm": 2950,
+    # Designation bearing terpasang (BEARING_CATALOG) - kosong = band bearing generik
+    "bearing_motor_de": None,
+    "bearing_motor_nde": None,
+    "bearing_pump_de": None,
+    "bearing_pump_nde": None,
+    # Operasional
+    "suction_pressure": 0.0,
+    "discharge_pressure": 0.0,
+    "flow_rate": 0.0,
+    "product_temperature": 25.0,
+    "rpm": None,
+    # Listrik
+    "voltage_l1": 380.0,
+    "voltage_l2": 380.0,
+    "voltage_l3": 380.0,
+    "current_l1": 0.0,
+    "current_l2": 0.0,
+    "current_l3": 0.0,
+    # Thermal
+    "temp_motor_de": 65.0,
+    "temp_motor_nde": 63.0,
+    "temp_pump_de": 68.0,
+    "temp_pump_nde": 72.0,
+    "temp_ambient": 30.0,
+    "lubricant_type": "grease"
+}
+
+METADATA_FIELDS = ["pump_tag", "inspector_name", "inspection_date", "location"]
+SPECIFICATION_FIELDS = ["product_type", "foundation_type", "pump_size", "installation_year", "rated_rpm"] + [
+    f"bearing_{position}" for position in BEARING_POSITIONS
+]
+OPERATIONAL_FIELDS = ["suction_pressure", "discharge_pressure", "flow_rate", "product_temperature"]
+ELECTRICAL_FIELDS = ["voltage_l1", "voltage_l2", "voltage_l3", "current_l1", "current_l2", "current_l3"]
+THERMAL_FIELDS = ["temp_motor_de", "temp_motor_nde", "temp_pump_de", "temp_pump_nde", "temp_ambient", "lubricant_type"]
+
+# Key vibrasi per komponen (kolom datar: "motor_DE_H", "pump_HF_DE", ...)
+VIBRATION_KEYS = [
+    "DE_H", "NDE_H", "DE_V", "NDE_V", "DE_A", "NDE_A",
+    "HF_DE", "HF_NDE", "Demodulation_DE", "Demodulation_NDE"
+]
+
+# Key FFT peak per komponen (kolom datar: "motor_FFT_DE_H_Freq1", ...)
+FFT_KEYS = [
+    f"FFT_DE_{direction}_{kind}{i}"
+    for direction in ["H", "A"]
+    for i in range(1, 4)
+    for kind in ["Freq", "Amp"]
+]
+
+COMPONENTS = ["motor", "pump"]
+
+RECORD_COLUMNS = (
+    list(RECORD_DEFAULTS.keys())
+    + [f"{component}_{key}" for component in COMPONENTS for key in VIBRATION_KEYS]
+    + [f"{component}_{key}" for component in COMPONENTS for key in FFT_KEYS]
+)
+
+
+def is_missing(value):
+    """True jika value kosong (None, NaN, atau string kosong)"""
+    if value is None:
+        return True
+    if isinstance(value, float) and math.isnan(value):
+        return True
+    if isinstance(value, str) and value.strip() == "":
+        return True
+    return False
+
+
+def _get(record, key, default):
+    value = record.get(key, default)
+    return default if is_missing(value) else value
+
+
+def _get_float(record, key, default=0.0):
+    value = _get(record, key, default)
+    return None if value is None else float(value)
+
+
+def bearing_designation(value):
+    """Normalisasi designation bearing (6309.0 dari CSV -> "6309", "nu210" -> "NU210"); kosong = None"""
+    if is_missing(value):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip().upper()
+
+
+def record_to_input_data(record):
+    """
+    Konversi record datar (dict / baris DataFrame) ke struktur input_data
+    yang sama dengan output collect_all_inputs()
+
+    Returns:
+        dict: input_data siap untuk run_complete_diagnosis
+    """
+    metadata = {key: _get(record, key, RECORD_DEFAULTS[key]) for key in METADATA_FIELDS}
+
+    spec_data = {
+        "product_type": str(_get(record, "product_type", RECORD_DEFAULTS["product_type"])),
+        "foundation_type": str(_get(record, "foundation_type", RECORD_DEFAULTS["foundation_type"])).lower(),
+        "pump_size": str(_get(record, "pump_size", RECORD_DEFAULTS["pump_size"])),
+        "installation_year": int(_get(record, "installation_year", RECORD_DEFAULTS["installation_year"])),
+        "rated_rpm": int(_get(record, "rated_rpm", RECORD_DEFAULTS["rated_rpm"])),
+        **{
+            f"bearing_{position}": bearing_designation(record.get(f"bearing_{position}"))
+            for position in BEARING_POSITIONS
+        }
+    }
+
+    operational_data = {key: _get_float(record, key, RECORD_DEFAULTS[key]) for key in OPERATIONAL_FIELDS}
+    electrical_data = {key: _get_float(record, key, RECORD_DEFAULTS[key]) for key in ELECTRICAL_FIELDS}
+
+    thermal_data = {key: _get_float(record, key, RECORD_DEFAULTS[key]) for key in THERMAL_FIELDS[:-1]}
+    thermal_data["product_type"] = spec_data["product_type"]
+    thermal_data["lubricant_type"] = str(_get(record, "lubricant_type", RECORD_DEFAULTS["lubricant_type"]))
+
+    vibration = {
+        component: {key: _get_float(record, f"{component}_{key}") for key in VIBRATION_KEYS}
+        for component in COMPONENTS
+    }
+    fft = {
+        component: {key: _get_float(record, f"{component}_{key}") for key in FFT_KEYS}
+        for component in COMPONENTS
+    }
+
+    return {
+        "metadata": metadata,
+        "specification": spec_data,
+        "vibration": vibration,
+        "operational": operational_data,
+        "rpm": _get_float(record, "rpm", None),
+        "electrical": electrical_data,
+        "thermal": thermal_data,
+        "hf_band": {
+            f"{component}_{end}": vibration[component][f"HF_{end.upper()}"]
+            for component in COMPONENTS
+            for end in ["de", "nde"]
+        },
+        "demodulation": {
+            f"{component}_{end}": vibration[component][f"Demodulation_{end.upper()}"]
+            for component in COMPONENTS
+            for end in ["de", "nde"]
+        },
+        "fft_motor": fft["motor"],
+        "fft_pump": fft["pump"]
+    }
+
+
+def input_data_to_record(input_data):
+    """Konversi input_data (nested) kembali ke record datar"""
+    record = {}
+    record.update({key: input_data["metadata"].get(key) for key in METADATA_FIELDS})
+    record.update({key: input_data["specification"].get(key) for key in SPECIFICATION_FIELDS})
+    record.update({key: input_data["operational"].get(key) for key in OPERATIONAL_FIELDS})
+    record["rpm"] = input_data.get("rpm")
+    record.update({key: input_data["electrical"].get(key) for key in ELECTRICAL_FIELDS})
+    record.update({key: input_data["thermal"].get(key) for key in THERMAL_FIELDS})
+
+    for component in COMPONENTS:
+        vibration = input_data["vibration"][component]
+        fft_data = input_data.get(f"fft_{component}", {})
+        record.update({f"{component}_{key}": vibration.get(key, 0.0) for key in VIBRATION_KEYS})
+        record.update({f"{component}_{key}": fft_data.get(key, 0.0) for key in FFT_KEYS})
+
+    return record
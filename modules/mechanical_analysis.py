@@ -4,7 +4,7 @@ from modules.vibration_analysis import (
     calculate_directional_averages,
     analyze_fault_patterns
 )
-from utils.lookup_tables import FAULT_MAPPING
+from utils.lookup_tables import FAULT_MAPPING, DIAGNOSIS_THRESHOLDS
 
 
 def analyze_mechanical_conditions(
@@ -48,9 +48,11 @@ def analyze_mechanical_conditions(
     
     demod_max = max(demod_motor_de, demod_motor_nde, demod_pump_de, demod_pump_nde)
     
-    bearing_defect_risk = "HIGH" if demod_max > 0.5 else "MEDIUM" if demod_max > 0.3 else "LOW"
+    demod_warning = DIAGNOSIS_THRESHOLDS["demod_warning_g"]
+    demod_alarm = DIAGNOSIS_THRESHOLDS["demod_alarm_g"]
+    bearing_defect_risk = "HIGH" if demod_max > demod_alarm else "MEDIUM" if demod_max > demod_warning else "LOW"
     bearing_defect_status = (
-        f"⚠️ Demodulation {demod_max:.2f}g > 0.5g - early bearing defect detected (ISO 15243 §5.2)"
+        f"⚠️ Demodulation {demod_max:.2f}g > {demod_alarm}g - early bearing defect detected (ISO 15243 §5.2)"
         if bearing_defect_risk == "HIGH"
         else f"✅ Demodulation {demod_max:.2f}g within normal range"
     )
@@ -100,7 +102,7 @@ def analyze_mechanical_conditions(
         has_issue = True
     
     # === Tambahkan bearing defect warning ke recommendations ===
-    if bearing_defect_risk in ["HIGH", "MEDIUM"] and demod_max > 0.3:
+    if bearing_defect_risk in ["HIGH", "MEDIUM"] and demod_max > demod_warning:
         recommendations.insert(0, 
             f"⚠️ Bearing defect risk ({bearing_defect_risk}): "
             f"Demodulation = {demod_max:.2f}g - schedule bearing inspection within 7 days (ISO 15243 §5.2)"
@@ -0,0 +1,119 @@
+"""
+Operating envelope pompa (what-if) - API 610 §6.3.3 & Annex L
+
+Grid suction pressure × flow rate (× temperatur produk) dievaluasi dalam satu pass vectorized
+dengan kalkulasi yang sama seperti analyze_hydraulic_conditions (fleet_engine.hydraulic_arrays),
+menghasilkan peta NPSHa margin, status flow, risiko kavitasi & batas operasi aman.
+"""
+import numpy as np
+
+from modules.asset_registry import asset_limits, curve_value
+from modules.fleet_engine import hydraulic_arrays
+from utils.fluid_properties import product_density, product_vapor_pressure
+from utils.lookup_tables import DIAGNOSIS_THRESHOLDS
+
+ENVELOPE_SUCTION_POINTS = 121
+ENVELOPE_FLOW_POINTS = 121
+
+# Rentang default: suction gauge (kPa) & flow sebagai fraksi BEP
+DEFAULT_SUCTION_RANGE_KPA = (0.0, 600.0)
+DEFAULT_FLOW_RANGE_BEP = (0.0, 1.5)
+
+# Batas flow Annex L (fraksi BEP), sama dengan calculate_flow_ratio
+MIN_FLOW_RATIO = 0.6
+MAX_FLOW_RATIO = 1.2
+
+
+def operating_envelope(product_type, pump_size="Medium", asset=None, suction_range=None, flow_range=None,
+                       temperatures=(25.0,), hf_max=0.0,
+                       suction_points=ENVELOPE_SUCTION_POINTS, flow_points=ENVELOPE_FLOW_POINTS):
+    """
+    Peta operasi aman untuk satu pompa
+
+    Args:
+        product_type, pump_size, asset: sama dengan analyze_hydraulic_conditions
+        suction_range: (min, max) kPa gauge; flow_range: (min, max) m³/h (default 0-150% BEP)
+        temperatures: temperatur produk (°C) yang dievaluasi
+        hf_max: HF 5-16 kHz terukur (g) untuk skenario kavitasi
+
+    Returns:
+        dict: Axis grid, array (temperatur x suction x flow) npsha_margin/flow_status/
+              cavitation_risk/safe, serta min_suction_kpa & min_tank_level_m (temperatur x flow)
+    """
+    limits = asset_limits(asset, pump_size)
+    bep_flow = limits["bep_flow_m3h"]
+    suction_range = suction_range or DEFAULT_SUCTION_RANGE_KPA
+    flow_range = flow_range or tuple(bep_flow * f for f in DEFAULT_FLOW_RANGE_BEP)
+
+    suction_axis = np.linspace(suction_range[0], suction_range[1], suction_points)
+    flow_axis = np.linspace(flow_range[0], flow_range[1], flow_points)
+    temperature_axis = np.asarray(temperatures, dtype=float).reshape(-1)
+
+    # NPSHr per titik flow: kurva registry (flow > 0) atau nameplate/kelas ukuran
+    npshr_axis = np.full(flow_points, limits["npshr_m"], dtype=float)
+    curve = curve_value(asset, "npshr_m", flow_axis) if asset else None
+    if curve is not None:
+        npshr_axis = np.where(flow_axis > 0, curve, npshr_axis)
+
+    density = product_density(product_type, temperature_axis)
+    vapor_pressure = product_vapor_pressure(product_type, temperature_axis)
+    suction, flow, density, vapor_pressure, npshr = np.broadcast_arrays(
+        suction_axis[None, :, None],
+        flow_axis[None, None, :],
+        np.reshape(density, (-1, 1, 1)),
+        np.reshape(vapor_pressure, (-1, 1, 1)),
+        npshr_axis[None, None, :]
+    )
+
+    hydraulic = hydraulic_arrays(
+        suction=suction,
+        discharge=suction,
+        flow=flow,
+        density=density,
+        vapor_pressure=vapor_pressure,
+        npshr=npshr,
+        bep_flow=bep_flow,
+        hf_threshold=DIAGNOSIS_THRESHOLDS["hf_cavitation_g"][product_type],
+        hf_values=[np.full(suction.shape, float(hf_max))]
+    )
+    safe = (hydraulic["cavitation_risk"] == "LOW") & (hydraulic["flow_status"] == "NORMAL")
+
+    # Suction minimum untuk NPSHa margin >= 0 (margin naik monoton terhadap suction)
+    adequate = hydraulic["npsha_margin"] >= 0
+    first = np.argmax(adequate, axis=1)
+    min_suction = np.where(adequate.any(axis=1), suction_axis[first], np.nan)
+
+    return {
+        "product_type": product_type,
+        "suction_kpa": suction_axis,
+        "flow_m3h": flow_axis,
+        "temperature_c": temperature_axis,
+        "npsha_margin": hydraulic["npsha_margin"],
+        "flow_status": hydraulic["flow_status"],
+        "cavitation_risk": hydraulic["cavitation_risk"],
+        "safe": safe,
+        "min_suction_kpa": min_suction,
+        # Level cairan di atas nozzle suction yang setara (head statis, rugi-rugi pipa diabaikan)
+        "min_tank_level_m": min_suction / (np.reshape(product_density(product_type, temperature_axis), (-1, 1)) * 0.00981),
+        "safe_flow_range_m3h": (MIN_FLOW_RATIO * bep_flow, MAX_FLOW_RATIO * bep_flow),
+        "bep_flow": bep_flow,
+        "limits_source": limits["source"],
+        "standard": "API 610 §6.3.3 & Annex L"
+    }
+
+
+def envelope_point(envelope, suction_kpa, flow_m3h, temperature_index=0):
+    """
+    Status titik operasi terdekat di grid envelope
+
+    Returns:
+        dict: npsha_margin, flow_status, cavitation_risk, safe
+    """
+    s = int(np.argmin(np.abs(envelope["suction_kpa"] - suction_kpa)))
+    f = int(np.argmin(np.abs(envelope["flow_m3h"] - flow_m3h)))
+    return {
+        "npsha_margin": float(envelope["npsha_margin"][temperature_index, s, f]),
+        "flow_status": envelope["flow_status"][temperature_index, s, f],
+        "cavitation_risk": envelope["cavitation_risk"][temperature_index, s, f],
+        "safe": bool(envelope["safe"][temperature_index, s, f])
+    }
@@ -1,4 +1,5 @@
 """Modul untuk generate laporan dengan compliance statement"""
+import math
 import streamlit as st
 import pandas as pd
 
@@ -33,6 +34,27 @@ def display_diagnosis_summary(diagnosis_result):
     secondary_note = diagnosis_result["diagnosis"]["primary_diagnosis"].get("secondary_note")
     if secondary_note:
         st.warning(secondary_note)
+    
+    # Deviasi terhadap baseline pompa sendiri (ISO 13373-1 §6)
+    trend = diagnosis_result.get("trend", {})
+    for message in trend.get("deviations", []):
+        st.warning(message)
+    
+    # Forecast RUL dari tren histori pompa (ISO 13381-1)
+    rul = diagnosis_result.get("rul", {})
+    if rul.get("rul_days") is not None:
+        st.info(
+            f"📉 Degradation forecast: {rul['rul_label']} in ~{rul['rul_days']:.0f} days "
+            f"(trend of last {rul['samples']} inspections)"
+        )
+    
+    # Kecepatan referensi analisis order jika tachometer kosong (ISO 13373-2 §6)
+    speed = diagnosis_result.get("analyses", {}).get("speed", {})
+    if speed and speed.get("source") != "tachometer":
+        st.info(
+            f"ℹ️ No tachometer reading - order analysis uses {speed['rpm']} RPM "
+            f"({speed['source'].replace('_', ' ')}, confidence {speed['confidence']})"
+        )
 
 
 def display_detailed_analysis(diagnosis_result):
@@ -70,6 +92,27 @@ def display_detailed_analysis(diagnosis_result):
             )
             st.markdown(f"*{hydraulic['hf_cavitation_status']}*")
         
+        if hydraulic.get("limits_source") == "asset_registry":
+            curve_note = (
+                f" | Expected head {hydraulic['expected_head']:.1f} m "
+                f"({hydraulic['head_deviation_pct']:+.1f}%), efficiency {hydraulic['expected_efficiency_pct']:.1f}%"
+                if "expected_head" in hydraulic else ""
+            )
+            st.caption(
+                f"Limits from asset registry: NPSHr {hydraulic['npshr']:.2f} m, BEP {hydraulic['bep_flow']:.0f} m³/h{curve_note}"
+            )
+        
+        if hydraulic.get("hf_history"):
+            st.markdown("**HF 5-16 kHz Time History (RMS per block)**")
+            st.line_chart(pd.DataFrame({
+                location: pd.Series(summary["block_rms_g"])
+                for location, summary in hydraulic["hf_history"].items()
+            }))
+            st.caption(" | ".join(
+                f"{location}: max {summary['max_g']:.2f}g, {summary['exceed_pct']:.0f}% blocks above threshold"
+                for location, summary in hydraulic["hf_history"].items()
+            ))
+        
         if hydraulic.get("has_issue"):
             st.warning("⚠️ **Hydraulic Issue Detected**")
             st.info(hydraulic['cavitation_status'])
@@ -186,6 +229,7 @@ def display_detailed_analysis(diagnosis_result):
     
     # Tab 5: FFT Motor
     with tabs[4]:
+        display_spectrum_evidence(analyses.get("spectrum", {}).get("motor"))
         fft_analysis = analyses.get("fft_motor", {})
         
         if not fft_analysis.get("available", False):
@@ -238,6 +282,7 @@ def display_detailed_analysis(diagnosis_result):
     
     # Tab 6: FFT Pump
     with tabs[5]:
+        display_spectrum_evidence(analyses.get("spectrum", {}).get("pump"))
         fft_analysis = analyses.get("fft_pump", {})
         
         if not fft_analysis.get("available", False):
@@ -289,10 +334,78 @@ def display_detailed_analysis(diagnosis_result):
                             st.warning("⚠️ MEDIUM CONFIDENCE - Monitor closely")
 
 
-def display_power_off_test_guidance(primary_issue, electrical_report):
+def display_spectrum_evidence(spectrum_analysis):
+    """Tampilkan evidence harmonic family & sideband dari spektrum penuh (ISO 13373-3 §6.2)"""
+    if not spectrum_analysis or not spectrum_analysis.get("available", False):
+        return
+    
+    st.markdown(
+        f"**Full Spectrum:** {spectrum_analysis['lines']} lines @ {spectrum_analysis['resolution_hz']} Hz, "
+        f"{spectrum_analysis['peak_count']} peaks above noise floor"
+    )
+    for item in spectrum_analysis["evidence"]:
+        message = (
+            f"**{item['fault']}** - harmonics {item['harmonics_matched']} of {item['fundamental_hz']} Hz"
+            + (f", {item['sidebands_matched']} sidebands" if item["sidebands_matched"] else "")
+        )
+        if item["confidence"] == "HIGH":
+            st.error(f"🔴 {message}")
+        elif item["confidence"] == "MEDIUM":
+            st.warning(f"🟠 {message}")
+        else:
+            st.info(f"ℹ️ {message}")
+    if spectrum_analysis["families"]:
+        st.dataframe(pd.DataFrame([
+            {
+                "Family": family["name"],
+                "Fundamental (Hz)": family["fundamental_hz"],
+                "Harmonics": ", ".join(str(h) for h in family["harmonics_matched"]),
+                "Sidebands": family["sidebands_matched"]
+            }
+            for family in spectrum_analysis["families"]
+        ]), use_container_width=True)
+    st.caption(f"**Standard:** {spectrum_analysis['standard']}")
+
+
+def display_coastdown_result(coastdown):
+    """Tampilkan klasifikasi otomatis profil coast-down (power-off test)"""
+    message = f"**Coast-Down Result:** {coastdown['root_cause']} → {coastdown['action']}"
+    if coastdown["classification"] == "MECHANICAL_UNBALANCE":
+        st.success(message)
+    elif coastdown["classification"] == "INCONCLUSIVE":
+        st.info(message)
+    else:
+        st.error(message)
+    
+    st.dataframe(pd.DataFrame([
+        {
+            "Channel": name,
+            "Result": channel["classification"],
+            "Baseline (mm/s)": channel["baseline_mms"],
+            "Immediate Drop": "✅" if channel["immediate_drop"] else "❌",
+            "Speed Exponent": channel["speed_exponent"],
+            "Fit R²": channel["fit_r2"],
+            "Level < 100 RPM (mm/s)": channel["low_speed_level_mms"],
+            "Resonance RPM": channel["resonance_rpm"]
+        }
+        for name, channel in coastdown["channels"].items()
+    ]), use_container_width=True)
+    st.caption(
+        f"Running speed {coastdown['running_rpm']:.0f} RPM, shutdown at t = {coastdown['shutdown_time_s']} s, "
+        f"{coastdown['duration_s']} s recorded | **Standard:** {coastdown['standard']}"
+    )
+
+
+def display_power_off_test_guidance(primary_issue, electrical_report, coastdown=None):
     """
     Tampilkan Power-Off Test Guidance jika diperlukan untuk validasi mechanical vs electrical unbalance
     """
+    # Profil coast-down terekam: tampilkan klasifikasi otomatis
+    if coastdown and coastdown.get("available"):
+        st.markdown("### 🔌 Power-Off Test Result (Coast-Down Profile)")
+        display_coastdown_result(coastdown)
+        return
+    
     # Cek apakah perlu power-off test validation
     requires_validation = False
     
@@ -369,7 +482,9 @@ def display_action_plan(action_plan, diagnosis_result=None):
     if diagnosis_result:
         primary_issue = action_plan.get("primary_issue", "NORMAL")
         electrical_report = diagnosis_result["analyses"].get("electrical", {})
-        display_power_off_test_guidance(primary_issue, electrical_report)
+        display_power_off_test_guidance(
+            primary_issue, electrical_report, diagnosis_result["analyses"].get("coastdown")
+        )
     
     actions = action_plan["actions"]
     
@@ -400,6 +515,8 @@ def display_action_plan(action_plan, diagnosis_result=None):
                     
                     with col1:
                         st.markdown(f"**Timeline:** {action['timeline']}")
+                        if action.get("timeline_basis"):
+                            st.caption(action["timeline_basis"])
                     
                     with col2:
                         st.markdown(f"**PIC:** {action['pic']}")
@@ -415,6 +532,118 @@ def display_action_plan(action_plan, diagnosis_result=None):
         st.info(f"ℹ️ **Age Adjustment (ISO 55001 §8.2):** Pump installed in {action_plan['installation_year']} ({age} years old). Risk score adjusted by {int((age_factor-1)*100)}% for age-related degradation.")
 
 
+def display_analyzer_timings(timings):
+    """Durasi per analyzer (DAG run_complete_diagnosis), report yang dipakai ulang dari memo + status result cache"""
+    source = f", cache {timings['cache']} {timings['lookup_ms']:.1f} ms" if "cache" in timings else ""
+    reused = timings.get("reused", [])
+    with st.expander(f"⏱️ Analyzer Timings ({timings['total_ms']:.1f} ms, {timings['mode']}, {len(reused)} reused{source})"):
+        st.dataframe(pd.DataFrame([
+            {"Analyzer": name, "Duration (ms)": duration, "Reused": name in reused}
+            for name, duration in timings["nodes"].items()
+        ]), use_container_width=True)
+
+
+def display_uncertainty(uncertainty):
+    """Probabilitas status dari propagasi ketidakpastian Monte Carlo (JCGM 101:2008)"""
+    st.subheader("🎲 Measurement Uncertainty")
+    st.caption(f"{uncertainty['samples']:,} Monte Carlo samples - {uncertainty['standard']}")
+    
+    confidence = uncertainty.get("primary_type_confidence")
+    if confidence is not None:
+        st.metric("Primary Diagnosis Confidence", f"{confidence * 100:.1f}%")
+    
+    st.dataframe(pd.DataFrame([
+        {
+            "Status": field.replace("_", " ").title(),
+            "Probabilities": ", ".join(f"{status} {p * 100:.1f}%" for status, p in probabilities.items())
+        }
+        for field, probabilities in uncertainty["probabilities"].items()
+    ]), use_container_width=True)
+    
+    st.dataframe(pd.DataFrame([
+        {"Parameter": field, "P5": low, "P50": median, "P95": high}
+        for field, (low, median, high) in uncertainty["intervals"].items()
+    ]), use_container_width=True)
+
+
+def display_operating_envelope(input_data):
+    """
+    What-if operating envelope (API 610 §6.3.3 & Annex L): peta suction × flow untuk
+    menetapkan batas level tangki & throughput per pompa
+    """
+    from modules.asset_registry import get_asset
+    from modules.operating_envelope import operating_envelope, envelope_point
+    
+    spec_data = input_data["specification"]
+    operational = input_data["operational"]
+    product = spec_data.get("product_type", "Diesel")
+    
+    with st.expander("🗺️ Operating Envelope (What-If)"):
+        asset = get_asset(input_data["metadata"].get("pump_tag"))
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            suction_range = st.slider("Suction Pressure Range (kPa)", 0.0, 1000.0, (0.0, 600.0), step=10.0)
+        with col2:
+            flow_max = st.number_input("Max Flow (m³/h)", min_value=10.0, max_value=2000.0, value=300.0, step=10.0)
+        with col3:
+            temperature_text = st.text_input(
+                "Product Temperatures (°C)",
+                value=f"{operational.get('product_temperature', 25.0):g}",
+                help="Pisahkan dengan koma untuk membandingkan beberapa temperatur, mis. 25, 40"
+            )
+        temperatures, invalid_temperatures = [], []
+        for token in (t.strip() for t in temperature_text.replace(";", ",").split(",")):
+            if not token:
+                continue
+            try:
+                value = float(token)
+            except ValueError:
+                value = float("nan")
+            if math.isfinite(value):
+                temperatures.append(value)
+            else:
+                invalid_temperatures.append(token)
+        if invalid_temperatures:
+            st.warning(f"⚠️ Ignored invalid temperatures: {', '.join(invalid_temperatures)}")
+        temperatures = temperatures or [25.0]
+        
+        envelope = operating_envelope(
+            product,
+            spec_data.get("pump_size", "Medium"),
+            asset=asset,
+            suction_range=suction_range,
+            flow_range=(0.0, flow_max),
+            temperatures=temperatures,
+            hf_max=max(input_data.get("hf_band", {}).values(), default=0.0)
+        )
+        
+        low, high = envelope["safe_flow_range_m3h"]
+        st.markdown(
+            f"**Safe flow window:** {low:.0f} - {high:.0f} m³/h (60-120% BEP {envelope['bep_flow']:.0f} m³/h, "
+            f"limits from {envelope['limits_source'].replace('_', ' ')})"
+        )
+        
+        st.markdown("**Minimum suction pressure for NPSHa margin ≥ 0 (kPa) vs flow**")
+        st.line_chart(pd.DataFrame(
+            {f"{t:g} °C": envelope["min_suction_kpa"][i] for i, t in enumerate(envelope["temperature_c"])},
+            index=pd.Index(envelope["flow_m3h"].round(1), name="Flow (m³/h)")
+        ))
+        
+        flow = operational.get("flow_rate", 0.0)
+        flow_index = int(abs(envelope["flow_m3h"] - flow).argmin())
+        st.dataframe(pd.DataFrame([
+            {
+                "Temperature (°C)": t,
+                "Min Suction @ current flow (kPa)": round(float(envelope["min_suction_kpa"][i, flow_index]), 1),
+                "Min Tank Level above nozzle (m)": round(float(envelope["min_tank_level_m"][i, flow_index]), 2),
+                "Current Point": "✅ Safe" if envelope_point(envelope, operational.get("suction_pressure", 0.0), flow, i)["safe"] else "⚠️ Outside envelope"
+            }
+            for i, t in enumerate(envelope["temperature_c"])
+        ]), use_container_width=True)
+        st.caption(f"**Standard:** {envelope['standard']} | Tank level = static head only (suction line losses not included)")
+
+
 def generate_excel_report(diagnosis_result):
     """Generate Excel report dengan compliance statement"""
     
@@ -0,0 +1,391 @@
+"""
+Cache hasil run_complete_diagnosis ber-alamat konten (in-process LRU + SQLite)
+
+Key = SHA-256 dari input_data ter-normalisasi (JSON kanonik, field UI transient dibuang)
++ versi engine (hash source modules/ & utils/) + versi & isi rule action planner + isi
+registry aset, sehingga perubahan kode, rule, atau registry otomatis membuat entri lama
+tidak terpakai. Setiap hit mengembalikan salinan baru yang aman dimodifikasi pemanggil (trend
+baseline, RUL, uncertainty). Tier disk menyimpan JSON ber-tag (date, tuple, ndarray) - file
+cache dapat ditulis proses lain, jadi isinya tidak pernah di-unpickle; pickle hanya dipakai
+untuk salinan di tier memori proses sendiri.
+"""
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from functools import lru_cache
+
+import numpy as np
+
+# Default di direktori cache user (bukan /tmp yang world-writable); file dibuat dengan mode 0600
+DEFAULT_CACHE_PATH = os.environ.get(
+    "PUMP_RESULT_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "pump_diagnosis", "result_cache.db")
+)
+
+# Batas tier memori (entri) & tier disk (byte hasil ter-pickle), TTL kedua tier (detik)
+CACHE_MEMORY_ENTRIES = int(os.environ.get("PUMP_RESULT_CACHE_ENTRIES", 256))
+CACHE_DISK_MAX_BYTES = int(os.environ.get("PUMP_RESULT_CACHE_BYTES", 256 * 1024 * 1024))
+CACHE_TTL_SECONDS = float(os.environ.get("PUMP_RESULT_CACHE_TTL", 7 * 24 * 3600))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    result BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at);
+CREATE INDEX IF NOT EXISTS idx_results_created ON results (created_at);
+"""
+
+# Panjang minimum list numerik yang di-hash sebagai array
+COMPACT_LIST_LENGTH = 64
+
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SOURCE_DIRS = ["modules", "utils"]
+
+# Tier memori: key -> (created_at, hasil ter-pickle), urutan = LRU
+_MEMORY = OrderedDict()
+_LOCK = threading.Lock()
+_LOCAL = threading.local()
+_STATS = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "expired": 0, "evictions": 0, "stores": 0}
+
+
+def _canonical_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        return {"ndarray": hashlib.sha256(array.tobytes()).hexdigest(), "dtype": str(array.dtype), "shape": array.shape}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    return str(value)
+
+
+def _compact(value):
+    """List numerik panjang (spektrum, coast-down) -> array float64 agar di-hash per byte, bukan per repr"""
+    if isinstance(value, dict):
+        return {key: _compact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if len(value) >= COMPACT_LIST_LENGTH and isinstance(value[0], (int, float)):
+            array = np.asarray(value)
+            if array.dtype.kind in "iuf":
+                return array.astype(float, copy=False)
+        return [_compact(item) for item in value]
+    return value
+
+
+def _to_tagged(value):
+    """Hasil -> struktur JSON murni; tipe non-JSON di hasil diagnosa diberi tag agar round-trip persis"""
+    if isinstance(value, dict):
+        return {key: _to_tagged(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_to_tagged(item) for item in value]
+    if isinstance(value, tuple):
+        return {"__tuple__": [_to_tagged(item) for item in value]}
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, np.ndarray):
+        return {"__ndarray__": _to_tagged(value.tolist()), "dtype": str(value.dtype)}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _from_tagged(value):
+    """object_hook json.loads - kebalikan _to_tagged"""
+    if "__tuple__" in value:
+        return tuple(value["__tuple__"])
+    if "__datetime__" in value:
+        return datetime.fromisoformat(value["__datetime__"])
+    if "__date__" in value:
+        return date.fromisoformat(value["__date__"])
+    if "__ndarray__" in value:
+        return np.array(value["__ndarray__"], dtype=value["dtype"])
+    return value
+
+
+def encode_result(result):
+    """Serialisasi hasil untuk tier disk (JSON ber-tag, UTF-8)"""
+    return json.dumps(_to_tagged(result), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode_result(blob):
+    """Kebalikan encode_result - hanya JSON yang di-parse, tidak ada objek yang dieksekusi"""
+    return json.loads(blob, object_hook=_from_tagged)
+
+
+def _count(name, amount=1):
+    with _LOCK:
+        _STATS[name] += amount
+
+
+def canonical_digest(value):
+    """SHA-256 hex dari representasi JSON kanonik (key terurut, tanggal ISO, array numpy -> hash byte)"""
+    payload = json.dumps(_compact(value), sort_keys=True, default=_canonical_default, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _source_digest():
+    """Hash source engine (dihitung sekali per proses - perubahan kode butuh restart)"""
+    digest = hashlib.sha256()
+    for directory in _SOURCE_DIRS:
+        folder = os.path.join(_PACKAGE_ROOT, directory)
+        for name in sorted(os.listdir(folder)):
+            if name.endswith(".py"):
+                digest.update(name.encode("utf-8"))
+                with open(os.path.join(folder, name), "rb") as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=8)
+def _file_digest(path, mtime):
+    """Hash isi file data per (path, mtime) - ikut berubah saat file di-hot-reload"""
+    if mtime is None:
+        return ""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def file_digest(path):
+    """Hash isi file data (registry, rule) - string kosong jika file tidak ada"""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+    return _file_digest(path, mtime)
+
+
+def engine_version():
+    """
+    Versi efektif engine untuk key cache
+
+    Returns:
+        dict: engine (hash source), rules (versi + hash file), registry (hash file)
+    """
+    from modules.action_rules import DEFAULT_RULES_PATH, load_action_rules
+    from modules.asset_registry import DEFAULT_REGISTRY_PATH
+
+    return {
+        "engine": _source_digest(),
+        "rules": f"{load_action_rules()['version']}:{file_digest(DEFAULT_RULES_PATH)}",
+        "registry": file_digest(DEFAULT_REGISTRY_PATH)
+    }
+
+
+def normalize_input(input_data):
+    """input_data tanpa field UI transient (tidak mempengaruhi hasil diagnosa)"""
+    from modules.history_store import _TRANSIENT_KEYS
+    return {key: value for key, value in input_data.items() if key not in _TRANSIENT_KEYS}
+
+
+def cache_key(input_data):
+    """Key konten untuk satu input_data pada versi engine, rule & registry saat ini"""
+    return canonical_digest({"input": normalize_input(input_data), "version": engine_version()})
+
+
+def open_cache(path=DEFAULT_CACHE_PATH):
+    """
+    Buka (atau buat) tier disk dengan WAL mode (aman dipakai bersama oleh beberapa proses);
+    file baru dibuat 0600 (file WAL/SHM SQLite mengikuti mode file database)
+
+    Returns:
+        sqlite3.Connection
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _connection(path):
+    """Koneksi tier disk per thread & path (dibuka sekali, dipakai ulang)"""
+    connections = getattr(_LOCAL, "connections", None)
+    if connections is None:
+        connections = _LOCAL.connections = {}
+    if path not in connections:
+        connections[path] = open_cache(path)
+    return connections[path]
+
+
+def _memory_get(key, now, ttl):
+    with _LOCK:
+        entry = _MEMORY.get(key)
+        if entry is None:
+            return None
+        if now - entry[0] > ttl:
+            del _MEMORY[key]
+            _STATS["expired"] += 1
+            return None
+        _MEMORY.move_to_end(key)
+        return entry[1]
+
+
+def _memory_put(key, created_at, blob, max_entries):
+    with _LOCK:
+        _MEMORY[key] = (created_at, blob)
+        _MEMORY.move_to_end(key)
+        while len(_MEMORY) > max_entries:
+            _MEMORY.popitem(last=False)
+            _STATS["evictions"] += 1
+
+
+def _disk_get(conn, key, now, ttl):
+    row = conn.execute("SELECT result, created_at FROM results WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return None
+    with conn:
+        if now - row[1] > ttl:
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            _count("expired")
+            return None
+        conn.execute("UPDATE results SET hits = hits + 1, accessed_at = ? WHERE key = ?", (now, key))
+    return row[0], row[1]
+
+
+def _disk_put(conn, key, blob, now, ttl, max_bytes):
+    """Simpan entri lalu buang entri kedaluwarsa & entri paling lama tidak diakses sampai <= max_bytes"""
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO results (key, result, size, hits, created_at, accessed_at) VALUES (?, ?, ?, 0, ?, ?)",
+            (key, blob, len(blob), now, now)
+        )
+        _count("expired", conn.execute("DELETE FROM results WHERE created_at < ?", (now - ttl,)).rowcount)
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= max_bytes:
+            return
+        evict = []
+        for row_key, size in conn.execute("SELECT key, size FROM results ORDER BY accessed_at"):
+            if total <= max_bytes:
+                break
+            evict.append((row_key,))
+            total -= size
+        conn.executemany("DELETE FROM results WHERE key = ?", evict)
+        _count("evictions", len(evict))
+
+
+def get_cached(key, path=DEFAULT_CACHE_PATH, ttl=CACHE_TTL_SECONDS):
+    """
+    Cari hasil di tier memori lalu tier disk (hit disk dipromosikan ke memori; entri disk
+    yang tidak bisa di-decode dibuang dan dihitung miss)
+
+    Args:
+        path: database tier disk (None = tier memori saja)
+
+    Returns:
+        tuple: (hasil baru hasil unpickle atau None, tier "memory" / "disk" / None)
+    """
+    now = time.time()
+    blob = _memory_get(key, now, ttl)
+    if blob is not None:
+        _count("memory_hits")
+        return pickle.loads(blob), "memory"
+
+    if path:
+        conn = _connection(path)
+        found = _disk_get(conn, key, now, ttl)
+        if found is not None:
+            try:
+                result = decode_result(found[0])
+            except (ValueError, TypeError):
+                with conn:
+                    conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                result = None
+            if result is not None:
+                _count("disk_hits")
+                _memory_put(key, found[1], pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), CACHE_MEMORY_ENTRIES)
+                return result, "disk"
+
+    _count("misses")
+    return None, None
+
+
+def put_cached(key, result, path=DEFAULT_CACHE_PATH, ttl=CACHE_TTL_SECONDS):
+    """Simpan hasil ke kedua tier (memori: pickle proses sendiri, disk: JSON ber-tag)"""
+    now = time.time()
+    _memory_put(key, now, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), CACHE_MEMORY_ENTRIES)
+    if path:
+        _disk_put(_connection(path), key, encode_result(result), now, ttl, CACHE_DISK_MAX_BYTES)
+    _count("stores")
+
+
+def cached_diagnosis(input_data, path=DEFAULT_CACHE_PATH, parallel=True, memoize=True):
+    """
+    run_complete_diagnosis dengan cache - input identik (versi engine sama) tidak dihitung ulang
+
+    timings hasil memuat "cache": "memory" / "disk" (hit) atau "miss" dan lookup_ms.
+
+    Returns:
+        dict: Hasil run_complete_diagnosis
+    """
+    from modules.diagnosis_engine import run_complete_diagnosis
+
+    start = time.perf_counter()
+    key = cache_key(input_data)
+    result, tier = get_cached(key, path)
+    if result is None:
+        result = run_complete_diagnosis(input_data, parallel=parallel, memoize=memoize)
+        put_cached(key, result, path)
+        tier = "miss"
+    result["timings"] = {
+        **result["timings"],
+        "cache": tier,
+        "lookup_ms": round((time.perf_counter() - start) * 1000.0, 3)
+    }
+    return result
+
+
+def cache_stats(path=DEFAULT_CACHE_PATH):
+    """
+    Counter hit/miss proses ini + isi tier memori & disk
+
+    Returns:
+        dict: memory_hits, disk_hits, misses, hit_rate, expired, evictions, stores,
+              memory_entries, disk_entries, disk_bytes, disk_hits_total
+    """
+    with _LOCK:
+        counters = dict(_STATS)
+        memory_entries = len(_MEMORY)
+    lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+    stats = {
+        **counters,
+        "hit_rate": round((counters["memory_hits"] + counters["disk_hits"]) / lookups, 4) if lookups else None,
+        "memory_entries": memory_entries
+    }
+    if path:
+        entries, size, hits = _connection(path).execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM results"
+        ).fetchone()
+        stats.update(disk_entries=entries, disk_bytes=size, disk_hits_total=hits)
+    return stats
+
+
+def clear_cache(path=DEFAULT_CACHE_PATH):
+    """Kosongkan kedua tier & reset counter - return jumlah entri disk yang dihapus"""
+    with _LOCK:
+        _MEMORY.clear()
+        for name in _STATS:
+            _STATS[name] = 0
+    if not path:
+        return 0
+    conn = _connection(path)
+    with conn:
+        return conn.execute("DELETE FROM results").rowcount
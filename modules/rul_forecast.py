@@ -0,0 +1,282 @@
+"""
+Forecast remaining useful life (RUL) dari histori inspeksi - ISO 13381-1 prognostics
+
+Tren degradasi (velocity, demodulation, bearing rise) di-fit linear per pompa terhadap
+waktu inspeksi. Seluruh fleet di-fit dalam satu operasi array (metrik x pompa x inspeksi),
+lalu waktu menuju batas (Zone C/D, demod alarm, rise alarm) dipakai untuk mempersingkat
+timeline action plan yang statis.
+"""
+import json
+import math
+import re
+
+import numpy as np
+import pandas as pd
+
+from modules.history_store import _date_text
+from modules.trend_statistics import TREND_METRICS
+from utils.lookup_tables import DIAGNOSIS_THRESHOLDS, ISO_10816_3_LIMITS
+
+# Jumlah inspeksi terakhir per pompa yang di-fit & minimum untuk forecast
+RUL_FIT_WINDOW = 8
+RUL_MIN_SAMPLES = 3
+
+# Horizon forecast (hari): di luar ini dianggap tidak ada degradasi yang relevan
+RUL_HORIZON_DAYS = 365
+
+# Forecast lebih pendek dari ini memicu action planning pada pompa tanpa action terjadwal
+RUL_PLANNING_DAYS = 90
+
+RUL_METRICS = ["overall_velocity", "demod_max", "bearing_rise"]
+
+# Target forecast: (nama, metrik, kolom threshold, label)
+RUL_TARGETS = [
+    ("zone_c", "overall_velocity", "zone_c_threshold", "Zone C (ISO 10816-3)"),
+    ("zone_d", "overall_velocity", "zone_d_threshold", "Zone D (ISO 10816-3)"),
+    ("demod_alarm", "demod_max", "demod_threshold", f"demodulation alarm {DIAGNOSIS_THRESHOLDS['demod_alarm_g']} g"),
+    ("temp_alarm", "bearing_rise", "rise_threshold", "bearing rise alarm (API 610 §11.3)")
+]
+
+_TIMELINE_PATTERN = re.compile(r"^< (\d+) (hours|days)$")
+
+
+def history_point(result):
+    """
+    Ekstrak metrik tren & threshold per pompa dari satu hasil diagnosa
+
+    Returns:
+        dict: pump_tag, inspection_date, nilai metrik, threshold
+    """
+    foundation = str(result.get("specification", {}).get("foundation_type", "rigid")).lower()
+    limits = ISO_10816_3_LIMITS.get(foundation, ISO_10816_3_LIMITS["rigid"])
+    return {
+        "pump_tag": str(result["metadata"].get("pump_tag") or "Unknown"),
+        "inspection_date": _date_text(result["metadata"].get("inspection_date")),
+        **{metric: float(TREND_METRICS[metric]["extract"](result)) for metric in RUL_METRICS},
+        "zone_c_threshold": limits["zone_b_max"],
+        "zone_d_threshold": limits["zone_d_min"],
+        "demod_threshold": DIAGNOSIS_THRESHOLDS["demod_alarm_g"],
+        "rise_threshold": float(result["analyses"]["thermal"].get("alarm_rise", 55))
+    }
+
+
+def load_fleet_history(conn, window=RUL_FIT_WINDOW, pump_tag=None):
+    """
+    Muat window inspeksi terakhir per pompa dari history store (satu pompa: ORDER BY ... LIMIT
+    lewat index (pump_tag, inspection_date), bukan window function atas seluruh tabel)
+
+    Returns:
+        pd.DataFrame: Satu baris per inspeksi (kolom history_point)
+    """
+    if pump_tag is not None:
+        rows = conn.execute(
+            """
+            SELECT result_json FROM inspections
+            WHERE pump_tag = ? AND inspection_date IS NOT NULL
+            ORDER BY inspection_date DESC, id DESC LIMIT ?
+            """,
+            (str(pump_tag), int(window))
+        ).fetchall()
+        return pd.DataFrame([history_point(json.loads(row["result_json"])) for row in rows])
+
+    rows = conn.execute(
+        """
+        SELECT result_json FROM (
+            SELECT result_json, ROW_NUMBER() OVER (
+                PARTITION BY pump_tag ORDER BY inspection_date DESC, id DESC
+            ) AS rank_in_pump
+            FROM inspections
+            WHERE inspection_date IS NOT NULL
+        ) WHERE rank_in_pump <= ?
+        """,
+        (int(window),)
+    ).fetchall()
+    return pd.DataFrame([history_point(json.loads(row["result_json"])) for row in rows])
+
+
+def fit_trends(t_days, values, mask):
+    """
+    Least-squares linear value = slope·t + intercept untuk semua (metrik, pompa) sekaligus
+
+    Args:
+        t_days: array (P x K) hari relatif terhadap inspeksi terakhir (<= 0)
+        values, mask: array (M x P x K)
+
+    Returns:
+        tuple: (slope per hari, intercept = nilai fit saat inspeksi terakhir, R², jumlah sampel)
+    """
+    weight = mask.astype(float)
+    count = weight.sum(axis=-1)
+    safe = np.maximum(count, 1)
+    x = np.where(mask, t_days, 0.0)
+    y = np.where(mask, values, 0.0)
+    mean_x = x.sum(axis=-1) / safe
+    mean_y = y.sum(axis=-1) / safe
+    dx = (x - mean_x[..., None]) * weight
+    dy = (y - mean_y[..., None]) * weight
+    sxx = (dx ** 2).sum(axis=-1)
+    sxy = (dx * dy).sum(axis=-1)
+    syy = (dy ** 2).sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(sxx > 0, sxy / sxx, 0.0)
+        r2 = np.where((sxx > 0) & (syy > 0), sxy ** 2 / (sxx * syy), 0.0)
+    return slope, mean_y - slope * mean_x, r2, count.astype(int)
+
+
+def forecast_fleet(history, window=RUL_FIT_WINDOW):
+    """
+    Fit tren degradasi seluruh fleet & estimasi hari menuju setiap batas
+
+    Args:
+        history: DataFrame dari load_fleet_history / history_point
+
+    Returns:
+        pd.DataFrame: Index pump_tag; slope & nilai fit per metrik, days_to_* per target,
+                      rul_days (minimum), rul_target, samples
+    """
+    if history.empty:
+        return pd.DataFrame(columns=["rul_days", "rul_target", "samples"])
+
+    frame = history.assign(date=pd.to_datetime(history["inspection_date"], errors="coerce", format="mixed"))
+    frame = frame.dropna(subset=["date"]).sort_values(["pump_tag", "date"])
+    frame = frame[frame.groupby("pump_tag").cumcount(ascending=False) < window]
+
+    tags, pump_index = np.unique(frame["pump_tag"].to_numpy(dtype=str), return_inverse=True)
+    position = frame.groupby("pump_tag").cumcount().to_numpy()
+    shape = (len(tags), window)
+
+    last_date = frame.groupby("pump_tag")["date"].transform("max")
+    t_days = np.full(shape, np.nan)
+    t_days[pump_index, position] = ((frame["date"] - last_date).dt.total_seconds() / 86400.0).to_numpy()
+
+    values = np.full((len(RUL_METRICS),) + shape, np.nan)
+    for m, metric in enumerate(RUL_METRICS):
+        values[m, pump_index, position] = frame[metric].to_numpy(dtype=float)
+    mask = ~np.isnan(values) & ~np.isnan(t_days)[None, :, :]
+
+    slope, current, r2, samples = fit_trends(t_days, values, mask)
+    ready = samples[0] >= RUL_MIN_SAMPLES
+
+    latest = frame.groupby("pump_tag").last().reindex(tags)
+    result = pd.DataFrame(index=pd.Index(tags, name="pump_tag"))
+    for m, metric in enumerate(RUL_METRICS):
+        result[f"{metric}_slope_per_day"] = np.where(ready, slope[m], np.nan)
+        result[f"{metric}_fit"] = np.where(ready, current[m], np.nan)
+        result[f"{metric}_r2"] = np.where(ready, r2[m], np.nan)
+
+    days = {}
+    for name, metric, threshold_column, _ in RUL_TARGETS:
+        m = RUL_METRICS.index(metric)
+        threshold = latest[threshold_column].to_numpy(dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            remaining = np.where(slope[m] > 0, (threshold - current[m]) / slope[m], np.inf)
+        remaining = np.where(remaining > RUL_HORIZON_DAYS, np.inf, remaining)
+        reached = current[m] >= threshold
+        result[f"days_to_{name}"] = np.where(ready, np.where(reached, 0.0, remaining), np.nan)
+        # Batas yang sudah terlampaui ditangani action plan statis, bukan forecast
+        days[name] = np.where(ready & ~reached, remaining, np.nan)
+
+    stacked = np.vstack([days[name] for name, _, _, _ in RUL_TARGETS])
+    finite = np.isfinite(stacked)
+    nearest = np.argmin(np.where(finite, stacked, np.inf), axis=0)
+    has_forecast = finite.any(axis=0)
+    result["rul_days"] = np.where(has_forecast, stacked[nearest, np.arange(len(tags))], np.nan)
+    result["rul_target"] = np.where(has_forecast, np.array([t[0] for t in RUL_TARGETS])[nearest], None)
+    result["samples"] = samples[0]
+    return result
+
+
+def forecast_pump(conn, result, window=RUL_FIT_WINDOW):
+    """
+    Forecast RUL satu pompa: histori tersimpan + hasil diagnosa saat ini (belum disimpan);
+    baris tersimpan dengan tanggal inspeksi yang sama (submit ulang) digantikan hasil saat ini
+
+    Returns:
+        dict: rul_days (None = tidak ada degradasi menuju batas), rul_target, days_to_*, samples
+    """
+    current = history_point(result)
+    stored = load_fleet_history(conn, window=window, pump_tag=current["pump_tag"])
+    if not stored.empty:
+        stored = stored[stored["inspection_date"] != current["inspection_date"]]
+    forecast = forecast_fleet(pd.concat([stored, pd.DataFrame([current])], ignore_index=True), window)
+    if current["pump_tag"] not in forecast.index:
+        return {"rul_days": None, "rul_target": None, "rul_label": "", "samples": 0, "standard": "ISO 13381-1 (prognostics)"}
+    row = forecast.loc[current["pump_tag"]]
+
+    labels = {name: label for name, _, _, label in RUL_TARGETS}
+    rul_days = row["rul_days"]
+    return {
+        "rul_days": round(float(rul_days), 1) if pd.notna(rul_days) else None,
+        "rul_target": row["rul_target"],
+        "rul_label": labels.get(row["rul_target"], ""),
+        **{
+            f"days_to_{name}": round(float(row[f"days_to_{name}"]), 1) if np.isfinite(row[f"days_to_{name}"]) else None
+            for name, _, _, _ in RUL_TARGETS
+        },
+        "velocity_slope_per_30d": round(float(row["overall_velocity_slope_per_day"]) * 30, 3)
+        if pd.notna(row["overall_velocity_slope_per_day"]) else None,
+        "samples": int(row["samples"]),
+        "standard": "ISO 13381-1 (prognostics)"
+    }
+
+
+def _timeline_days(timeline):
+    """Timeline "< N hours|days" dalam hari (None untuk timeline non-numerik)"""
+    match = _TIMELINE_PATTERN.match(timeline or "")
+    if not match:
+        return None
+    value = int(match.group(1))
+    return value / 24.0 if match.group(2) == "hours" else float(value)
+
+
+def _format_timeline(days):
+    return f"< {max(math.ceil(days * 24), 1)} hours" if days < 3 else f"< {math.ceil(days)} days"
+
+
+def apply_rul_timelines(action_plan, forecast):
+    """
+    Persingkat timeline action plan jika forecast RUL lebih cepat dari timeline statis;
+    pompa tanpa action terjadwal mendapat action planning jika RUL < RUL_PLANNING_DAYS
+
+    Returns:
+        dict: action_plan baru (input tidak dimodifikasi)
+    """
+    rul_days = forecast.get("rul_days")
+    if rul_days is None:
+        return action_plan
+
+    actions = []
+    for action in action_plan["actions"]:
+        current = _timeline_days(action.get("timeline"))
+        if current is not None and rul_days < current:
+            action = {
+                **action,
+                "timeline": _format_timeline(rul_days),
+                "timeline_basis": f"RUL forecast: {forecast['rul_label']} in ~{rul_days:.0f} days"
+            }
+        actions.append(action)
+
+    scheduled = any(_timeline_days(a.get("timeline")) is not None for a in actions)
+    if not scheduled and rul_days < RUL_PLANNING_DAYS:
+        actions.append({
+            "priority": "MEDIUM",
+            "action": f"📉 Degradation trend forecast to reach {forecast['rul_label']} in ~{rul_days:.0f} days - plan intervention",
+            "timeline": _format_timeline(rul_days),
+            "pic": "Reliability Engineer",
+            "standard": forecast["standard"],
+            "timeline_basis": f"RUL forecast ({forecast['samples']} inspections)"
+        })
+
+    return {**action_plan, "actions": actions}
+
+
+def apply_rul_forecast(conn, result):
+    """
+    Lampirkan forecast RUL ke result["rul"] & sesuaikan timeline action plan
+
+    Dipanggil sebelum result disimpan ke history store (inspeksi saat ini ikut di-fit).
+    """
+    forecast = forecast_pump(conn, result)
+    result["rul"] = forecast
+    result["action_plan"] = apply_rul_timelines(result["action_plan"], forecast)
+    return forecast
@@ -0,0 +1,461 @@
+"""Pengolahan sinyal vibrasi dari waveform mentah (ISO 13373-2:2016 - signal processing)"""
+import io
+import os
+import wave
+
+import numpy as np
+import pandas as pd
+
+# Percepatan gravitasi standar (mm/s² per g)
+G_MMS2 = 9806.65
+
+# Window function untuk FFT (amplitudo dikoreksi dengan coherent gain di compute_spectrum)
+WINDOWS = {
+    "hann": np.hanning,
+    "hamming": np.hamming,
+    "blackman": np.blackman,
+    "rectangular": np.ones
+}
+
+
+def _source_name(source):
+    return source if isinstance(source, str) else getattr(source, "name", "")
+
+
+def load_waveform(source, sample_rate=None, column=None, scale=1.0):
+    """
+    Baca waveform time-domain dari CSV, WAV, atau NumPy (.npy/.npz)
+
+    CSV: kolom "time"/"time_s" (detik) menentukan sample rate, kolom nilai = `column`
+         atau kolom non-time pertama. WAV: sample rate dari header, PCM dinormalisasi
+         ke ±1.0 lalu dikali `scale` (full-scale sensor). NumPy: sample_rate wajib,
+         kecuali .npz berisi key "sample_rate"/"fs".
+
+    Returns:
+        tuple: (signal np.ndarray float, sample_rate Hz)
+    """
+    extension = os.path.splitext(_source_name(source))[1].lower()
+
+    if extension == ".wav":
+        with wave.open(source, "rb") as wav:
+            fs = wav.getframerate()
+            width = wav.getsampwidth()
+            channels = wav.getnchannels()
+            frames = wav.readframes(wav.getnframes())
+        dtype = {1: np.uint8, 2: np.int16, 4: np.int32}[width]
+        data = np.frombuffer(frames, dtype=dtype).reshape(-1, channels)[:, 0].astype(float)
+        if width == 1:
+            data = data - 128.0
+        full_scale = float(2 ** (8 * width - 1))
+        return data / full_scale * scale, float(fs)
+
+    if extension in [".npy", ".npz"]:
+        loaded = np.load(source)
+        if extension == ".npz":
+            key = column or next(k for k in loaded.files if k not in ["sample_rate", "fs"])
+            for rate_key in ["sample_rate", "fs"]:
+                if sample_rate is None and rate_key in loaded.files:
+                    sample_rate = float(loaded[rate_key])
+            data = loaded[key]
+        else:
+            data = loaded
+        if sample_rate is None:
+            raise ValueError("sample_rate is required for NumPy waveforms")
+        return np.asarray(data, dtype=float).reshape(-1) * scale, float(sample_rate)
+
+    frame = pd.read_csv(source)
+    time_columns = [c for c in frame.columns if str(c).lower() in ["time", "time_s", "t"]]
+    if time_columns:
+        time = frame[time_columns[0]].to_numpy(dtype=float)
+        sample_rate = 1.0 / float(np.median(np.diff(time)))
+    if sample_rate is None:
+        raise ValueError("CSV waveform needs a time column or an explicit sample_rate")
+    value_column = column or next(c for c in frame.columns if c not in time_columns)
+    return frame[value_column].to_numpy(dtype=float) * scale, float(sample_rate)
+
+
+def compute_spectrum(signal, sample_rate, window="hann", units="velocity"):
+    """
+    Hitung spektrum amplitudo (RMS) dengan rfft + window
+
+    Args:
+        units: "velocity" (input mm/s) atau "acceleration" (input g, diintegrasi ke mm/s)
+
+    Returns:
+        tuple: (freqs Hz, amplitude mm/s RMS)
+    """
+    signal = np.asarray(signal, dtype=float)
+    n = len(signal)
+    weights = WINDOWS[window](n)
+
+    spectrum = np.fft.rfft((signal - signal.mean()) * weights)
+    freqs = np.fft.rfftfreq(n, d=1.0 / sample_rate)
+
+    # Amplitudo peak terkoreksi coherent gain, lalu ke RMS (ISO 10816 memakai mm/s RMS)
+    amplitude = np.abs(spectrum) * 2.0 / weights.sum() / np.sqrt(2.0)
+    amplitude[0] = 0.0
+
+    if units == "acceleration":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            amplitude = np.where(freqs > 0, amplitude * G_MMS2 / (2 * np.pi * freqs), 0.0)
+
+    return freqs, amplitude
+
+
+def interpolate_peak(amplitude, index, window="hann"):
+    """
+    Interpolasi parabolik (pada log-amplitudo) di sekitar bin lokal maksimum
+
+    Offset frekuensi dari parabola log-amplitudo; untuk window Hann amplitudo
+    dikoreksi dengan respon main lobe eksak sinc(δ)/(1-δ²) (bebas scalloping error).
+
+    Returns:
+        tuple: (offset bin fraksional -0.5..0.5, amplitudo terinterpolasi)
+    """
+    tiny = np.finfo(float).tiny
+    alpha, beta, gamma = np.log(np.maximum(amplitude[index - 1:index + 2], tiny))
+    denominator = alpha - 2 * beta + gamma
+    offset = 0.5 * (alpha - gamma) / denominator if denominator != 0 else 0.0
+
+    if window == "hann":
+        return offset, float(amplitude[index] / (np.sinc(offset) / (1 - offset ** 2)))
+    return offset, float(np.exp(beta - 0.25 * (alpha - gamma) * offset))
+
+
+def extract_peaks(freqs, amplitude, n_peaks=3, min_freq=1.0, max_freq=None, window="hann"):
+    """
+    Ambil top-N peak lokal (terbesar dulu) dengan interpolasi parabolik frekuensi & amplitudo
+
+    Returns:
+        list: [{"frequency_hz", "amplitude_mms"}, ...]
+    """
+    freqs = np.asarray(freqs, dtype=float)
+    amplitude = np.asarray(amplitude, dtype=float)
+    if len(amplitude) < 3:
+        return []
+
+    center = amplitude[1:-1]
+    is_peak = (center > amplitude[:-2]) & (center >= amplitude[2:])
+    in_band = freqs[1:-1] >= min_freq
+    if max_freq is not None:
+        in_band &= freqs[1:-1] <= max_freq
+    candidates = np.flatnonzero(is_peak & in_band) + 1
+
+    top = candidates[np.argsort(amplitude[candidates])[::-1][:n_peaks]]
+    resolution = freqs[1] - freqs[0]
+
+    peaks = []
+    for index in top:
+        offset, peak_amplitude = interpolate_peak(amplitude, index, window)
+        peaks.append({
+            "frequency_hz": float(freqs[index] + offset * resolution),
+            "amplitude_mms": float(peak_amplitude)
+        })
+    return peaks
+
+
+def peaks_to_fft_data(peaks_by_direction, n_slots=3):
+    """
+    Konversi peak per arah ke format fft_data (FFT_DE_{H|A}_FreqN / AmpN) untuk analyze_fft_peaks
+
+    Semua n_slots slot arah tersebut ditulis: waveform dengan peak < n_slots mengosongkan (0.0)
+    slot sisanya agar tidak tercampur input manual saat di-merge.
+
+    Args:
+        peaks_by_direction: {"H": [peak, ...], "A": [peak, ...]}
+    """
+    fft_data = {}
+    for direction, peaks in peaks_by_direction.items():
+        for i in range(1, max(n_slots, len(peaks)) + 1):
+            peak = peaks[i - 1] if i <= len(peaks) else {"frequency_hz": 0.0, "amplitude_mms": 0.0}
+            fft_data[f"FFT_DE_{direction}_Freq{i}"] = round(peak["frequency_hz"], 2)
+            fft_data[f"FFT_DE_{direction}_Amp{i}"] = round(peak["amplitude_mms"], 2)
+    return fft_data
+
+
+def waveform_to_peaks(signal, sample_rate, n_peaks=3, units="velocity", window="hann",
+                      min_freq=1.0, max_freq=None):
+    """Waveform -> spektrum -> top-N peak (pipeline lengkap satu kanal)"""
+    freqs, amplitude = compute_spectrum(signal, sample_rate, window=window, units=units)
+    return extract_peaks(freqs, amplitude, n_peaks=n_peaks, min_freq=min_freq, max_freq=max_freq, window=window)
+
+
+def load_uploaded_waveform(uploaded_file, sample_rate=None, scale=1.0):
+    """Baca waveform dari file upload Streamlit (UploadedFile -> buffer bernama)"""
+    buffer = io.BytesIO(uploaded_file.getvalue())
+    buffer.name = uploaded_file.name
+    return load_waveform(buffer, sample_rate=sample_rate, scale=scale)
+
+
+# Band-pass default untuk envelope demodulation (resonansi struktur bearing, ISO 15243 §5.2)
+DEMOD_BAND_HZ = (2000.0, 15000.0)
+
+# Ukuran blok default untuk pemrosesan streaming (≈ 1.3 detik pada 50 kHz)
+STREAM_BLOCK_SIZE = 65536
+
+
+def open_waveform_stream(source, block_size=STREAM_BLOCK_SIZE, sample_rate=None, column=None, scale=1.0):
+    """
+    Buka waveform sebagai iterator blok (memori konstan, tidak membaca seluruh file)
+
+    WAV: readframes per blok. NumPy .npy: memory-map (path) lalu slicing per blok.
+    CSV: pandas chunksize. Format & skala sama dengan load_waveform.
+
+    Returns:
+        tuple: (sample_rate Hz, iterator blok np.ndarray float)
+    """
+    extension = os.path.splitext(_source_name(source))[1].lower()
+
+    if extension == ".wav":
+        wav = wave.open(source, "rb")
+        fs = float(wav.getframerate())
+        width = wav.getsampwidth()
+        channels = wav.getnchannels()
+        dtype = {1: np.uint8, 2: np.int16, 4: np.int32}[width]
+        full_scale = float(2 ** (8 * width - 1))
+
+        def wav_blocks():
+            try:
+                while True:
+                    frames = wav.readframes(block_size)
+                    if not frames:
+                        break
+                    data = np.frombuffer(frames, dtype=dtype).reshape(-1, channels)[:, 0].astype(float)
+                    if width == 1:
+                        data = data - 128.0
+                    yield data / full_scale * scale
+            finally:
+                wav.close()
+
+        return fs, wav_blocks()
+
+    if extension == ".npy":
+        if sample_rate is None:
+            raise ValueError("sample_rate is required for NumPy waveforms")
+        data = np.load(source, mmap_mode="r") if isinstance(source, str) else np.load(source)
+        data = data.reshape(-1)
+        blocks = (
+            np.asarray(data[start:start + block_size], dtype=float) * scale
+            for start in range(0, len(data), block_size)
+        )
+        return float(sample_rate), blocks
+
+    if extension == ".npz":
+        signal, fs = load_waveform(source, sample_rate=sample_rate, column=column, scale=scale)
+        return fs, (signal[start:start + block_size] for start in range(0, len(signal), block_size))
+
+    chunks = pd.read_csv(source, chunksize=block_size)
+    first = next(chunks)
+    time_columns = [c for c in first.columns if str(c).lower() in ["time", "time_s", "t"]]
+    if time_columns:
+        time = first[time_columns[0]].to_numpy(dtype=float)
+        sample_rate = 1.0 / float(np.median(np.diff(time)))
+    if sample_rate is None:
+        raise ValueError("CSV waveform needs a time column or an explicit sample_rate")
+    value_column = column or next(c for c in first.columns if c not in time_columns)
+
+    def csv_blocks():
+        yield first[value_column].to_numpy(dtype=float) * scale
+        for chunk in chunks:
+            yield chunk[value_column].to_numpy(dtype=float) * scale
+
+    return float(sample_rate), csv_blocks()
+
+
+def reblock(blocks, block_size):
+    """Susun ulang iterator potongan sinyal menjadi blok berukuran tetap (blok terakhir boleh lebih pendek)"""
+    pending = []
+    pending_length = 0
+    for block in blocks:
+        pending.append(np.asarray(block, dtype=float))
+        pending_length += len(block)
+        if pending_length < block_size:
+            continue
+        buffer = np.concatenate(pending)
+        full = len(buffer) // block_size * block_size
+        for start in range(0, full, block_size):
+            yield buffer[start:start + block_size]
+        pending = [buffer[full:]]
+        pending_length = len(buffer) - full
+    if pending_length:
+        yield np.concatenate(pending)
+
+
+def band_envelope(segment, sample_rate, band=DEMOD_BAND_HZ):
+    """
+    Band-pass (FFT mask) + Hilbert envelope dalam satu langkah: analytic signal
+    dari spektrum satu sisi yang hanya berisi band [low, high]
+
+    Returns:
+        np.ndarray: Envelope |analytic signal| (satuan sama dengan input)
+    """
+    n = len(segment)
+    spectrum = np.fft.fft(segment)
+    freqs = np.fft.fftfreq(n, d=1.0 / sample_rate)
+    in_band = (freqs >= band[0]) & (freqs <= band[1])
+    return np.abs(np.fft.ifft(np.where(in_band, 2.0 * spectrum, 0.0)))
+
+
+def stream_envelope(blocks, sample_rate, band=DEMOD_BAND_HZ, block_size=STREAM_BLOCK_SIZE):
+    """
+    Envelope streaming blok-per-blok dengan guard overlap
+
+    Tiap segmen = [2×guard sampel dari segmen sebelumnya | blok baru]; hanya bagian
+    tengah (guard..n-guard) yang dipakai sehingga efek tepi FFT circular dibuang.
+    Output kontinu, tertunda `guard` sampel (guard awal & akhir rekaman diabaikan).
+
+    Yields:
+        np.ndarray: Potongan envelope valid
+    """
+    guard = max(int(sample_rate / band[0]) * 8, 64)
+    history = np.zeros(0)
+    for block in reblock(blocks, block_size):
+        segment = np.concatenate([history, block])
+        if len(segment) <= 2 * guard:
+            history = segment
+            continue
+        envelope = band_envelope(segment, sample_rate, band)
+        yield envelope[guard:len(segment) - guard]
+        history = segment[-2 * guard:]
+
+
+def envelope_demodulation(blocks, sample_rate, band=DEMOD_BAND_HZ, block_size=STREAM_BLOCK_SIZE,
+                          spectrum_size=16384, n_peaks=5, max_freq=1000.0):
+    """
+    Envelope demodulation dari waveform akselerasi (g) - ISO 15243 §5.2 / ISO 13373-3
+
+    Envelope di-stream per blok; envelope spectrum = rata-rata daya (Welch, Hann)
+    dari frame berukuran `spectrum_size`, sehingga memori konstan untuk rekaman
+    berapapun panjangnya.
+
+    Returns:
+        dict: demod_peak_g (nilai untuk Demodulation_DE/NDE), envelope_rms_g, envelope_peaks
+    """
+    spectrum_size = min(spectrum_size, block_size)
+    demod_peak = 0.0
+    sum_squares = 0.0
+    samples = 0
+    power = None
+    frames = 0
+
+    for frame in reblock(stream_envelope(blocks, sample_rate, band, block_size), spectrum_size):
+        demod_peak = max(demod_peak, float(frame.max()))
+        sum_squares += float(np.sum(frame ** 2))
+        samples += len(frame)
+        if len(frame) < spectrum_size:
+            continue
+        freqs, amplitude = compute_spectrum(frame, sample_rate)
+        power = amplitude ** 2 if power is None else power + amplitude ** 2
+        frames += 1
+
+    envelope_peaks = []
+    resolution = None
+    if frames:
+        amplitude = np.sqrt(power / frames)
+        resolution = float(freqs[1] - freqs[0])
+        envelope_peaks = [
+            {"frequency_hz": peak["frequency_hz"], "amplitude_g": peak["amplitude_mms"]}
+            for peak in extract_peaks(freqs, amplitude, n_peaks=n_peaks, min_freq=resolution * 2, max_freq=max_freq)
+        ]
+
+    return {
+        "sample_rate": sample_rate,
+        "band_hz": list(band),
+        "samples": samples,
+        "demod_peak_g": round(demod_peak, 3),
+        "envelope_rms_g": round(float(np.sqrt(sum_squares / samples)), 3) if samples else 0.0,
+        "envelope_peaks": envelope_peaks,
+        "spectrum_averages": frames,
+        "frequency_resolution_hz": resolution,
+        "standard": "ISO 15243 §5.2 (envelope demodulation)"
+    }
+
+
+def demodulate_waveform(source, sample_rate=None, scale=1.0, band=DEMOD_BAND_HZ, block_size=STREAM_BLOCK_SIZE, **kwargs):
+    """File waveform akselerasi -> envelope demodulation (streaming, tanpa load seluruh file)"""
+    fs, blocks = open_waveform_stream(source, block_size=block_size, sample_rate=sample_rate, scale=scale)
+    return envelope_demodulation(blocks, fs, band=band, block_size=block_size, **kwargs)
+
+
+# Band HF untuk deteksi kavitasi (API 610 §6.3.3)
+HF_BAND_HZ = (5000.0, 16000.0)
+
+# Jumlah tap FIR band-pass (ganjil, linear phase)
+HF_FIR_TAPS = 255
+
+
+def design_bandpass_fir(sample_rate, band=HF_BAND_HZ, taps=HF_FIR_TAPS):
+    """
+    FIR band-pass windowed-sinc (Blackman) - selisih dua low-pass ideal
+
+    Returns:
+        np.ndarray: Koefisien filter (panjang `taps`)
+    """
+    nyquist = sample_rate / 2.0
+    if band[0] >= nyquist:
+        raise ValueError(f"Sample rate {sample_rate:.0f} Hz too low for {band[0]:.0f} Hz band")
+    high = min(band[1], nyquist)
+    n = np.arange(taps) - (taps - 1) / 2.0
+    ideal = (
+        2 * high / sample_rate * np.sinc(2 * high / sample_rate * n)
+        - 2 * band[0] / sample_rate * np.sinc(2 * band[0] / sample_rate * n)
+    )
+    return ideal * np.blackman(taps)
+
+
+def overlap_save(blocks, coefficients, fft_size=8192):
+    """
+    Filter FIR streaming dengan overlap-save FFT (memori konstan)
+
+    Tiap frame FFT berisi (taps-1) sampel histori + L sampel baru; L output valid per frame.
+
+    Yields:
+        np.ndarray: Potongan output filter (sejajar dengan input, delay grup (taps-1)/2)
+    """
+    taps = len(coefficients)
+    fft_size = max(fft_size, 2 ** int(np.ceil(np.log2(2 * taps))))
+    hop = fft_size - taps + 1
+    response = np.fft.rfft(coefficients, fft_size)
+    history = np.zeros(taps - 1)
+    for block in reblock(blocks, hop):
+        frame = np.concatenate([history, block])
+        filtered = np.fft.irfft(np.fft.rfft(frame, fft_size) * response, fft_size)
+        yield filtered[taps - 1:len(frame)]
+        history = frame[-(taps - 1):]
+
+
+def hf_band_rms(blocks, sample_rate, band=HF_BAND_HZ, block_size=STREAM_BLOCK_SIZE, taps=HF_FIR_TAPS):
+    """
+    RMS band HF (g) per blok + overall dari waveform akselerasi - API 610 §6.3.3
+
+    Memori konstan terhadap panjang rekaman (hanya satu nilai RMS per blok yang disimpan).
+
+    Returns:
+        dict: block_rms_g (time history), overall_rms_g, max_block_rms_g, block_duration_s
+    """
+    coefficients = design_bandpass_fir(sample_rate, band, taps)
+    block_rms = []
+    sum_squares = 0.0
+    samples = 0
+    for chunk in reblock(overlap_save(blocks, coefficients), block_size):
+        energy = float(np.sum(chunk ** 2))
+        block_rms.append(round(float(np.sqrt(energy / len(chunk))), 4))
+        sum_squares += energy
+        samples += len(chunk)
+
+    return {
+        "sample_rate": sample_rate,
+        "band_hz": [band[0], min(band[1], sample_rate / 2.0)],
+        "samples": samples,
+        "block_duration_s": block_size / sample_rate,
+        "block_rms_g": block_rms,
+        "overall_rms_g": round(float(np.sqrt(sum_squares / samples)), 3) if samples else 0.0,
+        "max_block_rms_g": max(block_rms) if block_rms else 0.0,
+        "standard": "API 610 §6.3.3 (HF 5-16 kHz band)"
+    }
+
+
+def hf_band_rms_waveform(source, sample_rate=None, scale=1.0, band=HF_BAND_HZ, block_size=STREAM_BLOCK_SIZE, **kwargs):
+    """File waveform akselerasi -> RMS band HF per blok (streaming, tanpa load seluruh file)"""
+    fs, blocks = open_waveform_stream(source, block_size=block_size, sample_rate=sample_rate, scale=scale)
+    return hf_band_rms(blocks, fs, band=band, block_size=block_size, **kwargs)
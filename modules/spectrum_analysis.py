@@ -0,0 +1,316 @@
+"""
+Analisis spektrum penuh: harmonic family & sideband - ISO 13373-3 §6.2 / Table 2
+
+Input adalah spektrum lengkap dari instrumen (ribuan line), bukan 3 peak manual.
+Semua fundamental (1x, frekuensi defect bearing, vane pass, 2x line frequency,
+serta kandidat fundamental tak dikenal) dicocokkan sekaligus dengan comb matching
+vectorized terhadap daftar peak spektrum.
+"""
+import numpy as np
+
+from utils.calculations import calculate_bearing_frequencies
+from utils.lookup_tables import BEARING_CATALOG
+
+# Peak signifikan jika > faktor × noise floor lokal (median bergerak)
+PEAK_PROMINENCE_FACTOR = 4.0
+
+# Lebar jendela median noise floor (jumlah line)
+NOISE_FLOOR_WINDOW = 64
+
+# Amplitudo minimum peak (mm/s RMS)
+MIN_PEAK_AMPLITUDE = 0.1
+
+# Toleransi comb matching (minimal 1.5 line resolusi):
+# ±1% untuk fundamental nominal (RPM tachometer / geometri bearing), lalu ±0.25% untuk
+# harmonik setelah fundamental dikoreksi ke frekuensi peak aktual
+HARMONIC_TOLERANCE = 0.01
+REFINED_TOLERANCE = 0.0025
+MIN_TOLERANCE_BINS = 1.5
+
+MAX_HARMONICS = 10
+MAX_SIDEBANDS = 3
+
+# Jumlah peak terbesar yang diuji sebagai fundamental tak dikenal
+AUTO_FUNDAMENTAL_CANDIDATES = 5
+
+
+def detect_spectral_peaks(freqs, amplitude, prominence=PEAK_PROMINENCE_FACTOR,
+                          window=NOISE_FLOOR_WINDOW, min_amplitude=MIN_PEAK_AMPLITUDE):
+    """
+    Deteksi semua peak lokal di atas noise floor (median bergerak) - vectorized
+
+    Returns:
+        tuple: (frekuensi peak, amplitudo peak, noise floor per line)
+    """
+    freqs = np.asarray(freqs, dtype=float)
+    amplitude = np.asarray(amplitude, dtype=float)
+    if len(amplitude) < 3:
+        return np.zeros(0), np.zeros(0), np.zeros(len(amplitude))
+
+    half = window // 2
+    padded = np.pad(amplitude, half, mode="edge")
+    noise_floor = np.median(np.lib.stride_tricks.sliding_window_view(padded, 2 * half + 1), axis=1)
+
+    center = amplitude[1:-1]
+    is_peak = (center > amplitude[:-2]) & (center >= amplitude[2:])
+    significant = (center > prominence * noise_floor[1:-1]) & (center > min_amplitude)
+    index = np.flatnonzero(is_peak & significant & (freqs[1:-1] > 0)) + 1
+    return freqs[index], amplitude[index], noise_floor
+
+
+def match_comb(peak_freqs, peak_amps, targets, tolerance_hz):
+    """
+    Cocokkan array target frekuensi (bentuk bebas) ke peak terdekat dalam toleransi
+
+    Returns:
+        tuple: (mask matched, amplitudo peak (0 jika tidak), frekuensi peak (nan jika tidak))
+    """
+    targets = np.asarray(targets, dtype=float)
+    tolerance_hz = np.broadcast_to(tolerance_hz, targets.shape)
+    if len(peak_freqs) == 0:
+        return np.zeros(targets.shape, dtype=bool), np.zeros(targets.shape), np.full(targets.shape, np.nan)
+
+    right = np.clip(np.searchsorted(peak_freqs, targets), 1, len(peak_freqs) - 1) if len(peak_freqs) > 1 \
+        else np.zeros(targets.shape, dtype=int)
+    left = np.maximum(right - 1, 0)
+    nearest = np.where(
+        np.abs(peak_freqs[left] - targets) <= np.abs(peak_freqs[right] - targets), left, right
+    )
+    matched = (np.abs(peak_freqs[nearest] - targets) <= tolerance_hz) & (targets > 0)
+    return (
+        matched,
+        np.where(matched, peak_amps[nearest], 0.0),
+        np.where(matched, peak_freqs[nearest], np.nan)
+    )
+
+
+def _tolerance(targets, resolution, relative=REFINED_TOLERANCE):
+    return np.maximum(np.abs(targets) * relative, MIN_TOLERANCE_BINS * resolution)
+
+
+def harmonic_families(peak_freqs, peak_amps, fundamentals, resolution, relative_tolerance=HARMONIC_TOLERANCE,
+                      n_harmonics=MAX_HARMONICS):
+    """
+    Comb harmonik untuk banyak fundamental sekaligus (matrix fundamental × orde)
+
+    Fundamental nominal dicocokkan dulu dengan toleransi relatif_tolerance; jika ketemu,
+    comb harmonik memakai frekuensi peak aktual dengan toleransi REFINED_TOLERANCE.
+
+    Returns:
+        tuple: (matched F×H, amplitudo F×H, fundamental terkoreksi F)
+    """
+    fundamentals = np.asarray(fundamentals, dtype=float)
+    relative = np.broadcast_to(relative_tolerance, fundamentals.shape)
+    found, _, found_freqs = match_comb(
+        peak_freqs, peak_amps, fundamentals, _tolerance(fundamentals, resolution, relative)
+    )
+    base = np.where(found, found_freqs, fundamentals)
+    refined = np.where(found, REFINED_TOLERANCE, relative)
+
+    targets = base[:, None] * np.arange(1, n_harmonics + 1)[None, :]
+    matched, amps, _ = match_comb(peak_freqs, peak_amps, targets, _tolerance(targets, resolution, refined[:, None]))
+    return matched, amps, base
+
+
+def sideband_families(peak_freqs, peak_amps, carriers, spacings, resolution, relative_tolerance=REFINED_TOLERANCE,
+                      n_sidebands=MAX_SIDEBANDS):
+    """
+    Comb sideband carrier ± k·spacing (k = 1..n) untuk banyak carrier sekaligus
+
+    Returns:
+        tuple: (matched C×2n, amplitudo C×2n, frekuensi peak C×2n) - kolom: -n..-1, +1..+n
+    """
+    offsets = np.concatenate([np.arange(-n_sidebands, 0), np.arange(1, n_sidebands + 1)])
+    carriers = np.asarray(carriers, dtype=float)
+    targets = carriers[:, None] + np.asarray(spacings, dtype=float)[:, None] * offsets[None, :]
+    relative = np.broadcast_to(relative_tolerance, carriers.shape)[:, None]
+    return match_comb(peak_freqs, peak_amps, targets, _tolerance(targets, resolution, relative))
+
+
+def _family_fundamentals(rpm_hz, bearings, vane_count, line_frequency):
+    """Daftar fundamental bernama: (nama, frekuensi Hz, kind, spacing sideband Hz)"""
+    rpm = round(rpm_hz * 60.0, 1)
+    fundamentals = [("1x RPM", rpm_hz, "shaft", None)]
+    for designation in dict.fromkeys(b for b in bearings if b in BEARING_CATALOG):
+        frequencies = calculate_bearing_frequencies(designation, rpm)
+        fundamentals.extend([
+            (f"BPFO {designation}", frequencies["BPFO"], "bpfo", rpm_hz),
+            (f"BPFI {designation}", frequencies["BPFI"], "bpfi", rpm_hz),
+            (f"BSF {designation}", frequencies["BSF"], "bsf", frequencies["FTF"]),
+            (f"FTF {designation}", frequencies["FTF"], "ftf", None)
+        ])
+    if vane_count:
+        fundamentals.append(("Vane Pass", vane_count * rpm_hz, "vane", rpm_hz))
+    if line_frequency:
+        fundamentals.append(("2x Line Frequency", 2 * line_frequency, "electrical", None))
+    return fundamentals
+
+
+def _evidence(kind, name, harmonic_amps, matched, sidebands):
+    """Aturan evidence per family (ISO 13373-3 Table 2) - return (fault, confidence) atau None"""
+    count = int(matched.sum())
+    first = harmonic_amps[0]
+    second = harmonic_amps[1] if len(harmonic_amps) > 1 else 0.0
+
+    if kind == "shaft":
+        if count >= 4:
+            return "Mechanical Looseness (1x harmonic series)", "HIGH" if count >= 6 else "MEDIUM"
+        if matched[0] and second > 0.5 * first:
+            return "Misalignment (2x ≥ 50% of 1x)", "HIGH" if second > first else "MEDIUM"
+        if matched[0] and count == 1:
+            return "Unbalance (dominant 1x)", "MEDIUM"
+        return None
+    if kind == "bpfo" and count >= 2:
+        return f"Outer Race Defect ({name})", "HIGH" if count >= 3 else "MEDIUM"
+    if kind == "bpfi" and count >= 1:
+        if sidebands >= 2:
+            return f"Inner Race Defect ({name}, 1x sidebands)", "HIGH"
+        if count >= 2:
+            return f"Inner Race Defect ({name})", "MEDIUM"
+        return None
+    if kind == "bsf" and count >= 1:
+        if sidebands >= 2:
+            return f"Rolling Element Defect ({name}, FTF sidebands)", "HIGH"
+        if count >= 2:
+            return f"Rolling Element Defect ({name})", "MEDIUM"
+        return None
+    if kind == "ftf" and count >= 2:
+        return f"Cage Defect ({name})", "MEDIUM"
+    if kind == "vane" and matched[0] and sidebands >= 2:
+        return "Vane Pass with 1x sidebands - impeller/diffuser gap or vane damage", "MEDIUM"
+    if kind == "electrical" and matched[0]:
+        return "2x Line Frequency - stator/electrical unbalance", "MEDIUM"
+    if kind == "unknown" and count >= 3:
+        return f"Unidentified harmonic family ({name})", "LOW"
+    return None
+
+
+def analyze_spectrum(freqs, amplitude, rpm_actual, bearings=(), vane_count=None,
+                     line_frequency=50.0, component="pump"):
+    """
+    Analisis spektrum penuh: harmonic family + sideband untuk semua fundamental
+
+    Args:
+        freqs, amplitude: spektrum lengkap (Hz, mm/s RMS)
+        bearings: designation bearing terpasang (BEARING_CATALOG)
+        vane_count: jumlah vane impeller (opsional, untuk family vane pass)
+
+    Returns:
+        dict: Families (comb match per fundamental) + evidence fault terstruktur
+    """
+    freqs = np.asarray(freqs, dtype=float)
+    amplitude = np.asarray(amplitude, dtype=float)
+    if len(freqs) < 3 or not rpm_actual or rpm_actual <= 0:
+        return {
+            "available": False,
+            "message": "Spectrum not available or RPM invalid",
+            "families": [],
+            "evidence": []
+        }
+
+    resolution = float(np.median(np.diff(freqs)))
+    peak_freqs, peak_amps, noise_floor = detect_spectral_peaks(freqs, amplitude)
+
+    # Koreksi kecepatan poros ke peak 1x aktual (RPM tachometer ±1%)
+    rpm_hz = rpm_actual / 60.0
+    speed_found, _, speed_peak = match_comb(
+        peak_freqs, peak_amps, np.array([rpm_hz]), _tolerance(np.array([rpm_hz]), resolution, HARMONIC_TOLERANCE)
+    )
+    if speed_found[0]:
+        rpm_hz = float(speed_peak[0])
+    speed_tolerance = REFINED_TOLERANCE if speed_found[0] else HARMONIC_TOLERANCE
+
+    named = _family_fundamentals(rpm_hz, bearings, vane_count, line_frequency)
+    relative = np.array([speed_tolerance if kind in ["shaft", "vane"] else HARMONIC_TOLERANCE for _, _, kind, _ in named])
+    matched, amps, base = harmonic_families(peak_freqs, peak_amps, [f for _, f, _, _ in named], resolution, relative)
+
+    # Sideband untuk family yang punya spacing (BPFI ± 1x, BSF ± FTF, vane pass ± 1x),
+    # di sekitar carrier aktual; hanya bermakna jika carrier-nya ada
+    with_sidebands = [i for i, (_, _, _, spacing) in enumerate(named) if spacing and matched[i, 0]]
+    sideband_counts = np.zeros(len(named), dtype=int)
+    sideband_amps = {}
+    sideband_peaks = np.zeros(0)
+    if with_sidebands:
+        side_matched, side_amps, side_freqs = sideband_families(
+            peak_freqs, peak_amps,
+            carriers=base[with_sidebands],
+            spacings=np.array([named[i][3] for i in with_sidebands]),
+            resolution=resolution,
+            relative_tolerance=np.array([
+                speed_tolerance if named[i][3] == rpm_hz else HARMONIC_TOLERANCE for i in with_sidebands
+            ])
+        )
+        for row, i in enumerate(with_sidebands):
+            sideband_counts[i] = int(side_matched[row].sum())
+            sideband_amps[i] = [round(float(a), 3) for a in side_amps[row]]
+        sideband_peaks = side_freqs[side_matched]
+
+    # Peak besar yang tidak dijelaskan family bernama -> kandidat fundamental tak dikenal
+    targets = base[:, None] * np.arange(1, MAX_HARMONICS + 1)[None, :]
+    tolerance = _tolerance(targets, resolution, np.where(matched[:, :1], REFINED_TOLERANCE, relative[:, None]))
+    explained = (np.abs(peak_freqs[None, :] - targets.ravel()[:, None]) <= tolerance.ravel()[:, None]).any(axis=0)
+    explained |= np.isin(peak_freqs, sideband_peaks)
+    unexplained = np.flatnonzero(~explained)
+    candidates = np.sort(unexplained[np.argsort(peak_amps[unexplained])[::-1][:AUTO_FUNDAMENTAL_CANDIDATES]])
+    unknown = []
+    for index in candidates:
+        frequency = float(peak_freqs[index])
+        # Lewati kandidat yang merupakan harmonik dari kandidat lebih rendah
+        if any(abs(frequency / f - round(frequency / f)) < REFINED_TOLERANCE * round(frequency / f) for _, f, _, _ in unknown):
+            continue
+        unknown.append((f"{frequency:.1f} Hz", frequency, "unknown", None))
+    if unknown:
+        unknown_matched, unknown_amps, unknown_base = harmonic_families(
+            peak_freqs, peak_amps, [f for _, f, _, _ in unknown], resolution, REFINED_TOLERANCE
+        )
+        matched = np.vstack([matched, unknown_matched])
+        amps = np.vstack([amps, unknown_amps])
+        base = np.concatenate([base, unknown_base])
+        sideband_counts = np.concatenate([sideband_counts, np.zeros(len(unknown), dtype=int)])
+    fundamentals = named + unknown
+
+    families = []
+    evidence = []
+    for i, (name, _, kind, spacing) in enumerate(fundamentals):
+        if not matched[i].any() or (kind == "unknown" and matched[i].sum() < 2):
+            continue
+        family = {
+            "name": name,
+            "kind": kind,
+            "fundamental_hz": round(float(base[i]), 2),
+            "harmonics_matched": [int(h) + 1 for h in np.flatnonzero(matched[i])],
+            "harmonic_amplitudes_mms": [round(float(a), 3) for a in amps[i]],
+            "sideband_spacing_hz": round(float(spacing), 2) if spacing else None,
+            "sidebands_matched": int(sideband_counts[i]),
+            "sideband_amplitudes_mms": sideband_amps.get(i, [])
+        }
+        families.append(family)
+        verdict = _evidence(kind, name, amps[i], matched[i], sideband_counts[i])
+        if verdict:
+            fault, confidence = verdict
+            evidence.append({
+                "component": component,
+                "fault": fault,
+                "confidence": confidence,
+                "family": name,
+                "fundamental_hz": family["fundamental_hz"],
+                "harmonics_matched": family["harmonics_matched"],
+                "sidebands_matched": family["sidebands_matched"]
+            })
+
+    order = {"HIGH": 0, "MEDIUM": 1, "LOW": 2}
+    evidence.sort(key=lambda e: order[e["confidence"]])
+
+    return {
+        "available": True,
+        "component": component,
+        "rpm_hz": round(rpm_hz, 2),
+        "resolution_hz": round(resolution, 4),
+        "lines": len(freqs),
+        "peak_count": len(peak_freqs),
+        "noise_floor_mms": round(float(np.median(noise_floor)), 4),
+        "families": families,
+        "evidence": evidence,
+        "has_issue": any(e["confidence"] in ["HIGH", "MEDIUM"] for e in evidence),
+        "standard": "ISO 13373-3 §6.2 (harmonic & sideband analysis)"
+    }
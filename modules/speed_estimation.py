@@ -0,0 +1,204 @@
+"""
+Estimasi kecepatan putar (1x) tanpa tachometer - ISO 13373-2 §6 / MCSA (IEC 60034-26)
+
+Urutan sumber: spektrum arus motor (sideband eksentrisitas f_line + f_r) → spektrum
+vibrasi penuh → peak FFT manual → asumsi rated speed.
+"""
+import numpy as np
+
+from modules.asset_registry import rated_speed
+from modules.diagnosis_engine import parse_fft_peaks
+from modules.signal_processing import interpolate_peak
+
+# Jendela pencarian 1x relatif terhadap rated speed (motor induksi: slip di bawah rated,
+# sedikit di atas untuk beban ringan / mendekati kecepatan sinkron)
+SPEED_SEARCH_BELOW = 0.08
+SPEED_SEARCH_ABOVE = 0.03
+
+# Rasio peak terhadap median jendela untuk confidence
+SPEED_SNR_HIGH = 10.0
+SPEED_SNR_MIN = 4.0
+
+# Amplitudo minimum peak FFT manual (mm/s, sama dengan analyze_fft_peaks)
+SPEED_PEAK_MIN_AMPLITUDE = 0.5
+
+# Bin di sekitar harmonik line frequency yang diabaikan pada MCSA (Hz)
+MCSA_LINE_GUARD_HZ = 0.5
+
+# Fallback jika rated speed juga tidak diketahui (default historis run_complete_diagnosis)
+DEFAULT_RPM = 2950
+
+
+def search_window(rated_rpm):
+    """Jendela frekuensi 1x (Hz) di sekitar rated speed"""
+    rated_hz = rated_rpm / 60.0
+    return rated_hz * (1 - SPEED_SEARCH_BELOW), rated_hz * (1 + SPEED_SEARCH_ABOVE)
+
+
+def _window_peak(freqs, amplitude, low, high, exclude=None):
+    """
+    Peak lokal terbesar di jendela [low, high] + interpolasi parabolik
+
+    Returns:
+        tuple: (frekuensi Hz terinterpolasi, amplitudo peak, median jendela) atau (None, 0.0, 0.0)
+    """
+    in_window = (freqs >= low) & (freqs <= high)
+    if exclude is not None:
+        in_window &= ~exclude
+    in_window[[0, -1]] = False
+    candidates = np.flatnonzero(
+        in_window[1:-1]
+        & (amplitude[1:-1] > amplitude[:-2])
+        & (amplitude[1:-1] >= amplitude[2:])
+    ) + 1
+    if len(candidates) == 0:
+        return None, 0.0, 0.0
+
+    index = candidates[np.argmax(amplitude[candidates])]
+    offset, _ = interpolate_peak(amplitude, index)
+    return float(freqs[index] + offset * (freqs[1] - freqs[0])), float(amplitude[index]), float(np.median(amplitude[in_window]))
+
+
+def _snr(peak, floor):
+    return peak / floor if floor > 0 else float("inf")
+
+
+def _confidence(snr, has_harmonic):
+    if snr >= SPEED_SNR_HIGH and has_harmonic:
+        return "HIGH"
+    if snr >= SPEED_SNR_MIN:
+        return "MEDIUM"
+    return "LOW"
+
+
+def estimate_speed_from_vibration(freqs, amplitude, rated_rpm):
+    """
+    Cari 1x di spektrum vibrasi dekat rated speed (konfirmasi dengan peak 2x)
+
+    Returns:
+        dict: rpm (None jika tidak ditemukan), confidence, snr
+    """
+    freqs = np.asarray(freqs, dtype=float)
+    amplitude = np.asarray(amplitude, dtype=float)
+    if len(freqs) < 3 or not rated_rpm:
+        return {"rpm": None, "confidence": "LOW", "snr": 0.0}
+
+    low, high = search_window(rated_rpm)
+    frequency, peak, floor = _window_peak(freqs, amplitude, low, high)
+    if frequency is None:
+        return {"rpm": None, "confidence": "LOW", "snr": 0.0}
+    snr = _snr(peak, floor)
+
+    # Konfirmasi: peak 2x di atas noise floor jendela 1x
+    resolution = freqs[1] - freqs[0]
+    harmonic, harmonic_peak, _ = _window_peak(freqs, amplitude, 2 * frequency - 2 * resolution, 2 * frequency + 2 * resolution)
+    has_harmonic = harmonic is not None and _snr(harmonic_peak, floor) >= SPEED_SNR_MIN
+
+    return {
+        "rpm": round(frequency * 60.0, 1),
+        "confidence": _confidence(snr, has_harmonic),
+        "snr": round(snr, 1)
+    }
+
+
+def estimate_speed_from_current(freqs, amplitude, rated_rpm, line_frequency=50.0):
+    """
+    MCSA: sideband eksentrisitas rotor di f_line + f_r (harmonik line frequency diabaikan)
+
+    Returns:
+        dict: rpm (None jika tidak ditemukan), confidence, snr
+    """
+    freqs = np.asarray(freqs, dtype=float)
+    amplitude = np.asarray(amplitude, dtype=float)
+    if len(freqs) < 3 or not rated_rpm:
+        return {"rpm": None, "confidence": "LOW", "snr": 0.0}
+
+    low, high = search_window(rated_rpm)
+    line_distance = np.abs(freqs - line_frequency * np.round(freqs / line_frequency))
+    frequency, peak, floor = _window_peak(
+        freqs, amplitude, line_frequency + low, line_frequency + high,
+        exclude=line_distance <= MCSA_LINE_GUARD_HZ
+    )
+    if frequency is None:
+        return {"rpm": None, "confidence": "LOW", "snr": 0.0}
+    snr = _snr(peak, floor)
+
+    # Konfirmasi dengan sideband bawah |f_line - f_r| jika berada di spektrum
+    rotor_hz = frequency - line_frequency
+    resolution = freqs[1] - freqs[0]
+    lower = abs(line_frequency - rotor_hz)
+    mirror, mirror_peak, _ = _window_peak(freqs, amplitude, lower - 2 * resolution, lower + 2 * resolution)
+    has_mirror = mirror is not None and _snr(mirror_peak, floor) >= SPEED_SNR_MIN
+
+    return {
+        "rpm": round(rotor_hz * 60.0, 1),
+        "confidence": _confidence(snr, has_mirror),
+        "snr": round(snr, 1)
+    }
+
+
+def estimate_speed_from_peaks(fft_sets, rated_rpm):
+    """
+    Peak FFT manual terbesar (amplitudo > 0.5 mm/s) di jendela rated speed
+
+    Args:
+        fft_sets: list fft_data (format FFT_{lokasi}_{arah}_FreqN / AmpN)
+
+    Returns:
+        dict: rpm (None jika tidak ditemukan), confidence
+    """
+    if not rated_rpm:
+        return {"rpm": None, "confidence": "LOW"}
+
+    parsed = [parse_fft_peaks(fft_data or {}) for fft_data in fft_sets]
+    freqs = np.concatenate([f for f, _, _ in parsed]) if parsed else np.zeros(0)
+    amps = np.concatenate([a for _, a, _ in parsed]) if parsed else np.zeros(0)
+
+    low, high = search_window(rated_rpm)
+    candidates = np.flatnonzero((freqs >= low) & (freqs <= high) & (amps > SPEED_PEAK_MIN_AMPLITUDE))
+    if len(candidates) == 0:
+        return {"rpm": None, "confidence": "LOW"}
+
+    index = candidates[np.argmax(amps[candidates])]
+    return {"rpm": round(float(freqs[index]) * 60.0, 1), "confidence": "MEDIUM"}
+
+
+def estimate_running_speed(input_data, asset=None):
+    """
+    Tentukan kecepatan putar untuk analisis order: tachometer jika ada, jika tidak
+    estimasi dari spektrum arus / vibrasi / peak FFT, terakhir asumsi rated speed
+    (rated speed dari registry aset jika pompa terdaftar)
+
+    Returns:
+        dict: rpm, source ("tachometer"|"current_spectrum"|"vibration_spectrum"|"fft_peaks"|"assumed"),
+              confidence, rated_rpm
+    """
+    actual_rpm = input_data.get("rpm")
+    rated_rpm = rated_speed(asset, input_data["specification"].get("rated_rpm")) or 0
+    result = {"rated_rpm": rated_rpm, "standard": "ISO 13373-2 §6 (speed reference)"}
+
+    if actual_rpm:
+        return {**result, "rpm": actual_rpm, "source": "tachometer", "confidence": "HIGH"}
+
+    current = input_data.get("current_spectrum")
+    if current:
+        estimate = estimate_speed_from_current(
+            current.get("freqs", []), current.get("amplitude", []), rated_rpm,
+            line_frequency=current.get("line_frequency", 50.0)
+        )
+        if estimate["rpm"] and estimate["confidence"] != "LOW":
+            return {**result, **estimate, "source": "current_spectrum"}
+
+    for component in ["motor", "pump"]:
+        spectrum = (input_data.get("spectrum") or {}).get(component)
+        if not spectrum:
+            continue
+        estimate = estimate_speed_from_vibration(spectrum.get("freqs", []), spectrum.get("amplitude", []), rated_rpm)
+        if estimate["rpm"] and estimate["confidence"] != "LOW":
+            return {**result, **estimate, "source": "vibration_spectrum", "component": component}
+
+    estimate = estimate_speed_from_peaks([input_data.get("fft_motor"), input_data.get("fft_pump")], rated_rpm)
+    if estimate["rpm"]:
+        return {**result, **estimate, "source": "fft_peaks"}
+
+    return {**result, "rpm": rated_rpm or DEFAULT_RPM, "source": "assumed", "confidence": "LOW"}
@@ -0,0 +1,84 @@
+"""Pipeline diagnosa streaming JSON Lines - memori konstan untuk backfill historis"""
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from modules.diagnosis_engine import run_complete_diagnosis
+from modules.inspection_records import record_to_input_data
+from modules.batch_runner import result_to_json
+
+
+def iter_jsonl(stream):
+    """
+    Baca baris JSON Lines secara lazy (baris kosong dilewati)
+
+    Parsing JSON dilakukan di diagnose_line agar baris rusak tidak menghentikan stream.
+
+    Yields:
+        tuple: (nomor baris, teks JSON)
+    """
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if line:
+            yield line_number, line
+
+
+def to_input_data(record):
+    """Record nested (format input_data) dipakai langsung, record datar dikonversi dulu"""
+    if "specification" in record:
+        record.setdefault("metadata", {})
+        return record
+    return record_to_input_data(record)
+
+
+def diagnose_line(item):
+    """Diagnosa satu (nomor baris, teks JSON) - error dikembalikan sebagai record, bukan exception"""
+    line_number, line = item
+    try:
+        return run_complete_diagnosis(to_input_data(json.loads(line)), parallel=False, memoize=False)
+    except Exception as e:
+        return {"line": line_number, "error": f"{type(e).__name__}: {e}"}
+
+
+def diagnose_stream(items, workers=1):
+    """
+    Diagnosa record satu per satu dan yield hasil segera setelah selesai
+
+    Dengan workers > 1, jumlah task yang sedang berjalan dibatasi (workers * 4)
+    sehingga memori tetap konstan berapapun ukuran input. Urutan output = urutan input.
+
+    Yields:
+        dict: Hasil run_complete_diagnosis atau record error
+    """
+    if workers <= 1:
+        for item in items:
+            yield diagnose_line(item)
+        return
+
+    max_pending = workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(diagnose_line, item))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def run_stream(input_stream, output_stream, workers=1):
+    """
+    Baca JSON Lines dari input_stream, tulis hasil JSON Lines ke output_stream (flush per record)
+
+    Returns:
+        tuple: (jumlah hasil, jumlah error)
+    """
+    count = 0
+    errors = 0
+    for result in diagnose_stream(iter_jsonl(input_stream), workers=workers):
+        if "error" in result:
+            errors += 1
+        output_stream.write(result_to_json(result) + "\n")
+        output_stream.flush()
+        count += 1
+    return count, errors
@@ -1,6 +1,8 @@
 """Analisis thermal sesuai API 610 12th Ed. §11.3"""
 from typing import Dict
 
+from utils.lookup_tables import DIAGNOSIS_THRESHOLDS
+
 
 def analyze_thermal_conditions(
     temp_motor_de: float,
@@ -18,16 +20,12 @@ def analyze_thermal_conditions(
         dict: Hasil analisis thermal dengan status dan rekomendasi
     """
     # Threshold berdasarkan jenis pelumas (API 610 §11.3)
-    if lubricant_type.lower() == "grease":
-        warning_temp = 85
-        alarm_temp = 95
-        warning_rise = 40
-        alarm_rise = 55
-    else:  # oil lubricated
-        warning_temp = 95
-        alarm_temp = 105
-        warning_rise = 50
-        alarm_rise = 65
+    lubricant = "grease" if lubricant_type.lower() == "grease" else "oil"  # selain grease = oil lubricated
+    warning_temp = DIAGNOSIS_THRESHOLDS[f"{lubricant}_warning_temp_c"]
+    alarm_temp = DIAGNOSIS_THRESHOLDS[f"{lubricant}_alarm_temp_c"]
+    warning_rise = DIAGNOSIS_THRESHOLDS[f"{lubricant}_warning_rise_c"]
+    alarm_rise = DIAGNOSIS_THRESHOLDS[f"{lubricant}_alarm_rise_c"]
+    volatile_rise = DIAGNOSIS_THRESHOLDS["volatile_pump_nde_rise_c"]
     
     # Hitung rise above ambient
     rise_motor_de = temp_motor_de - temp_ambient
@@ -41,11 +39,11 @@ def analyze_thermal_conditions(
     recommendations = []
     
     # Critical untuk pompa gasoline/avtur (API 682 §5.4.2)
-    if product_type in ["Gasoline", "Avtur", "Naphtha"] and rise_pump_nde > 40:
+    if product_type in ["Gasoline", "Avtur", "Naphtha"] and rise_pump_nde > volatile_rise:
         has_issue = True
         overall_status = "CRITICAL"
         recommendations.append(
-            f"🚨 CRITICAL: Pump NDE bearing rise {rise_pump_nde:.1f}°C > 40°C threshold for volatile products - "
+            f"🚨 CRITICAL: Pump NDE bearing rise {rise_pump_nde:.1f}°C > {volatile_rise}°C threshold for volatile products - "
             f"seal failure imminent. SHUTDOWN REQUIRED within 2 hours."
         )
     
@@ -111,6 +109,8 @@ def analyze_thermal_conditions(
         "delta_temp_pump": round(delta_pump, 1),
         "max_temperature": round(max_temp, 1),
         "max_rise": round(max_rise, 1),
+        "alarm_temp": alarm_temp,
+        "alarm_rise": alarm_rise,
         "overall_status": overall_status,
         "recommendations": recommendations,
         "has_issue": has_issue,
@@ -0,0 +1,184 @@
+"""
+Baseline per pompa: statistik inkremental (EWMA + Welford) - ISO 13373-1 §6 trend monitoring
+
+Setiap inspeksi baru meng-update baseline dalam O(1) tanpa membaca ulang histori, lalu
+inspeksi dibandingkan dengan baseline pompa itu sendiri (bukan hanya threshold absolut).
+"""
+import math
+
+from modules.history_store import find_inspection, insert_result, load_baseline, load_result, save_baseline
+
+# Smoothing factor EWMA (≈ 9 inspeksi terakhir dominan)
+EWMA_ALPHA = 0.2
+
+# Minimum jumlah inspeksi sebelum deviasi boleh di-flag
+MIN_BASELINE_SAMPLES = 5
+
+# Deviasi dianggap signifikan jika |z| > threshold DAN selisih absolut > min_delta
+DEVIATION_Z_THRESHOLD = 3.0
+
+TREND_METRICS = {
+    "overall_velocity": {
+        "label": "Overall vibration velocity",
+        "unit": "mm/s",
+        "min_delta": 0.5,
+        "extract": lambda r: max(
+            r["analyses"]["mechanical"]["motor"]["averages"]["Overall_Max"],
+            r["analyses"]["mechanical"]["pump"]["averages"]["Overall_Max"]
+        )
+    },
+    "hf_max": {
+        "label": "HF band 5-16 kHz",
+        "unit": "g",
+        "min_delta": 0.1,
+        "extract": lambda r: r["analyses"]["hydraulic"]["hf_max"]
+    },
+    "demod_max": {
+        "label": "Demodulation",
+        "unit": "g",
+        "min_delta": 0.1,
+        "extract": lambda r: r["analyses"]["mechanical"]["demod_max"]
+    },
+    "bearing_rise": {
+        "label": "Bearing temperature rise",
+        "unit": "°C",
+        "min_delta": 5.0,
+        "extract": lambda r: r["analyses"]["thermal"]["max_rise"]
+    },
+    "current_imbalance": {
+        "label": "Current imbalance",
+        "unit": "%",
+        "min_delta": 1.0,
+        "extract": lambda r: r["analyses"]["electrical"]["current"]["imbalance_pct"]
+    }
+}
+
+
+def new_metric_state():
+    """State kosong untuk satu metrik"""
+    return {"count": 0, "mean": 0.0, "m2": 0.0, "ewma": 0.0, "ewm_var": 0.0}
+
+
+def update_metric_state(state, value, alpha=EWMA_ALPHA):
+    """
+    Update Welford mean/variance + EWMA mean/variance dengan satu observasi (O(1))
+
+    Returns:
+        dict: State baru
+    """
+    count = state["count"] + 1
+    delta = value - state["mean"]
+    mean = state["mean"] + delta / count
+    m2 = state["m2"] + delta * (value - mean)
+
+    if state["count"] == 0:
+        ewma = value
+        ewm_var = 0.0
+    else:
+        ewm_delta = value - state["ewma"]
+        ewma = state["ewma"] + alpha * ewm_delta
+        ewm_var = (1 - alpha) * (state["ewm_var"] + alpha * ewm_delta ** 2)
+
+    return {"count": count, "mean": mean, "m2": m2, "ewma": ewma, "ewm_var": ewm_var}
+
+
+def metric_std(state):
+    """Standar deviasi baseline: max(EWMA std, Welford std) agar tidak terlalu sensitif"""
+    welford_var = state["m2"] / (state["count"] - 1) if state["count"] > 1 else 0.0
+    return math.sqrt(max(state["ewm_var"], welford_var))
+
+
+def evaluate_metric(name, state, value):
+    """
+    Bandingkan observasi dengan baseline pompa (sebelum baseline di-update)
+
+    Returns:
+        dict: Hasil evaluasi deviasi metrik
+    """
+    definition = TREND_METRICS[name]
+    ready = state["count"] >= MIN_BASELINE_SAMPLES
+    std = metric_std(state)
+    delta = value - state["ewma"]
+    # Floor std agar baseline yang sangat stabil tidak menghasilkan z tak hingga
+    z_score = delta / max(std, definition["min_delta"] / DEVIATION_Z_THRESHOLD)
+    deviation = ready and abs(z_score) > DEVIATION_Z_THRESHOLD and abs(delta) > definition["min_delta"]
+
+    return {
+        "metric": name,
+        "label": definition["label"],
+        "value": round(value, 2),
+        "baseline": round(state["ewma"], 2),
+        "baseline_std": round(std, 3),
+        "z_score": round(z_score, 2),
+        "samples": state["count"],
+        "deviation": deviation,
+        "message": (
+            f"⚠️ {definition['label']} {value:.2f} {definition['unit']} deviates from pump baseline "
+            f"{state['ewma']:.2f} {definition['unit']} ({'+' if delta > 0 else ''}{delta:.2f}) - investigate trend"
+            if deviation else ""
+        )
+    }
+
+
+def evaluate_and_update(baseline, result):
+    """
+    Evaluasi semua metrik tren lalu update baseline
+
+    Args:
+        baseline: dict metric -> state (dimodifikasi in-place)
+        result: hasil run_complete_diagnosis
+
+    Returns:
+        dict: Ringkasan tren untuk dilampirkan ke hasil diagnosa
+    """
+    evaluations = []
+    for name, definition in TREND_METRICS.items():
+        value = float(definition["extract"](result))
+        state = baseline.get(name) or new_metric_state()
+        evaluations.append(evaluate_metric(name, state, value))
+        baseline[name] = update_metric_state(state, value)
+
+    deviations = [e for e in evaluations if e["deviation"]]
+    return {
+        "metrics": evaluations,
+        "deviations": [e["message"] for e in deviations],
+        "has_deviation": len(deviations) > 0,
+        "standard": "ISO 13373-1 §6 (trend monitoring)"
+    }
+
+
+def apply_trend_baseline(conn, result):
+    """
+    Muat baseline pompa dari history store, lampirkan evaluasi tren ke result["trend"], simpan baseline baru
+
+    Tidak melakukan commit - caller membungkus dalam transaksi (with conn:).
+    """
+    pump_tag = str(result["metadata"].get("pump_tag") or "Unknown")
+    baseline = load_baseline(conn, pump_tag)
+    result["trend"] = evaluate_and_update(baseline, result)
+    save_baseline(conn, pump_tag, baseline)
+    return result["trend"]
+
+
+def record_inspection(conn, result, input_data=None, before_save=None):
+    """
+    Update baseline tren lalu simpan hasil - tanpa commit, caller membungkus dalam satu transaksi
+    (with conn:) sehingga baseline tidak maju jika penyimpanan gagal
+
+    Inspeksi yang sudah tersimpan (pompa & tanggal sama, mis. batch dijalankan ulang) tidak
+    meng-update baseline lagi: evaluasi tren tersimpan dipakai ulang dan barisnya di-update.
+
+    Args:
+        before_save: callable(conn, result) opsional setelah tren, sebelum disimpan (mis. apply_rul_forecast)
+
+    Returns:
+        int: id baris
+    """
+    stored = find_inspection(conn, result)
+    if stored is None:
+        apply_trend_baseline(conn, result)
+    else:
+        result["trend"] = load_result(stored).get("trend")
+    if before_save is not None:
+        before_save(conn, result)
+    return insert_result(conn, result, input_data)
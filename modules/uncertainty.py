@@ -0,0 +1,172 @@
+"""
+Propagasi ketidakpastian pengukuran (Monte Carlo) - JCGM 101:2008 (GUM Supplement 1)
+
+Input inspeksi diperturbasi sesuai ketidakpastian instrumen (gauge tekanan, clamp meter,
+penempatan sensor vibrasi, ...) lalu seluruh sampel dijalankan sekaligus melalui kernel
+vectorized fleet_engine, menghasilkan probabilitas setiap status (mis. P(cavitation HIGH)).
+"""
+import numpy as np
+import pandas as pd
+
+from modules.asset_registry import get_asset, asset_limits, curve_value, rated_speed
+from modules.fleet_engine import (
+    hydraulic_arrays, electrical_arrays, mechanical_arrays, thermal_arrays, prioritize_arrays
+)
+from modules.inspection_records import input_data_to_record, VIBRATION_KEYS, COMPONENTS, RECORD_DEFAULTS
+from utils.fluid_properties import product_density, product_vapor_pressure
+from utils.lookup_tables import DIAGNOSIS_THRESHOLDS
+
+DEFAULT_SAMPLES = 100_000
+
+# Ketidakpastian standar (1σ): "abs" = satuan field, "rel" = fraksi nilai terukur
+MEASUREMENT_UNCERTAINTY = {
+    "suction_pressure": {"abs": 2.0},      # gauge class 1.0, span 0-200 kPa
+    "discharge_pressure": {"abs": 5.0},    # gauge class 1.0, span 0-500 kPa
+    "flow_rate": {"rel": 0.02},            # flowmeter ±2%
+    "product_temperature": {"abs": 1.0},
+    "voltage": {"rel": 0.005},             # multimeter ±0.5%
+    "current": {"rel": 0.02},              # clamp meter ±2%
+    "rpm": {"abs": 5.0},                   # tachometer optik
+    "vibration": {"rel": 0.10},            # sebaran penempatan sensor (ISO 13373-1 §4.3)
+    "temperature": {"abs": 1.0}            # thermometer IR
+}
+
+# Status yang dilaporkan probabilitasnya
+STATUS_FIELDS = [
+    "cavitation_risk", "flow_status", "voltage_status", "current_status", "load_status",
+    "electrical_status", "overall_zone", "bearing_defect_risk", "thermal_status", "primary_type"
+]
+
+# Nilai kontinu yang dilaporkan intervalnya (persentil 5/50/95)
+INTERVAL_FIELDS = [
+    "npsha_margin", "flow_ratio", "voltage_imbalance_pct", "current_imbalance_pct", "load_pct",
+    "motor_max_mms", "pump_max_mms", "max_rise"
+]
+
+
+def _perturb(rng, value, spec, size, non_negative=True):
+    """Sampel terukur: nilai + noise normal (absolut atau relatif)"""
+    sigma = spec.get("abs", 0.0) + spec.get("rel", 0.0) * abs(value)
+    samples = value + sigma * rng.standard_normal(size)
+    return np.maximum(samples, 0.0) if non_negative else samples
+
+
+def propagate_uncertainty(input_data, diagnosis_result=None, samples=DEFAULT_SAMPLES, uncertainty=None, seed=0):
+    """
+    Monte Carlo uncertainty untuk satu inspeksi
+
+    Args:
+        input_data: struktur collect_all_inputs / record_to_input_data
+        diagnosis_result: hasil crisp (flag FFT dipertahankan; None = tanpa flag FFT)
+        samples: jumlah sampel perturbasi
+        uncertainty: override MEASUREMENT_UNCERTAINTY (per key)
+
+    Returns:
+        dict: probabilities {status_field: {status: p}}, intervals {field: [p5, p50, p95]}
+    """
+    spec = {**MEASUREMENT_UNCERTAINTY, **(uncertainty or {})}
+    rng = np.random.default_rng(seed)
+    record = input_data_to_record(input_data)
+    n = int(samples)
+
+    def value(key):
+        v = record.get(key)
+        return float(RECORD_DEFAULTS.get(key) or 0.0) if v is None else float(v)
+
+    product = record.get("product_type") or RECORD_DEFAULTS["product_type"]
+    # Field teks konstan: array 1 elemen, di-broadcast oleh kernel
+    foundation = np.array([str(record.get("foundation_type") or RECORD_DEFAULTS["foundation_type"]).lower()], dtype=object)
+
+    # Hidraulis
+    suction = _perturb(rng, value("suction_pressure"), spec["suction_pressure"], n, non_negative=False)
+    discharge = _perturb(rng, value("discharge_pressure"), spec["discharge_pressure"], n, non_negative=False)
+    flow = _perturb(rng, value("flow_rate"), spec["flow_rate"], n)
+    temperature = _perturb(rng, value("product_temperature"), spec["product_temperature"], n, non_negative=False)
+
+    asset = get_asset(record.get("pump_tag"))
+    limits = asset_limits(asset, record.get("pump_size") or RECORD_DEFAULTS["pump_size"])
+    npshr = np.full(n, limits["npshr_m"], dtype=float)
+    curve = curve_value(asset, "npshr_m", flow) if asset else None
+    if curve is not None:
+        npshr = np.where(flow > 0, curve, npshr)
+
+    hf_values = [
+        _perturb(rng, value(f"{component}_HF_{end}"), spec["vibration"], n)
+        for component in COMPONENTS for end in ["DE", "NDE"]
+    ]
+    hydraulic = hydraulic_arrays(
+        suction=suction,
+        discharge=discharge,
+        flow=flow,
+        density=product_density(product, temperature),
+        vapor_pressure=product_vapor_pressure(product, temperature),
+        npshr=npshr,
+        bep_flow=limits["bep_flow_m3h"],
+        hf_threshold=DIAGNOSIS_THRESHOLDS["hf_cavitation_g"][product],
+        hf_values=hf_values
+    )
+
+    # Listrik (RPM kosong tetap kosong: slip tidak dihitung, sama dengan jalur crisp)
+    actual_rpm = value("rpm")
+    electrical = electrical_arrays(
+        voltages=[_perturb(rng, value(f"voltage_l{i}"), spec["voltage"], n) for i in range(1, 4)],
+        currents=[_perturb(rng, value(f"current_l{i}"), spec["current"], n) for i in range(1, 4)],
+        fla=limits["fla_a"],
+        rated_rpm=rated_speed(asset, value("rated_rpm")),
+        actual_rpm=_perturb(rng, actual_rpm, spec["rpm"], n) if actual_rpm else np.zeros(n)
+    )
+
+    # Mekanikal (vibrasi, HF sudah di atas & demodulation)
+    vibration = {
+        component: {
+            key: _perturb(rng, value(f"{component}_{key}"), spec["vibration"], n)
+            for key in VIBRATION_KEYS
+        }
+        for component in COMPONENTS
+    }
+    mechanical = mechanical_arrays(vibration["motor"], vibration["pump"], foundation)
+
+    thermal = thermal_arrays(
+        temps=[
+            _perturb(rng, value(key), spec["temperature"], n, non_negative=False)
+            for key in ["temp_motor_de", "temp_motor_nde", "temp_pump_de", "temp_pump_nde"]
+        ],
+        ambient=_perturb(rng, value("temp_ambient"), spec["temperature"], n, non_negative=False),
+        product_type=np.array([product], dtype=object),
+        lubricant_type=np.array([str(record.get("lubricant_type") or RECORD_DEFAULTS["lubricant_type"])], dtype=object)
+    )
+
+    analyses = (diagnosis_result or {}).get("analyses", {})
+    priority = prioritize_arrays(
+        hydraulic["hydraulic_has_issue"],
+        electrical["electrical_has_issue"],
+        np.full(n, bool(analyses.get("fft_motor", {}).get("has_issue", False))),
+        np.full(n, bool(analyses.get("fft_pump", {}).get("has_issue", False))),
+        mechanical["mechanical_has_issue"],
+        thermal["thermal_has_issue"],
+        electrical.pop("electrical_ok")
+    )
+
+    columns = {**hydraulic, **electrical, **mechanical, **thermal, **priority}
+    probabilities = {
+        field: {
+            str(status): round(float(p), 4)
+            for status, p in pd.Series(np.broadcast_to(columns[field], n)).value_counts(normalize=True).items()
+        }
+        for field in STATUS_FIELDS
+    }
+
+    intervals = {
+        field: [round(float(v), 2) for v in np.percentile(np.broadcast_to(columns[field], n), [5, 50, 95])]
+        for field in INTERVAL_FIELDS
+    }
+
+    crisp_type = (diagnosis_result or {}).get("diagnosis", {}).get("primary_diagnosis", {}).get("type")
+    return {
+        "samples": n,
+        "probabilities": probabilities,
+        "intervals": intervals,
+        "primary_type_confidence": probabilities["primary_type"].get(crisp_type) if crisp_type else None,
+        "uncertainty": spec,
+        "standard": "JCGM 101:2008 (Monte Carlo propagation)"
+    }
@@ -1,5 +1,112 @@
 """Analisis vibrasi sesuai ISO 10816-3:2022"""
-from utils.lookup_tables import ISO_10816_3_LIMITS, FAULT_MAPPING
+from functools import lru_cache
+
+import numpy as np
+
+from utils.calculations import calculate_bearing_orders
+from utils.lookup_tables import (
+    ISO_10816_3_LIMITS, FAULT_MAPPING, FFT_ORDER_BANDS, FFT_BAND_KIND_PRIORITY,
+    BEARING_CATALOG, BEARING_FAULT_LABELS, BEARING_FREQUENCY_TOLERANCE
+)
+
+CONFIDENCE_LEVELS = np.array(["LOW", "MEDIUM", "HIGH"], dtype=object)
+
+
+def compile_order_bands(bands):
+    """
+    Compile tabel band order menjadi array NumPy untuk lookup np.searchsorted
+
+    Band yang overlap dipecah menjadi interval elementer; tiap interval milik band
+    dengan prioritas tertinggi (FFT_BAND_KIND_PRIORITY, lalu urutan list).
+
+    Returns:
+        dict: Array low/high/base confidence/threshold HIGH + label fault
+    """
+    ranked = sorted(
+        enumerate(bands),
+        key=lambda item: (FFT_BAND_KIND_PRIORITY.index(item[1].get("kind", "hydraulic")), item[0])
+    )
+    edges = sorted({edge for b in bands for edge in (b["low"], b["high"])})
+
+    intervals = []
+    for low, high in zip(edges[:-1], edges[1:]):
+        owner = next((b for _, b in ranked if b["low"] <= low and high <= b["high"]), None)
+        if owner is None:
+            continue
+        if intervals and intervals[-1][2] is owner and intervals[-1][1] == low:
+            intervals[-1] = (intervals[-1][0], high, owner)
+        else:
+            intervals.append((low, high, owner))
+
+    return {
+        "low": np.array([low for low, _, _ in intervals], dtype=float),
+        "high": np.array([high for _, high, _ in intervals], dtype=float),
+        "confidence": np.array([list(CONFIDENCE_LEVELS).index(b["confidence"]) for _, _, b in intervals], dtype=int),
+        "high_amp": np.array([np.inf if b["high_amp_mms"] is None else b["high_amp_mms"] for _, _, b in intervals], dtype=float),
+        "fault": np.array([b["fault"] for _, _, b in intervals], dtype=object)
+    }
+
+
+ORDER_TABLE = compile_order_bands(FFT_ORDER_BANDS)
+
+
+def bearing_order_bands(designation, tolerance=BEARING_FREQUENCY_TOLERANCE):
+    """Band order FTF/BPFO/BPFI/BSF (±toleransi) untuk satu bearing dari katalog"""
+    return [
+        {
+            "low": order * (1 - tolerance),
+            "high": order * (1 + tolerance),
+            "fault": f"{BEARING_FAULT_LABELS[name]} ({designation} {name} {order:.2f}x)",
+            "confidence": "MEDIUM",
+            "high_amp_mms": None,
+            "kind": "bearing"
+        }
+        for name, order in calculate_bearing_orders(designation).items()
+    ]
+
+
+@lru_cache(maxsize=128)
+def bearing_order_table(designations):
+    """
+    Tabel order ter-compile untuk kombinasi bearing terpasang (tuple designation)
+
+    Band bearing generik diganti band dari geometri katalog; designation yang tidak
+    ada di BEARING_CATALOG diabaikan. Di-cache per kombinasi bearing.
+    """
+    known = [d for d in dict.fromkeys(designations) if d in BEARING_CATALOG]
+    if not known:
+        return ORDER_TABLE
+    bands = [b for b in FFT_ORDER_BANDS if b.get("kind") != "bearing"]
+    for designation in known:
+        bands.extend(bearing_order_bands(designation))
+    return compile_order_bands(bands)
+
+
+def classify_order_peaks(ratio, amplitude, table=ORDER_TABLE):
+    """
+    Klasifikasi peak FFT (sembarang jumlah peak/kanal) terhadap tabel band order
+
+    Args:
+        ratio: array order peak (frekuensi / RPM Hz), bentuk bebas
+        amplitude: array amplitudo (mm/s), bentuk sama dengan ratio
+
+    Returns:
+        tuple: (index band, -1 = tidak dikenal; index confidence ke CONFIDENCE_LEVELS)
+    """
+    ratio = np.asarray(ratio, dtype=float)
+    amplitude = np.asarray(amplitude, dtype=float)
+
+    candidate = np.searchsorted(table["low"], ratio, side="right") - 1
+    safe = np.clip(candidate, 0, len(table["low"]) - 1)
+    matched = (candidate >= 0) & (ratio <= table["high"][safe])
+    band = np.where(matched, safe, -1)
+
+    confidence = np.where(
+        matched,
+        np.where(amplitude > table["high_amp"][safe], 2, table["confidence"][safe]),
+        0
+    )
+    return band, confidence
 
 
 def get_iso_zone(vibration_value, foundation_type):
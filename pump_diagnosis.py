@@ -0,0 +1,296 @@
+"""
+Command-line entry point (headless) untuk Pump Diagnosis Tool
+
+Contoh:
+    python -m pump_diagnosis batch inspections.csv -o results.jsonl --workers 8 --chunk-size 64
+    python -m pump_diagnosis stream history.jsonl -o results.jsonl
+    cat history.jsonl | python -m pump_diagnosis stream - > results.jsonl
+    python -m pump_diagnosis serve --host 0.0.0.0 --port 8080 --workers 4
+    python -m pump_diagnosis forecast /tmp/pump_history.db -o rul_forecast.csv
+    python -m pump_diagnosis analytics --store /tmp/pump_history.db -o fleet_anomalies.csv
+    python -m pump_diagnosis cache stats
+    python -m pump_diagnosis backtest --store /tmp/pump_history.db --outcomes failures.csv --grid sweep.json
+"""
+import argparse
+import sys
+
+# Jumlah record error batch yang dicetak ke stderr (sisanya hanya di file output)
+MAX_REPORTED_ERRORS = 20
+
+
+def cmd_batch(args):
+    """Diagnosa file inspeksi secara batch menggunakan process pool"""
+    from modules.batch_runner import read_inspections, run_batch, write_results, write_table
+
+    inspections = read_inspections(args.input)
+
+    if args.vectorized:
+        from modules.fleet_engine import run_fleet_diagnosis
+        results = run_fleet_diagnosis(inspections)
+        results.insert(0, "pump_tag", inspections.get("pump_tag"))
+        count = write_table(results, args.output)
+        # Baris dengan product_type / pump_size tidak dikenal: kolom hasil NaN + kolom error
+        failed = [(row, error) for row, error in enumerate(results.get("error", []), start=1) if isinstance(error, str)]
+        for row, error in failed[:MAX_REPORTED_ERRORS]:
+            print(f"⚠️ Row {row} ({results['pump_tag'].iloc[row - 1]}): {error}", file=sys.stderr)
+        print(f"✅ {count - len(failed)} inspections diagnosed (vectorized, {len(failed)} errors) -> {args.output}")
+        return 1 if len(failed) and args.fail_on_error else 0
+
+    records = inspections.to_dict(orient="records")
+    results = run_batch(records, workers=args.workers, chunk_size=args.chunk_size, cache_path=args.cache)
+
+    if args.store:
+        results = list(results)
+        store_results(args.store, records, results)
+
+    # Record error ditulis sebagai baris error di output (tidak menghentikan run), lalu dilaporkan
+    errors = []
+
+    def track_errors(items):
+        for result in items:
+            if "error" in result:
+                errors.append(result)
+            yield result
+
+    count = write_results(track_errors(results), args.output)
+    for failed in errors[:MAX_REPORTED_ERRORS]:
+        print(f"⚠️ Row {failed['row']} ({failed.get('pump_tag')}): {failed['error']}", file=sys.stderr)
+    print(f"✅ {count - len(errors)} inspections diagnosed ({len(errors)} errors) -> {args.output}")
+    return 1 if errors and args.fail_on_error else 0
+
+
+def store_results(path, records, results):
+    """Update baseline tren per pompa lalu simpan input + hasil batch ke history store (satu transaksi)"""
+    from modules.history_store import open_store
+    from modules.inspection_records import record_to_input_data
+    from modules.rul_forecast import apply_rul_forecast
+    from modules.trend_statistics import record_inspection
+
+    conn = open_store(path)
+    try:
+        # Baseline di-update berurutan sesuai urutan file (urutkan input per tanggal inspeksi);
+        # inspeksi yang sudah tersimpan tidak dihitung ulang ke baseline
+        saved = 0
+        with conn:
+            for record, result in zip(records, results):
+                if "error" in result:
+                    continue
+                record_inspection(conn, result, record_to_input_data(record), before_save=apply_rul_forecast)
+                saved += 1
+    finally:
+        conn.close()
+    print(f"💾 {saved} inspections stored -> {path}", file=sys.stderr)
+
+
+def cmd_stream(args):
+    """Diagnosa JSON Lines secara streaming (file atau stdin) dengan memori konstan"""
+    from modules.stream_pipeline import run_stream
+
+    input_stream = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    output_stream = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        count, errors = run_stream(input_stream, output_stream, workers=args.workers)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+    print(f"✅ {count} records streamed ({errors} errors)", file=sys.stderr)
+    return 1 if errors and args.fail_on_error else 0
+
+
+def cmd_serve(args):
+    """Jalankan HTTP diagnosis service (asyncio + process pool)"""
+    from modules.diagnosis_service import run_service
+    from modules.result_cache import DEFAULT_CACHE_PATH
+
+    print(f"🚀 Serving diagnosis API on http://{args.host}:{args.port}", file=sys.stderr)
+    cache_path = None if args.no_cache else (args.cache or DEFAULT_CACHE_PATH)
+    run_service(host=args.host, port=args.port, workers=args.workers, cache_path=cache_path)
+    return 0
+
+
+def cmd_cache(args):
+    """Tampilkan isi tier disk result cache atau kosongkan cache"""
+    from modules.result_cache import DEFAULT_CACHE_PATH, cache_stats, clear_cache
+
+    path = args.path or DEFAULT_CACHE_PATH
+    if args.action == "clear":
+        print(f"🗑️ {clear_cache(path)} cached results removed from {path}")
+        return 0
+
+    stats = cache_stats(path)
+    print(f"🗄️ {path}: {stats['disk_entries']} results, {stats['disk_bytes'] / 1e6:.1f} MB, "
+          f"{stats['disk_hits_total']} hits served")
+    return 0
+
+
+def cmd_forecast(args):
+    """Refit tren degradasi seluruh fleet dari history store & tulis forecast RUL per pompa"""
+    from modules.history_store import open_store
+    from modules.rul_forecast import load_fleet_history, forecast_fleet
+
+    conn = open_store(args.store)
+    try:
+        forecast = forecast_fleet(load_fleet_history(conn, window=args.window), window=args.window)
+    finally:
+        conn.close()
+
+    forecast.to_csv(args.output)
+    due = int((forecast["rul_days"] <= args.horizon).sum())
+    print(f"✅ {len(forecast)} pumps forecast ({due} reach a limit within {args.horizon} days) -> {args.output}")
+    return 0
+
+
+def cmd_analytics(args):
+    """Skor anomali peer group untuk inspeksi terbaru seluruh fleet (file atau history store)"""
+    from modules.fleet_analytics import run_fleet_analytics, latest_inspections, latest_rows
+
+    if args.store:
+        from modules.history_store import open_store
+        conn = open_store(args.store)
+        try:
+            inspections = latest_inspections(conn)
+        finally:
+            conn.close()
+    else:
+        from modules.batch_runner import read_inspections
+        rows = read_inspections(args.input)
+        inspections = latest_rows(rows)
+        if len(inspections) < len(rows):
+            print(f"ℹ️ {len(rows) - len(inspections)} older inspections skipped (latest row per pump scored)", file=sys.stderr)
+
+    scores = run_fleet_analytics(inspections, min_size=args.min_peers)
+    scores.to_csv(args.output, index=False)
+    failed = scores[scores["error"].notna()] if "error" in scores.columns else scores.iloc[:0]
+    for _, failure in failed.head(MAX_REPORTED_ERRORS).iterrows():
+        print(f"⚠️ {failure['pump_tag']} not scored: {failure['error']}", file=sys.stderr)
+    print(
+        f"✅ {len(scores) - len(failed)} pumps scored: {int(scores['is_outlier'].sum())} outliers, "
+        f"{int(scores['quiet_outlier'].sum())} without threshold alarms -> {args.output}"
+    )
+    return 0
+
+
+def cmd_backtest(args):
+    """Replay histori inspeksi dengan set threshold kandidat (paralel per konfigurasi)"""
+    import json
+    import os
+    from modules.backtest import threshold_grid, run_backtest, load_history_records, load_outcomes
+
+    if args.store:
+        from modules.history_store import open_store
+        conn = open_store(args.store)
+        try:
+            records = load_history_records(conn, date_from=args.date_from, date_to=args.date_to)
+        finally:
+            conn.close()
+    else:
+        from modules.batch_runner import read_inspections
+        records = read_inspections(args.input)
+
+    if args.grid and os.path.exists(args.grid):
+        with open(args.grid, "r", encoding="utf-8") as f:
+            sweep = json.load(f)
+    else:
+        sweep = json.loads(args.grid) if args.grid else []
+    configurations = threshold_grid(sweep)
+    outcomes = load_outcomes(args.outcomes) if args.outcomes else None
+
+    report = run_backtest(records, configurations, outcomes, horizon_days=args.horizon, workers=args.workers)
+    report.to_csv(args.output, index=False)
+    replayed = int(report["inspections"].iloc[0]) if len(report) else len(records)
+    if replayed < len(records):
+        print(f"⚠️ {len(records) - replayed} inspections skipped (unknown product_type / pump_size)", file=sys.stderr)
+    print(f"✅ {len(report)} threshold configurations replayed over {replayed} inspections -> {args.output}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="pump_diagnosis",
+        description="Pump Diagnosis Tool - headless runner (API 610 / ISO 10816-3 / IEC 60034-1)"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    batch = subparsers.add_parser("batch", help="Diagnose an inspection file (CSV, Excel or JSON Lines)")
+    batch.add_argument("input", help="Inspection file, one row per inspection")
+    batch.add_argument("-o", "--output", default="diagnosis_results.jsonl",
+                       help="Output file (.jsonl = full results, .csv/.xlsx = summary rows)")
+    batch.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    batch.add_argument("--chunk-size", type=int, default=64, help="Records per task sent to each worker")
+    batch.add_argument("--store", default=None, help="Also persist inputs and results to this SQLite history DB")
+    batch.add_argument("--vectorized", action="store_true",
+                       help="Use the vectorized fleet engine (summary columns only in the -o format; "
+                            "not combinable with --store/--cache)")
+    batch.add_argument("--fail-on-error", action="store_true", help="Exit non-zero if any record failed")
+    batch.add_argument("--cache", default=None,
+                       help="Reuse and store full results in this SQLite result cache (unchanged inputs are not recomputed)")
+    batch.set_defaults(func=cmd_batch)
+
+    stream = subparsers.add_parser("stream", help="Diagnose JSON Lines lazily with bounded memory")
+    stream.add_argument("input", nargs="?", default="-", help="JSON Lines file, or - for stdin")
+    stream.add_argument("-o", "--output", default="-", help="JSON Lines output file, or - for stdout")
+    stream.add_argument("--workers", type=int, default=1, help="Worker processes (bounded in-flight window)")
+    stream.add_argument("--fail-on-error", action="store_true", help="Exit non-zero if any record failed")
+    stream.set_defaults(func=cmd_stream)
+
+    serve = subparsers.add_parser("serve", help="Run the HTTP diagnosis service")
+    serve.add_argument("--host", default="127.0.0.1", help="Bind address")
+    serve.add_argument("--port", type=int, default=8080, help="Bind port")
+    serve.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    serve.add_argument("--cache", default=None, help="SQLite result cache shared by the workers (default: PUMP_RESULT_CACHE)")
+    serve.add_argument("--no-cache", action="store_true", help="Recompute every request")
+    serve.set_defaults(func=cmd_serve)
+
+    cache = subparsers.add_parser("cache", help="Inspect or clear the diagnosis result cache")
+    cache.add_argument("action", choices=["stats", "clear"], help="Show disk tier statistics or remove all entries")
+    cache.add_argument("--path", default=None, help="SQLite result cache (default: PUMP_RESULT_CACHE)")
+    cache.set_defaults(func=cmd_cache)
+
+    forecast = subparsers.add_parser("forecast", help="Refit fleet degradation trends and forecast remaining useful life")
+    forecast.add_argument("store", help="SQLite history DB written by batch --store or the UI")
+    forecast.add_argument("-o", "--output", default="rul_forecast.csv", help="CSV output, one row per pump")
+    forecast.add_argument("--window", type=int, default=8, help="Latest inspections per pump used in the fit")
+    forecast.add_argument("--horizon", type=float, default=90, help="Days ahead counted as due in the summary")
+    forecast.set_defaults(func=cmd_forecast)
+
+    analytics = subparsers.add_parser("analytics", help="Score latest inspections against their peer group")
+    analytics.add_argument("input", nargs="?", default=None,
+                           help="Inspection file (reduced to the latest row per pump_tag by inspection_date)")
+    analytics.add_argument("--store", default=None, help="Read latest inspections per pump from this SQLite history DB")
+    analytics.add_argument("-o", "--output", default="fleet_anomalies.csv", help="CSV output, one row per pump")
+    analytics.add_argument("--min-peers", type=int, default=12, help="Smallest pump_size/product_type peer group")
+    analytics.set_defaults(func=cmd_analytics)
+
+    backtest = subparsers.add_parser("backtest", help="Replay inspection history under candidate threshold sets")
+    backtest.add_argument("input", nargs="?", default=None, help="Inspection file with pump_tag and inspection_date")
+    backtest.add_argument("--store", default=None, help="Replay all stored inspections from this SQLite history DB")
+    backtest.add_argument("--outcomes", default=None, help="Failure/work-order file (pump_tag, event_date, failure_type)")
+    backtest.add_argument("--grid", default=None,
+                          help='Sweep JSON file or inline JSON, e.g. {"demod_alarm_g": [0.4, 0.5, 0.6]}')
+    backtest.add_argument("-o", "--output", default="backtest.csv", help="CSV output, one row per configuration")
+    backtest.add_argument("--horizon", type=float, default=90, help="Days before a failure in which an alarm counts as a hit")
+    backtest.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    backtest.add_argument("--date-from", default=None, help="First inspection date replayed (store only)")
+    backtest.add_argument("--date-to", default=None, help="Last inspection date replayed (store only)")
+    backtest.set_defaults(func=cmd_backtest)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    # analytics & backtest: file input dan --store sama-sama opsional, salah satu wajib
+    if getattr(args, "input", "") is None and not getattr(args, "store", None):
+        parser.error(f"{args.command}: input file or --store required")
+    # Engine vectorized hanya menghasilkan kolom ringkasan - tidak ada hasil lengkap untuk disimpan/di-cache
+    if getattr(args, "vectorized", False) and (args.store or args.cache):
+        parser.error("batch: --vectorized cannot be combined with --store or --cache (summary columns only)")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,11 @@
+"""Konfigurasi pytest: root repo di sys.path & registry aset fixture (di-set sebelum modules di-import)"""
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(TESTS_DIR, "fixtures")
+
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+# DEFAULT_REGISTRY_PATH dibaca saat import - P-1..P-4 terdaftar, tag lain memakai default kelas ukuran
+os.environ["PUMP_ASSET_REGISTRY"] = os.path.join(FIXTURES_DIR, "asset_registry.json")
@@ -0,0 +1,59 @@
+"""
+Action planner berbasis rule file (data/action_rules.json) vs planner hard-coded sebelumnya
+
+legacy_action_plans.jsonl: output generate_action_plan versi if/elif (sebelum rule file) untuk
+setiap primary type & status/zone, semua produk, flag power-off test dan dua umur instalasi.
+"""
+import json
+import os
+
+import pytest
+
+from modules.diagnosis_engine import generate_action_plan
+
+from conftest import FIXTURES_DIR
+
+with open(os.path.join(FIXTURES_DIR, "legacy_action_plans.jsonl"), "r", encoding="utf-8") as f:
+    LEGACY_CASES = [json.loads(line) for line in f if line.strip()]
+
+
+def _case_id(case):
+    primary = case["diagnosis"]["primary_diagnosis"]
+    status = "-".join(str(value) for value in primary["report"].values() if isinstance(value, str))
+    power_off = "power-off" if case["diagnosis"]["requires_power_off_test"] else "online"
+    return f"{primary['type']}-{status}-{case['specification']['product_type']}-{power_off}"
+
+
+def _mechanical_case(coastdown_classification=None):
+    diagnosis = {
+        "primary_diagnosis": {
+            "type": "MECHANICAL",
+            "report": {"findings": [], "overall_zone": "D", "primary_fault": "Unbalance (Rotor)"}
+        },
+        "requires_power_off_test": coastdown_classification is None
+    }
+    if coastdown_classification:
+        diagnosis["coastdown_classification"] = coastdown_classification
+    return diagnosis, {"product_type": "Diesel", "installation_year": 2018}, {"pump_tag": "P-101"}
+
+
+@pytest.mark.parametrize("case", LEGACY_CASES, ids=[f"{i}-{_case_id(case)}" for i, case in enumerate(LEGACY_CASES)])
+def test_action_plan_matches_legacy_planner(case):
+    plan = generate_action_plan(case["diagnosis"], case["specification"], case["metadata"])
+    assert json.loads(json.dumps(plan, default=str)) == case["expected"]
+
+
+def test_coastdown_electrical_unbalance_replaces_mechanical_correction():
+    baseline = [a["action"] for a in generate_action_plan(*_mechanical_case())["actions"]]
+    actions = [a["action"] for a in generate_action_plan(*_mechanical_case("ELECTRICAL_UNBALANCE"))["actions"]]
+
+    assert any("correction" in action for action in baseline)
+    assert not any("correction" in action for action in actions)
+    assert any("DO NOT BALANCE" in action for action in actions)
+
+
+def test_coastdown_mechanical_unbalance_keeps_correction():
+    actions = [a["action"] for a in generate_action_plan(*_mechanical_case("MECHANICAL_UNBALANCE"))["actions"]]
+
+    assert any("correction" in action for action in actions)
+    assert any(action.startswith("✅ COAST-DOWN") for action in actions)
@@ -0,0 +1,39 @@
+"""Batch runner: satu record rusak menjadi baris error, record lain tetap didiagnosa; kolom tren ringkasan"""
+import pandas as pd
+
+from modules.batch_runner import run_batch, summarize_result, write_results
+from pump_diagnosis import store_results
+
+from test_fleet_engine import generate_records
+from test_rul_forecast import _degrading_records
+
+
+def test_bad_record_becomes_error_row(tmp_path):
+    records = generate_records(3, seed=1)
+    records[1]["product_type"] = "Crude"
+
+    results = list(run_batch(records, workers=1))
+
+    assert [("error" in result) for result in results] == [False, True, False]
+    assert results[1]["row"] == 2
+    assert results[1]["pump_tag"] == records[1]["pump_tag"]
+    assert "Crude" in results[1]["error"]
+
+    output = tmp_path / "summary.csv"
+    assert write_results(results, str(output)) == 3
+    summary = pd.read_csv(output)
+    assert summary["error"].notna().tolist() == [False, True, False]
+    assert summary.columns[-1] == "error"
+
+
+def test_summary_trend_columns_filled_after_store(tmp_path):
+    records = _degrading_records([2.0] * 6 + [6.0])
+    results = list(run_batch(records, workers=1))
+    assert summarize_result(results[-1])["trend_deviation"] is None
+
+    store_results(str(tmp_path / "history.db"), records, results)
+
+    summaries = [summarize_result(result) for result in results]
+    assert [summary["trend_deviation"] for summary in summaries] == [False] * 6 + [True]
+    assert "overall_velocity" in summaries[-1]["trend_deviations"].split(", ")
+    assert summaries[0]["trend_deviations"] == ""
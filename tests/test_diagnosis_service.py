@@ -0,0 +1,31 @@
+"""Routing HTTP service: GET /cache tidak menjalankan query SQLite di thread event loop"""
+import asyncio
+import json
+import threading
+from http import HTTPStatus
+
+from modules import diagnosis_service
+from modules.result_cache import cache_stats
+
+
+def test_cache_stats_run_off_the_event_loop(tmp_path, monkeypatch):
+    threads = []
+
+    def recording_stats(path):
+        threads.append(threading.current_thread())
+        return cache_stats(path)
+
+    monkeypatch.setitem(diagnosis_service._STATE, "cache_path", str(tmp_path / "cache.db"))
+    monkeypatch.setattr(diagnosis_service, "cache_stats", recording_stats)
+
+    status, body = asyncio.run(diagnosis_service.handle_request(None, "GET", "/cache", b""))
+
+    assert status == HTTPStatus.OK
+    assert json.loads(body) == {"disk_entries": 0, "disk_bytes": 0, "disk_hits_total": 0}
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_cache_route_disabled_without_cache_path(monkeypatch):
+    monkeypatch.setitem(diagnosis_service._STATE, "cache_path", None)
+    status, _ = asyncio.run(diagnosis_service.handle_request(None, "GET", "/cache", b""))
+    assert status == HTTPStatus.NOT_FOUND
@@ -0,0 +1,148 @@
+"""Parity run_fleet_diagnosis (vectorized) vs run_complete_diagnosis (skalar) per inspeksi"""
+import math
+import random
+
+import pandas as pd
+import pytest
+
+from modules.diagnosis_engine import run_complete_diagnosis
+from modules.fleet_engine import run_fleet_diagnosis
+from modules.inspection_records import FFT_KEYS, VIBRATION_KEYS, record_to_input_data
+
+RECORD_COUNT = 400
+
+# Kolom fleet_engine -> nilai yang sama di hasil skalar
+PARITY_COLUMNS = {
+    "npsha": lambda r: r["analyses"]["hydraulic"]["npsha"],
+    "npsha_margin": lambda r: r["analyses"]["hydraulic"]["npsha_margin"],
+    "head": lambda r: r["analyses"]["hydraulic"]["head"],
+    "flow_ratio": lambda r: r["analyses"]["hydraulic"]["flow_ratio"],
+    "flow_status": lambda r: r["analyses"]["hydraulic"]["flow_status"],
+    "hf_max": lambda r: r["analyses"]["hydraulic"]["hf_max"],
+    "cavitation_risk": lambda r: r["analyses"]["hydraulic"]["cavitation_risk"],
+    "voltage_imbalance_pct": lambda r: r["analyses"]["electrical"]["voltage"]["imbalance_pct"],
+    "voltage_status": lambda r: r["analyses"]["electrical"]["voltage"]["status"],
+    "current_imbalance_pct": lambda r: r["analyses"]["electrical"]["current"]["imbalance_pct"],
+    "load_pct": lambda r: r["analyses"]["electrical"]["load"]["percentage"],
+    "load_status": lambda r: r["analyses"]["electrical"]["load"]["status"],
+    "slip_pct": lambda r: r["analyses"]["electrical"]["slip"].get("slip_pct", float("nan")),
+    "slip_status": lambda r: r["analyses"]["electrical"]["slip"].get("status", ""),
+    "electrical_status": lambda r: r["analyses"]["electrical"]["overall_status"],
+    "motor_zone": lambda r: r["analyses"]["mechanical"]["motor"]["overall_zone"],
+    "overall_zone": lambda r: r["analyses"]["mechanical"]["overall_zone"],
+    "primary_fault": lambda r: r["analyses"]["mechanical"]["primary_fault"],
+    "mechanical_has_issue": lambda r: r["analyses"]["mechanical"]["has_issue"],
+    "bearing_defect_risk": lambda r: r["analyses"]["mechanical"]["bearing_defect_risk"],
+    "demod_max": lambda r: r["analyses"]["mechanical"]["demod_max"],
+    "primary_component": lambda r: r["analyses"]["mechanical"]["primary_component"],
+    "max_temperature": lambda r: r["analyses"]["thermal"]["max_temperature"],
+    "max_rise": lambda r: r["analyses"]["thermal"]["max_rise"],
+    "thermal_status": lambda r: r["analyses"]["thermal"]["overall_status"],
+    "fft_motor_has_issue": lambda r: r["analyses"]["fft_motor"].get("has_issue", False),
+    "fft_motor_count": lambda r: r["analyses"]["fft_motor"].get("count", 0),
+    "fft_pump_has_issue": lambda r: r["analyses"]["fft_pump"].get("has_issue", False),
+    "order_rpm": lambda r: float(r["analyses"]["speed"]["rpm"]),
+    "speed_source": lambda r: r["analyses"]["speed"]["source"],
+    "primary_type": lambda r: r["diagnosis"]["primary_diagnosis"]["type"],
+    "requires_power_off_test": lambda r: r["diagnosis"]["requires_power_off_test"],
+    "issue_count": lambda r: r["diagnosis"]["issue_count"]
+}
+
+
+def generate_records(count, seed=0):
+    """Record datar acak termasuk nilai kosong/NaN, bearing tidak dikenal & tag registry P-1..P-4"""
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        record = {
+            "pump_tag": f"P-{i % 50}",
+            "inspection_date": f"2025-{1 + i % 12:02d}-01",
+            "location": rng.choice(["T1", "T2"]),
+            "product_type": rng.choice(["Gasoline", "Diesel", "Avtur", "Naphtha"]),
+            "foundation_type": rng.choice(["Rigid", "flexible"]),
+            "pump_size": rng.choice(["Small", "Medium", "Large"]),
+            "installation_year": rng.randint(2000, 2025),
+            "rated_rpm": rng.choice([2950, 1480, 0]),
+            "suction_pressure": round(rng.uniform(-50, 300), 1),
+            "discharge_pressure": round(rng.uniform(100, 900), 1),
+            "flow_rate": round(rng.uniform(0, 400), 1),
+            "rpm": rng.choice([None, 2920.0, 2990.0, 1450.0, 2700.0, 0.0, float("nan")]),
+            "lubricant_type": rng.choice(["grease", "oil", "Grease"])
+        }
+        if rng.random() < 0.5:
+            record["product_temperature"] = rng.choice([25.0, round(rng.uniform(-30, 170), 1), float("nan")])
+        for key in ["voltage_l1", "voltage_l2", "voltage_l3"]:
+            record[key] = round(rng.uniform(360, 400), 0) if rng.random() > 0.05 else 0.0
+        for key in ["current_l1", "current_l2", "current_l3"]:
+            record[key] = round(rng.uniform(5, 70), 1)
+        for key in ["temp_motor_de", "temp_motor_nde", "temp_pump_de", "temp_pump_nde"]:
+            record[key] = float(rng.randint(40, 110))
+        record["temp_ambient"] = float(rng.randint(20, 40))
+        for component in ["motor", "pump"]:
+            for key in VIBRATION_KEYS:
+                high = 1.0 if "Demod" in key or key[0] not in "DN" else 9.0
+                record[f"{component}_{key}"] = round(rng.uniform(0, high), 1)
+            for key in FFT_KEYS:
+                if "Freq" in key:
+                    value = rng.choice([0.0, rng.uniform(0, 400), 49.0, 98.5, 24.0, 20.0, 151.0, 244.0, 174.0])
+                else:
+                    value = rng.uniform(0, 4)
+                record[f"{component}_{key}"] = round(value, 1)
+        if rng.random() < 0.6:
+            for position in ["motor_de", "motor_nde", "pump_de", "pump_nde"]:
+                record[f"bearing_{position}"] = rng.choice([6309, 6310.0, "6205", "nu210", "7310", None, float("nan"), "XYZ"])
+        records.append(record)
+    return records
+
+
+def _same(vectorized, scalar):
+    if isinstance(vectorized, float) and isinstance(scalar, float) and math.isnan(vectorized) and math.isnan(scalar):
+        return True
+    if isinstance(scalar, bool):
+        return bool(vectorized) == scalar
+    return vectorized == scalar
+
+
+@pytest.fixture(scope="module")
+def records():
+    return generate_records(RECORD_COUNT)
+
+
+def test_fleet_engine_matches_scalar_diagnosis(records):
+    fleet = run_fleet_diagnosis(pd.DataFrame(records))
+    assert len(fleet) == len(records)
+
+    mismatches = []
+    for i, record in enumerate(records):
+        result = run_complete_diagnosis(record_to_input_data(record))
+        row = fleet.iloc[i]
+        for column, extract in PARITY_COLUMNS.items():
+            if not _same(row[column], extract(result)):
+                mismatches.append((i, record["pump_tag"], column, row[column], extract(result)))
+    assert not mismatches, f"{len(mismatches)} mismatches, first: {mismatches[:5]}"
+
+
+def test_fleet_engine_single_inspection(records):
+    fleet = run_fleet_diagnosis(pd.DataFrame(records[7:8]))
+    result = run_complete_diagnosis(record_to_input_data(records[7]))
+    assert fleet.iloc[0]["primary_type"] == result["diagnosis"]["primary_diagnosis"]["type"]
+    assert fleet.iloc[0]["npsha"] == result["analyses"]["hydraulic"]["npsha"]
+
+
+def test_fleet_engine_unknown_category_marks_row_instead_of_raising(records):
+    rows = [dict(record) for record in records[:6]]
+    rows[1]["product_type"] = "Crude"
+    rows[3].update(pump_size="Huge", pump_tag="P-30")
+    rows[4].update(pump_size="Huge", pump_tag="P-1")  # terdaftar di registry: pump_size tidak dipakai
+
+    fleet = run_fleet_diagnosis(pd.DataFrame(rows))
+
+    assert fleet["error"].notna().tolist() == [False, True, False, True, False, False]
+    assert "product_type 'Crude'" in fleet.loc[1, "error"]
+    assert "pump_size 'Huge'" in fleet.loc[3, "error"]
+    assert fleet.loc[[1, 3], "npsha"].isna().all() and fleet.loc[[1, 3], "primary_type"].isna().all()
+    for i in [0, 2, 4, 5]:
+        result = run_complete_diagnosis(record_to_input_data(rows[i]))
+        assert fleet.loc[i, "primary_type"] == result["diagnosis"]["primary_diagnosis"]["type"]
+        assert fleet.loc[i, "npsha"] == result["analyses"]["hydraulic"]["npsha"]
+    assert "error" not in run_fleet_diagnosis(pd.DataFrame(records[:6])).columns
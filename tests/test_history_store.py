@@ -0,0 +1,57 @@
+"""History store: kunci unik (pump_tag, waktu inspeksi), pointer pump_latest & filter tanggal"""
+from datetime import date, datetime
+
+import pytest
+
+from modules.history_store import latest_per_pump, open_store, query_inspections, save_result
+
+
+def _result(pump_tag, inspection_date, zone="A"):
+    return {
+        "metadata": {"pump_tag": pump_tag, "inspection_date": inspection_date, "location": "T1"},
+        "specification": {"product_type": "Diesel", "pump_size": "Medium"},
+        "diagnosis": {"primary_diagnosis": {"type": "NORMAL"}},
+        "analyses": {"mechanical": {"overall_zone": zone}},
+        "action_plan": {"risk_level": "LOW", "risk_score": 0}
+    }
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = open_store(str(tmp_path / "history.db"))
+    yield conn
+    conn.close()
+
+
+def test_same_inspection_is_updated_and_same_day_remeasure_is_kept(conn):
+    save_result(conn, _result("P-1", date(2025, 3, 1), zone="C"))
+    save_result(conn, _result("P-1", datetime(2025, 3, 1, 0, 0), zone="D"))
+    save_result(conn, _result("P-1", datetime(2025, 3, 1, 14, 30), zone="B"))
+
+    rows = query_inspections(conn, pump_tag="P-1")
+    assert [(row["inspection_date"], row["overall_zone"]) for row in rows] == [
+        ("2025-03-01T14:30:00", "B"),
+        ("2025-03-01", "D")
+    ]
+
+
+def test_latest_per_pump_follows_inserts_updates_and_deletes(conn):
+    save_result(conn, _result("P-1", "2025-03-01", zone="C"))
+    save_result(conn, _result("P-1", "2025-01-01", zone="A"))
+    save_result(conn, _result("P-2", None, zone="B"))
+    assert [(row["pump_tag"], row["overall_zone"]) for row in latest_per_pump(conn)] == [("P-1", "C"), ("P-2", "B")]
+
+    save_result(conn, _result("P-1", "2025-03-01", zone="D"))
+    assert [row["pump_tag"] for row in latest_per_pump(conn, overall_zone="D")] == ["P-1"]
+
+    with conn:
+        conn.execute("DELETE FROM inspections WHERE pump_tag = 'P-1' AND inspection_date = '2025-03-01'")
+    assert [(row["pump_tag"], row["overall_zone"]) for row in latest_per_pump(conn)] == [("P-1", "A"), ("P-2", "B")]
+
+
+def test_date_to_includes_the_whole_day(conn):
+    save_result(conn, _result("P-1", datetime(2025, 3, 1, 14, 30)))
+    save_result(conn, _result("P-1", "2025-03-02"))
+
+    rows = query_inspections(conn, date_from="2025-03-01", date_to=date(2025, 3, 1))
+    assert [row["inspection_date"] for row in rows] == ["2025-03-01T14:30:00"]
@@ -0,0 +1,60 @@
+"""Result cache: tier disk JSON ber-tag (round-trip persis, payload non-JSON tidak dieksekusi)"""
+import pickle
+import sqlite3
+from datetime import date
+
+import numpy as np
+import pytest
+
+from modules import result_cache
+from modules.inspection_records import record_to_input_data
+
+from test_fleet_engine import generate_records
+
+
+@pytest.fixture(autouse=True)
+def empty_memory_tier():
+    """Tier memori dipakai bersama satu proses - setiap test mulai dari tier kosong"""
+    result_cache.clear_cache(path=None)
+
+
+def _input_data():
+    input_data = record_to_input_data(generate_records(1, seed=3)[0])
+    input_data["metadata"]["inspection_date"] = date(2025, 3, 1)
+    return input_data
+
+
+def test_encode_result_round_trips_non_json_types():
+    value = {"date": date(2025, 3, 1), "issues": [("MECHANICAL", {"zone": "C"})], "spectrum": np.arange(4.0)}
+    decoded = result_cache.decode_result(result_cache.encode_result(value))
+
+    assert decoded["date"] == date(2025, 3, 1)
+    assert decoded["issues"] == [("MECHANICAL", {"zone": "C"})]
+    assert decoded["spectrum"].dtype == np.float64 and decoded["spectrum"].tolist() == [0.0, 1.0, 2.0, 3.0]
+
+
+def test_disk_hit_returns_the_stored_result(tmp_path):
+    path = str(tmp_path / "cache.db")
+    input_data = _input_data()
+
+    stored = result_cache.cached_diagnosis(input_data, path=path)
+    result_cache.clear_cache(path=None)
+    loaded = result_cache.cached_diagnosis(input_data, path=path)
+
+    assert loaded["timings"]["cache"] == "disk"
+    assert {k: v for k, v in loaded.items() if k != "timings"} == {k: v for k, v in stored.items() if k != "timings"}
+
+
+def test_pickled_disk_entry_is_a_miss(tmp_path):
+    path = str(tmp_path / "cache.db")
+    input_data = _input_data()
+    result_cache.cached_diagnosis(input_data, path=path)
+    key = result_cache.cache_key(input_data)
+
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("UPDATE results SET result = ? WHERE key = ?", (pickle.dumps({"forged": True}), key))
+    conn.close()
+    result_cache.clear_cache(path=None)
+
+    assert result_cache.get_cached(key, path) == (None, None)
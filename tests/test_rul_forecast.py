@@ -0,0 +1,119 @@
+"""Forecast RUL (ISO 13381-1): fit tren fleet, timeline action plan & jalur batch --store"""
+import math
+
+import pandas as pd
+import pytest
+
+from modules.batch_runner import diagnose_record
+from modules.history_store import open_store
+from modules.rul_forecast import RUL_PLANNING_DAYS, apply_rul_timelines, forecast_fleet
+from pump_diagnosis import store_results
+
+from test_fleet_engine import generate_records
+
+
+def _history(pump_tag, velocities, step_days=7):
+    """Histori mingguan satu pompa (foundation rigid: Zone C 4.5 / Zone D 7.1 mm/s)"""
+    start = pd.Timestamp("2025-03-01")
+    return [
+        {
+            "pump_tag": pump_tag,
+            "inspection_date": (start + pd.Timedelta(days=step_days * i)).date().isoformat(),
+            "overall_velocity": velocity,
+            "demod_max": 0.1,
+            "bearing_rise": 20.0,
+            "zone_c_threshold": 4.5,
+            "zone_d_threshold": 7.1,
+            "demod_threshold": 0.5,
+            "rise_threshold": 55.0
+        }
+        for i, velocity in enumerate(velocities)
+    ]
+
+
+def _degrading_records(velocities):
+    """Record batch P-9 dengan velocity naik per minggu; elektrikal & termal seimbang"""
+    base = generate_records(1, seed=3)[0]
+    records = []
+    for i, velocity in enumerate(velocities):
+        inspection_date = (pd.Timestamp("2025-03-01") + pd.Timedelta(days=7 * i)).date().isoformat()
+        record = dict(base, pump_tag="P-9", inspection_date=inspection_date, foundation_type="Rigid")
+        for component in ["motor", "pump"]:
+            for key in ["DE_H", "NDE_H", "DE_V", "NDE_V", "DE_A", "NDE_A"]:
+                record[f"{component}_{key}"] = velocity
+            for key in ["HF_DE", "HF_NDE", "Demodulation_DE", "Demodulation_NDE"]:
+                record[f"{component}_{key}"] = 0.1
+        for key in ["voltage_l1", "voltage_l2", "voltage_l3"]:
+            record[key] = 380.0
+        for key in ["current_l1", "current_l2", "current_l3"]:
+            record[key] = 30.0
+        for key in ["temp_motor_de", "temp_motor_nde", "temp_pump_de", "temp_pump_nde"]:
+            record[key] = 50.0
+        record["temp_ambient"] = 30.0
+        records.append(record)
+    return records
+
+
+def test_forecast_fleet_degrading_vs_stable_pump():
+    history = pd.DataFrame(_history("P-1", [1.0, 2.0, 3.0, 4.0]) + _history("P-2", [2.0, 2.0, 2.0, 2.0]))
+    forecast = forecast_fleet(history)
+
+    assert forecast.loc["P-1", "rul_target"] == "zone_c"
+    assert forecast.loc["P-1", "rul_days"] == pytest.approx(3.5)
+    assert forecast.loc["P-1", "days_to_zone_d"] == pytest.approx(21.7)
+    assert math.isnan(forecast.loc["P-2", "rul_days"])
+    assert forecast.loc["P-2", "samples"] == 4
+
+
+def test_forecast_fleet_needs_minimum_samples():
+    forecast = forecast_fleet(pd.DataFrame(_history("P-1", [1.0, 4.0])))
+    assert math.isnan(forecast.loc["P-1", "rul_days"])
+
+
+def test_apply_rul_timelines_shortens_slower_static_timeline():
+    plan = {"actions": [
+        {"action": "Re-measure", "timeline": "< 7 days"},
+        {"action": "Trip", "timeline": "< 2 hours"},
+        {"action": "Update asset register", "timeline": "After completion"}
+    ]}
+    forecast = {"rul_days": 3.5, "rul_label": "Zone C (ISO 10816-3)", "samples": 4, "standard": "ISO 13381-1 (prognostics)"}
+
+    updated = apply_rul_timelines(plan, forecast)
+
+    assert [a["timeline"] for a in updated["actions"]] == ["< 4 days", "< 2 hours", "After completion"]
+    assert updated["actions"][0]["timeline_basis"] == "RUL forecast: Zone C (ISO 10816-3) in ~4 days"
+    assert plan["actions"][0]["timeline"] == "< 7 days"
+    assert apply_rul_timelines(plan, {"rul_days": None}) is plan
+
+
+def test_apply_rul_timelines_plans_unscheduled_pump():
+    plan = {"actions": [{"action": "Continue monitoring", "timeline": "Next PM"}]}
+    forecast = {"rul_days": 40.0, "rul_label": "Zone C (ISO 10816-3)", "samples": 5, "standard": "ISO 13381-1 (prognostics)"}
+
+    actions = apply_rul_timelines(plan, forecast)["actions"]
+
+    assert len(actions) == 2
+    assert actions[1]["timeline"] == "< 40 days"
+    assert apply_rul_timelines(plan, {**forecast, "rul_days": RUL_PLANNING_DAYS + 1})["actions"] == plan["actions"]
+
+
+def test_batch_store_applies_rul_forecast(tmp_path):
+    records = _degrading_records([1.0, 2.0, 3.0, 4.0])
+    results = [diagnose_record(record) for record in records]
+    static = {a["action"]: a["timeline"] for a in results[-1]["action_plan"]["actions"]}
+    assert "rul" not in results[-1]
+
+    store_results(str(tmp_path / "history.db"), records, results)
+
+    assert results[-1]["rul"]["rul_days"] == pytest.approx(3.5)
+    forecasted = {a["action"]: a for a in results[-1]["action_plan"]["actions"]}
+    shortened = [name for name, timeline in static.items() if forecasted[name]["timeline"] != timeline]
+    assert shortened
+    assert all(forecasted[name]["timeline"] == "< 4 days" for name in shortened)
+
+    conn = open_store(str(tmp_path / "history.db"))
+    try:
+        stored = conn.execute("SELECT COUNT(*) FROM inspections WHERE pump_tag = 'P-9'").fetchone()[0]
+    finally:
+        conn.close()
+    assert stored == 4
@@ -1,5 +1,9 @@
 """Fungsi kalkulasi akurat sesuai standar internasional"""
 import math
+from functools import lru_cache
+
+from utils.lookup_tables import BEARING_CATALOG, DIAGNOSIS_THRESHOLDS
+from utils.fluid_properties import product_density, product_vapor_pressure
 
 
 def calculate_npsha(suction_pressure_kpa, product_type, temperature_c=25):
@@ -8,25 +12,13 @@ def calculate_npsha(suction_pressure_kpa, product_type, temperature_c=25):
     
     Formula: NPSHa = (P_suction - P_vapor) / (ρ * g) + v²/(2g)
     Untuk pompa sentrifugal di terminal, head velocity diabaikan (v²/2g < 0.5m)
+    Densitas & vapor pressure pada temperatur produk (utils.fluid_properties)
     
     Returns:
         float: NPSHa dalam meter
     """
-    # Densitas berdasarkan produk (kg/m³)
-    density = {
-        "Gasoline": 740,
-        "Diesel": 840,
-        "Avtur": 780,
-        "Naphtha": 700
-    }.get(product_type, 800)
-    
-    # Vapor pressure pada 25°C (kPa) - API 682 §5.4.2
-    vapor_pressure = {
-        "Gasoline": 55,
-        "Diesel": 0.5,
-        "Avtur": 15,
-        "Naphtha": 60
-    }.get(product_type, 1.0)
+    density = product_density(product_type, temperature_c)
+    vapor_pressure = product_vapor_pressure(product_type, temperature_c)
     
     # Konversi suction pressure ke absolute (asumsi atmospheric = 101.3 kPa)
     suction_abs = suction_pressure_kpa + 101.3
@@ -37,19 +29,14 @@ def calculate_npsha(suction_pressure_kpa, product_type, temperature_c=25):
     return round(npsha, 2)
 
 
-def calculate_differential_head(discharge_kpa, suction_kpa, product_type):
+def calculate_differential_head(discharge_kpa, suction_kpa, product_type, temperature_c=25):
     """
     Hitung differential head sesuai ISO 13709 §7.2.1
     
     Returns:
         float: Head dalam meter
     """
-    density = {
-        "Gasoline": 740,
-        "Diesel": 840,
-        "Avtur": 780,
-        "Naphtha": 700
-    }.get(product_type, 800)
+    density = product_density(product_type, temperature_c)
     
     delta_p_kpa = discharge_kpa - suction_kpa
     head_m = delta_p_kpa / (density * 0.00981)
@@ -57,19 +44,16 @@ def calculate_differential_head(discharge_kpa, suction_kpa, product_type):
     return round(head_m, 1)
 
 
-def calculate_flow_ratio(flow_rate, pump_size):
+def calculate_flow_ratio(flow_rate, bep_flow):
     """
     Hitung flow ratio terhadap BEP sesuai API 610 Annex L
     
+    Args:
+        bep_flow: Flow BEP (m³/h) dari registry aset atau PUMP_SIZE_DEFAULTS
+    
     Returns:
         tuple: (flow_ratio, status)
     """
-    bep_flow = {
-        "Small": 30,
-        "Medium": 100,
-        "Large": 250
-    }.get(pump_size, 100)
-    
     flow_ratio = flow_rate / bep_flow
     
     if flow_ratio < 0.6:
@@ -101,9 +85,9 @@ def calculate_voltage_imbalance(v1, v2, v3):
     
     imbalance_pct = ((v_max - v_min) / v_avg) * 100
     
-    if imbalance_pct > 5.0:
+    if imbalance_pct > DIAGNOSIS_THRESHOLDS["voltage_imbalance_alarm_pct"]:
         status = "ALARM"
-    elif imbalance_pct > 2.0:
+    elif imbalance_pct > DIAGNOSIS_THRESHOLDS["voltage_imbalance_warning_pct"]:
         status = "WARNING"
     else:
         status = "NORMAL"
@@ -128,9 +112,9 @@ def calculate_current_imbalance(i1, i2, i3):
     
     imbalance_pct = ((i_max - i_min) / i_avg) * 100
     
-    if imbalance_pct > 10.0:
+    if imbalance_pct > DIAGNOSIS_THRESHOLDS["current_imbalance_alarm_pct"]:
         status = "ALARM"
-    elif imbalance_pct > 5.0:
+    elif imbalance_pct > DIAGNOSIS_THRESHOLDS["current_imbalance_warning_pct"]:
         status = "WARNING"
     else:
         status = "NORMAL"
@@ -220,3 +204,51 @@ def calculate_motor_slip(rated_rpm, actual_rpm):
         "issue": issue,
         "recommendation": recommendation
     }
+
+
+@lru_cache(maxsize=256)
+def calculate_bearing_orders(designation):
+    """
+    Hitung order defect bearing (kelipatan kecepatan poros) dari geometri katalog - ISO 13373-3 Annex A
+    
+    Formula (outer race diam):
+        FTF  = ½ (1 - d/D·cosθ)
+        BPFO = n/2 (1 - d/D·cosθ)
+        BPFI = n/2 (1 + d/D·cosθ)
+        BSF  = D/(2d) (1 - (d/D·cosθ)²)
+    
+    Returns:
+        dict: Order FTF/BPFO/BPFI/BSF (di-cache per designation, jangan dimodifikasi)
+    """
+    geometry = BEARING_CATALOG[designation]
+    ratio = geometry["ball_diameter_mm"] / geometry["pitch_diameter_mm"] * math.cos(
+        math.radians(geometry["contact_angle_deg"])
+    )
+    balls = geometry["balls"]
+    
+    return {
+        "FTF": 0.5 * (1 - ratio),
+        "BPFO": balls / 2 * (1 - ratio),
+        "BPFI": balls / 2 * (1 + ratio),
+        "BSF": geometry["pitch_diameter_mm"] / (2 * geometry["ball_diameter_mm"]) * (1 - ratio ** 2)
+    }
+
+
+@lru_cache(maxsize=4096)
+def _bearing_frequencies(designation, rpm):
+    """Tuple (nama, Hz) ter-cache LRU - fleet run memakai beberapa puluh tipe bearing untuk ribuan spektrum"""
+    shaft_hz = rpm / 60.0
+    return tuple(
+        (name, round(order * shaft_hz, 2))
+        for name, order in calculate_bearing_orders(designation).items()
+    )
+
+
+def calculate_bearing_frequencies(designation, rpm):
+    """
+    Frekuensi defect bearing (Hz) untuk pasangan bearing/kecepatan
+    
+    Returns:
+        dict: FTF/BPFO/BPFI/BSF dalam Hz (dict baru per panggilan - aman dimodifikasi/disimpan di hasil)
+    """
+    return dict(_bearing_frequencies(designation, rpm))
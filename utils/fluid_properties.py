@@ -0,0 +1,121 @@
+"""
+Properti termofisik produk BBM vs temperatur - API MPMS 11.1 (densitas) & Antoine (vapor pressure)
+
+Nilai referensi 25°C identik dengan tabel lama; grid 0.1°C dihitung sekali saat import
+sehingga lookup (skalar maupun array fleet) cukup np.interp.
+"""
+import numpy as np
+
+# Densitas pada 25°C (kg/m³)
+PRODUCT_DENSITY_KGM3 = {
+    "Gasoline": 740,
+    "Diesel": 840,
+    "Avtur": 780,
+    "Naphtha": 700
+}
+
+# Vapor pressure pada 25°C (kPa) - API 682 §5.4.2
+PRODUCT_VAPOR_PRESSURE_KPA = {
+    "Gasoline": 55,
+    "Diesel": 0.5,
+    "Avtur": 15,
+    "Naphtha": 60
+}
+
+# Default untuk produk yang tidak dikenal (sama dengan fallback lama)
+DEFAULT_DENSITY_KGM3 = 800
+DEFAULT_VAPOR_PRESSURE_KPA = 1.0
+
+REFERENCE_TEMPERATURE_C = 25.0
+
+# Konstanta ekspansi termal API MPMS 11.1 (Table 54B): alpha = K0/ρ² + K1/ρ
+API_EXPANSION_CONSTANTS = {
+    "Gasoline": (346.4228, 0.4388),
+    "Naphtha": (346.4228, 0.4388),
+    "Avtur": (594.5418, 0.0),
+    "Diesel": (186.9696, 0.4862)
+}
+
+# Koefisien B Antoine (K): ln P = A - B / T, A di-anchor ke vapor pressure 25°C
+ANTOINE_B_K = {
+    "Gasoline": 3600.0,
+    "Naphtha": 3500.0,
+    "Avtur": 4500.0,
+    "Diesel": 5500.0
+}
+
+# Grid temperatur 0.1°C (-20 .. 150°C); dibangun dari bilangan bulat agar 25.0 tepat di titik grid
+TEMPERATURE_GRID_C = np.arange(-200, 1501) / 10.0
+
+
+def _density_curve(product, temperature_c):
+    """Densitas vs temperatur (API MPMS 11.1) relatif terhadap 25°C"""
+    rho_ref = PRODUCT_DENSITY_KGM3[product]
+    k0, k1 = API_EXPANSION_CONSTANTS[product]
+    alpha = k0 / rho_ref ** 2 + k1 / rho_ref
+    delta_t = temperature_c - REFERENCE_TEMPERATURE_C
+    return rho_ref * np.exp(-alpha * delta_t * (1 + 0.8 * alpha * delta_t))
+
+
+def _vapor_pressure_curve(product, temperature_c):
+    """Vapor pressure vs temperatur (Antoine, anchor di 25°C)"""
+    t_ref = REFERENCE_TEMPERATURE_C + 273.15
+    return PRODUCT_VAPOR_PRESSURE_KPA[product] * np.exp(
+        ANTOINE_B_K[product] * (1 / t_ref - 1 / (temperature_c + 273.15))
+    )
+
+
+PROPERTY_GRIDS = {
+    product: {
+        "density": _density_curve(product, TEMPERATURE_GRID_C),
+        "vapor_pressure": _vapor_pressure_curve(product, TEMPERATURE_GRID_C)
+    }
+    for product in PRODUCT_DENSITY_KGM3
+}
+
+
+def _lookup(product, prop, temperature_c, default):
+    grid = PROPERTY_GRIDS.get(product)
+    if grid is None:
+        values = np.full(np.shape(temperature_c), default, dtype=float)
+    else:
+        values = np.interp(temperature_c, TEMPERATURE_GRID_C, grid[prop])
+    return float(values) if np.ndim(values) == 0 else values
+
+
+def product_density(product_type, temperature_c=REFERENCE_TEMPERATURE_C):
+    """
+    Densitas produk (kg/m³) pada temperatur tertentu (skalar atau array)
+
+    Returns:
+        float atau np.ndarray
+    """
+    return _lookup(product_type, "density", temperature_c, DEFAULT_DENSITY_KGM3)
+
+
+def product_vapor_pressure(product_type, temperature_c=REFERENCE_TEMPERATURE_C):
+    """
+    Vapor pressure produk (kPa) pada temperatur tertentu (skalar atau array)
+
+    Returns:
+        float atau np.ndarray
+    """
+    return _lookup(product_type, "vapor_pressure", temperature_c, DEFAULT_VAPOR_PRESSURE_KPA)
+
+
+def property_arrays(product_types, temperatures_c):
+    """
+    Densitas & vapor pressure per baris untuk fleet (satu np.interp per produk unik)
+
+    Returns:
+        tuple: (density array, vapor_pressure array)
+    """
+    product_types = np.asarray(product_types, dtype=str)
+    temperatures_c = np.asarray(temperatures_c, dtype=float)
+    density = np.empty(len(product_types))
+    vapor_pressure = np.empty(len(product_types))
+    for product in np.unique(product_types):
+        rows = product_types == product
+        density[rows] = product_density(product, temperatures_c[rows])
+        vapor_pressure[rows] = product_vapor_pressure(product, temperatures_c[rows])
+    return density, vapor_pressure
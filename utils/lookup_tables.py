@@ -79,5 +79,89 @@ FAULT_MAPPING: Dict = {
     "A": "Misalignment (Coupling/pipe strain)"
 }
 
+# Tabel klasifikasi peak FFT berdasarkan order terhadap RPM (ISO 13373-3 §6.2.2)
+# Band [low, high] inklusif, diurutkan berdasarkan low dan tidak saling overlap.
+# high_amp_mms: amplitudo > nilai ini menaikkan confidence ke HIGH (None = tetap base confidence)
+FFT_ORDER_BANDS: list = [
+    # kind menentukan prioritas jika band overlap (shaft > bearing > hydraulic);
+    # band "bearing" generik diganti band dari BEARING_CATALOG jika bearing pompa diketahui
+    {"low": 0.35, "high": 0.45, "fault": "BPFO - Outer Race Bearing Defect", "confidence": "MEDIUM", "high_amp_mms": None, "kind": "bearing"},
+    {"low": 0.55, "high": 0.65, "fault": "BPFI - Inner Race Bearing Defect", "confidence": "MEDIUM", "high_amp_mms": None, "kind": "bearing"},
+    {"low": 0.95, "high": 1.05, "fault": "1x RPM - Unbalance (Impeller erosion/fouling)", "confidence": "MEDIUM", "high_amp_mms": 2.0, "kind": "shaft"},
+    {"low": 1.95, "high": 2.05, "fault": "2x RPM - Misalignment (Coupling/pipe strain)", "confidence": "MEDIUM", "high_amp_mms": 2.0, "kind": "shaft"},
+    # Typical vane pass untuk pompa centrifugal (5-7 vanes)
+    {"low": 6.0, "high": 8.0, "fault": "Vane Pass Frequency - Hydraulic Instability", "confidence": "MEDIUM", "high_amp_mms": None, "kind": "hydraulic"}
+]
+
+# Prioritas band order saat overlap (index kecil menang)
+FFT_BAND_KIND_PRIORITY: list = ["shaft", "bearing", "hydraulic"]
+
+# Label fault untuk band defect bearing dari geometri katalog
+BEARING_FAULT_LABELS: Dict = {
+    "BPFO": "BPFO - Outer Race Bearing Defect",
+    "BPFI": "BPFI - Inner Race Bearing Defect",
+    "BSF": "BSF - Rolling Element Defect",
+    "FTF": "FTF - Cage Defect"
+}
+
+# Katalog geometri bearing (nominal, dimensi dalam mm) - ISO 15243 / ISO 13373-3 Annex A
+# balls: jumlah rolling element, pitch_diameter: diameter lingkaran pitch,
+# ball_diameter: diameter rolling element, contact_angle_deg: sudut kontak
+BEARING_CATALOG: Dict = {
+    "6205": {"balls": 9, "pitch_diameter_mm": 38.5, "ball_diameter_mm": 7.94, "contact_angle_deg": 0.0},
+    "6206": {"balls": 9, "pitch_diameter_mm": 46.0, "ball_diameter_mm": 9.53, "contact_angle_deg": 0.0},
+    "6207": {"balls": 9, "pitch_diameter_mm": 53.5, "ball_diameter_mm": 11.11, "contact_angle_deg": 0.0},
+    "6208": {"balls": 9, "pitch_diameter_mm": 60.0, "ball_diameter_mm": 11.91, "contact_angle_deg": 0.0},
+    "6209": {"balls": 10, "pitch_diameter_mm": 65.0, "ball_diameter_mm": 11.91, "contact_angle_deg": 0.0},
+    "6210": {"balls": 10, "pitch_diameter_mm": 70.0, "ball_diameter_mm": 12.70, "contact_angle_deg": 0.0},
+    "6211": {"balls": 10, "pitch_diameter_mm": 77.5, "ball_diameter_mm": 14.29, "contact_angle_deg": 0.0},
+    "6212": {"balls": 10, "pitch_diameter_mm": 85.0, "ball_diameter_mm": 15.88, "contact_angle_deg": 0.0},
+    "6305": {"balls": 7, "pitch_diameter_mm": 44.0, "ball_diameter_mm": 11.51, "contact_angle_deg": 0.0},
+    "6306": {"balls": 8, "pitch_diameter_mm": 51.0, "ball_diameter_mm": 12.30, "contact_angle_deg": 0.0},
+    "6307": {"balls": 8, "pitch_diameter_mm": 57.5, "ball_diameter_mm": 13.49, "contact_angle_deg": 0.0},
+    "6308": {"balls": 8, "pitch_diameter_mm": 65.0, "ball_diameter_mm": 15.08, "contact_angle_deg": 0.0},
+    "6309": {"balls": 8, "pitch_diameter_mm": 72.5, "ball_diameter_mm": 17.46, "contact_angle_deg": 0.0},
+    "6310": {"balls": 8, "pitch_diameter_mm": 80.0, "ball_diameter_mm": 19.05, "contact_angle_deg": 0.0},
+    "6311": {"balls": 8, "pitch_diameter_mm": 87.5, "ball_diameter_mm": 20.64, "contact_angle_deg": 0.0},
+    "6312": {"balls": 8, "pitch_diameter_mm": 95.0, "ball_diameter_mm": 22.23, "contact_angle_deg": 0.0},
+    "6313": {"balls": 8, "pitch_diameter_mm": 102.5, "ball_diameter_mm": 24.00, "contact_angle_deg": 0.0},
+    # Angular contact (thrust bearing pompa API 610, pasangan back-to-back)
+    "7310": {"balls": 12, "pitch_diameter_mm": 80.0, "ball_diameter_mm": 19.05, "contact_angle_deg": 40.0},
+    "7311": {"balls": 12, "pitch_diameter_mm": 87.5, "ball_diameter_mm": 20.64, "contact_angle_deg": 40.0},
+    "7312": {"balls": 12, "pitch_diameter_mm": 95.0, "ball_diameter_mm": 22.23, "contact_angle_deg": 40.0},
+    # Cylindrical roller (motor DE beban radial tinggi)
+    "NU210": {"balls": 14, "pitch_diameter_mm": 70.0, "ball_diameter_mm": 11.0, "contact_angle_deg": 0.0},
+    "NU212": {"balls": 14, "pitch_diameter_mm": 85.0, "ball_diameter_mm": 14.0, "contact_angle_deg": 0.0},
+    "NU310": {"balls": 13, "pitch_diameter_mm": 80.0, "ball_diameter_mm": 15.0, "contact_angle_deg": 0.0},
+    "NU312": {"balls": 13, "pitch_diameter_mm": 95.0, "ball_diameter_mm": 18.0, "contact_angle_deg": 0.0}
+}
+
+# Posisi bearing yang di-assign per pompa (field spesifikasi bearing_{posisi})
+BEARING_POSITIONS: list = ["motor_de", "motor_nde", "pump_de", "pump_nde"]
+
+# Toleransi band frekuensi defect bearing (±fraksi) - mengakomodasi slip & toleransi geometri
+BEARING_FREQUENCY_TOLERANCE = 0.02
+
 # Diagnosis priority order (causal hierarchy - API 610 Annex L.3.2)
 DIAGNOSIS_PRIORITY: list = ["HYDRAULIC", "ELECTRICAL", "MECHANICAL", "THERMAL"]
+
+# Threshold diagnosa terpusat - dipakai jalur skalar & fleet_engine, di-override per konfigurasi oleh backtest
+# (IEC 60034-1 §4.2 imbalance, ISO 15243 §5.2 demodulation, API 682 §5.4.2 HF & volatile, API 610 §11.3 bearing)
+DIAGNOSIS_THRESHOLDS: Dict = {
+    "voltage_imbalance_warning_pct": 2.0,
+    "voltage_imbalance_alarm_pct": 5.0,
+    "current_imbalance_warning_pct": 5.0,
+    "current_imbalance_alarm_pct": 10.0,
+    "demod_warning_g": 0.3,
+    "demod_alarm_g": 0.5,
+    "hf_cavitation_g": {product: props["hf_cavitation_threshold"] for product, props in PRODUCT_PROPERTIES.items()},
+    "volatile_pump_nde_rise_c": 40,
+    "grease_warning_temp_c": 85,
+    "grease_alarm_temp_c": 95,
+    "grease_warning_rise_c": 40,
+    "grease_alarm_rise_c": 55,
+    "oil_warning_temp_c": 95,
+    "oil_alarm_temp_c": 105,
+    "oil_warning_rise_c": 50,
+    "oil_alarm_rise_c": 65
+}